@@ -1,19 +1,103 @@
 from .api import APIException
+from .transport import Transport, DEFAULT_POOL_MAXSIZE, DEFAULT_WARMUP_CONNECTIONS
+from .http2 import HTTP2Transport
+from .retry import RetryPolicy, DEFAULT_MAX_ATTEMPTS
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenException,
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_RESET_TIMEOUT,
+)
+from .rate_limit import RateLimiter
+from .endpoints import EndpointPool
+from .metrics import APIMetrics, default_metrics, start_metrics_server
+from .slowlog import (
+    SlowCallLog,
+    DEFAULT_SLOW_CALL_THRESHOLD,
+    DEFAULT_LARGE_RESPONSE_SIZE,
+    DEFAULT_SUMMARY_INTERVAL,
+)
+from .cache import TTLCache
+from .inventory import Inventory, DEFAULT_INVENTORY_TTL, DEFAULT_MISSING_TTL
+from .runtime_config import RuntimeConfigCache
+from .ledger import CallLedger, current_ledger, ledger_scope
+from . import tracing
+from .deadline import (
+    Deadline,
+    DeadlineExceeded,
+    deadline_scope,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+)
 from .tenant_api import TenantAPI, Tenant
-from .namespace_api import NamespaceAPI, Namespace
+from .namespace_api import NamespaceAPI, Namespace, DEFAULT_PERMISSION_TTL
 from .topic_api import TopicAPI, Topic
+from .lookup import BrokerRouter
 from .schema_api import SchemaAPI, Schema
-from typing import Optional
+from typing import Dict, List, Optional
 
 
+# API is the facade used by the handlers. All the API classes share a
+# single Transport so they ride on the same pooled connections.
 class API:
+    transport: Transport
     tenant: TenantAPI
     namespace: NamespaceAPI
     topic: TopicAPI
     schema: SchemaAPI
+    # Tenants, namespaces and topics known to exist, None if disabled
+    inventory: Optional[Inventory]
+    # Namespace permissions the topic permissions are diffed against, None
+    # if disabled
+    permission_cache: Optional[TTLCache[str, Dict[str, List[str]]]]
+    # Runtime configuration of the brokers
+    config_cache: RuntimeConfigCache
 
-    def __init__(self, base_url: str, sni: Optional[str] = None):
-        self.tenant = TenantAPI(base_url, sni=sni)
-        self.namespace = NamespaceAPI(base_url, sni=sni)
-        self.topic = TopicAPI(base_url, sni=sni)
-        self.schema = SchemaAPI(base_url, sni=sni)
+    def __init__(
+        self,
+        base_url: str,
+        sni: Optional[str] = None,
+        http2: bool = False,
+        direct_routing: bool = False,
+        inventory_ttl: float = DEFAULT_INVENTORY_TTL,
+        missing_ttl: float = DEFAULT_MISSING_TTL,
+        permission_ttl: float = DEFAULT_PERMISSION_TTL,
+        **kwargs,
+    ):
+        # HTTP/2 needs the optional httpx dependency
+        transport_cls = HTTP2Transport if http2 else Transport
+        self.transport = transport_cls(base_url, sni=sni, **kwargs)
+        self.tenant = TenantAPI(base_url, transport=self.transport)
+        self.namespace = NamespaceAPI(base_url, transport=self.transport)
+        self.topic = TopicAPI(base_url, transport=self.transport)
+        self.schema = SchemaAPI(base_url, transport=self.transport)
+
+        # Send topic calls straight to the broker owning the topic
+        if direct_routing:
+            self.topic.router = BrokerRouter(self.transport)
+
+        # Answer existence checks from what was seen recently, set both
+        # ttls to 0 to always ask Pulsar
+        self.inventory = None
+        if inventory_ttl > 0 or missing_ttl > 0:
+            self.inventory = Inventory(inventory_ttl, missing_ttl)
+        for api in (self.tenant, self.namespace, self.topic):
+            api.inventory = self.inventory
+
+        # Fetch the permissions of a namespace once for all its topics, set
+        # the ttl to 0 to fetch them for every topic
+        self.permission_cache = None
+        if permission_ttl > 0:
+            self.permission_cache = TTLCache(permission_ttl)
+        self.namespace.permission_cache = self.permission_cache
+        self.topic.permission_cache = self.permission_cache
+
+        self.config_cache = RuntimeConfigCache(self.topic.get_runtime_config)
+        self.topic.config_cache = self.config_cache
+
+    # Opens connections to the Pulsar API ahead of the first requests
+    def warm_up(self, connections: int = DEFAULT_WARMUP_CONNECTIONS) -> int:
+        return self.transport.warm_up(connections)
+
+    def close(self) -> None:
+        self.transport.close()
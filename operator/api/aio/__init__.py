@@ -0,0 +1,75 @@
+from .transport import AsyncTransport, APIResponse
+from ..transport import DEFAULT_WARMUP_CONNECTIONS
+from ..inventory import Inventory, DEFAULT_INVENTORY_TTL, DEFAULT_MISSING_TTL
+from ..namespace_api import DEFAULT_PERMISSION_TTL
+from ..cache import TTLCache
+from .tenant_api import AsyncTenantAPI
+from .namespace_api import AsyncNamespaceAPI
+from .topic_api import AsyncTopicAPI
+from .schema_api import AsyncSchemaAPI
+from .lookup import AsyncBrokerRouter
+from .runtime_config import AsyncRuntimeConfigCache
+from typing import Dict, List, Optional
+
+
+# AsyncAPI is the asyncio counterpart of the `API` facade and is used by
+# the async handlers.
+class AsyncAPI:
+    transport: AsyncTransport
+    tenant: AsyncTenantAPI
+    namespace: AsyncNamespaceAPI
+    topic: AsyncTopicAPI
+    schema: AsyncSchemaAPI
+    # Tenants, namespaces and topics known to exist, None if disabled
+    inventory: Optional[Inventory]
+    # Namespace permissions the topic permissions are diffed against, None
+    # if disabled
+    permission_cache: Optional[TTLCache[str, Dict[str, List[str]]]]
+    # Runtime configuration of the brokers
+    config_cache: AsyncRuntimeConfigCache
+
+    def __init__(
+        self,
+        base_url: str,
+        sni: Optional[str] = None,
+        direct_routing: bool = False,
+        inventory_ttl: float = DEFAULT_INVENTORY_TTL,
+        missing_ttl: float = DEFAULT_MISSING_TTL,
+        permission_ttl: float = DEFAULT_PERMISSION_TTL,
+        **kwargs,
+    ):
+        self.transport = AsyncTransport(base_url, sni=sni, **kwargs)
+        self.tenant = AsyncTenantAPI(base_url, transport=self.transport)
+        self.namespace = AsyncNamespaceAPI(base_url, transport=self.transport)
+        self.topic = AsyncTopicAPI(base_url, transport=self.transport)
+        self.schema = AsyncSchemaAPI(base_url, transport=self.transport)
+
+        # Send topic calls straight to the broker owning the topic
+        if direct_routing:
+            self.topic.router = AsyncBrokerRouter(self.transport)
+
+        # Answer existence checks from what was seen recently, set both
+        # ttls to 0 to always ask Pulsar
+        self.inventory = None
+        if inventory_ttl > 0 or missing_ttl > 0:
+            self.inventory = Inventory(inventory_ttl, missing_ttl)
+        for api in (self.tenant, self.namespace, self.topic):
+            api.inventory = self.inventory
+
+        # Fetch the permissions of a namespace once for all its topics, set
+        # the ttl to 0 to fetch them for every topic
+        self.permission_cache = None
+        if permission_ttl > 0:
+            self.permission_cache = TTLCache(permission_ttl)
+        self.namespace.permission_cache = self.permission_cache
+        self.topic.permission_cache = self.permission_cache
+
+        self.config_cache = AsyncRuntimeConfigCache(self.topic.get_runtime_config)
+        self.topic.config_cache = self.config_cache
+
+    # Opens connections to the Pulsar API ahead of the first requests
+    async def warm_up(self, connections: int = DEFAULT_WARMUP_CONNECTIONS) -> int:
+        return await self.transport.warm_up(connections)
+
+    async def close(self) -> None:
+        await self.transport.close()
@@ -0,0 +1,83 @@
+import time
+from ..api import BaseAPI, APIRequestType
+from .transport import AsyncTransport, APIResponse
+from ..metrics import endpoint_template
+from ..tracing import request_span
+from ..ledger import call_scope
+from typing import Optional, Any, Dict
+
+
+# AsyncBaseAPI is the asyncio counterpart of BaseAPI. The async API
+# classes inherit from both this class and their sync counterpart so
+# that everything that doesn't do I/O (models, error handling, helpers)
+# is shared and only the methods talking to Pulsar are overridden with
+# coroutines.
+class AsyncBaseAPI(BaseAPI):
+    __base_url__: str
+    __transport__: AsyncTransport
+
+    def __init__(
+        self,
+        base_url: str,
+        token_path: Optional[str] = None,
+        sni: Optional[str] = None,
+        transport: Optional[AsyncTransport] = None,
+        **kwargs,
+    ):
+        if transport is None:
+            transport = AsyncTransport(
+                base_url, token_path=token_path, sni=sni, **kwargs
+            )
+        super().__init__(base_url, transport=transport)  # type: ignore
+
+    @property
+    def transport(self) -> AsyncTransport:
+        return self.__transport__
+
+    async def close(self) -> None:  # type: ignore
+        await self.__transport__.close()
+
+    async def _request(  # type: ignore
+        self,
+        method: APIRequestType,
+        url: str,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        idempotent: Optional[bool] = None,
+    ) -> APIResponse:
+        started = time.monotonic()
+        endpoint = endpoint_template(url, self.__base_url__)
+        res = None
+        with call_scope() as call, request_span(
+            type(self).__name__, method.value, endpoint
+        ) as span:
+            try:
+                res = await self.__transport__.request(
+                    method.value, url, data=data, json=json, idempotent=idempotent
+                )
+                return res
+            finally:
+                self._observe(
+                    method, url, endpoint, started, res, span, retries=call.retries
+                )
+
+    async def _get(self, url: str, **kwargs) -> APIResponse:  # type: ignore
+        if kwargs:
+            return await self._request(APIRequestType.GET, url, **kwargs)
+
+        return await self.__transport__.singleflight.do(
+            url, lambda: self._request(APIRequestType.GET, url)
+        )
+
+    async def _put(self, url: str, **kwargs) -> APIResponse:  # type: ignore
+        return await self._request(APIRequestType.PUT, url, **kwargs)
+
+    async def _post(self, url: str, **kwargs) -> APIResponse:  # type: ignore
+        return await self._request(APIRequestType.POST, url, **kwargs)
+
+    async def _delete(self, url: str, **kwargs) -> APIResponse:  # type: ignore
+        return await self._request(APIRequestType.DELETE, url, **kwargs)
+
+    async def get_runtime_config(self) -> Dict[str, Any]:  # type: ignore
+        r = await self._get(f"{self.__base_url__}/brokers/configuration/runtime")
+        return self._parse_runtime_config(r)
@@ -0,0 +1,28 @@
+from ..lookup import BrokerRouterBase
+from .transport import AsyncTransport
+from typing import Any
+
+
+# AsyncBrokerRouter is the asyncio counterpart of BrokerRouter.
+class AsyncBrokerRouter(BrokerRouterBase):
+    transport: AsyncTransport
+
+    async def resolve(self, topic) -> str:
+        boundaries = self._cached_bundles(topic)
+        if boundaries is None:
+            data = await self._fetch(self._bundles_url(topic))
+            boundaries = self._store_bundles(topic, data)
+
+        bundle = self._bundle(topic, boundaries)
+        owner = self._cached_owner(bundle)
+        if owner is None:
+            data = await self._fetch(self._lookup_url(topic))
+            owner = self._store_owner(bundle, data)
+
+        return owner
+
+    async def _fetch(self, url: str) -> Any:
+        res = await self.transport.singleflight.do(
+            url, lambda: self.transport.request("GET", url)
+        )
+        return self._parse(res)
@@ -0,0 +1,64 @@
+from ..namespace_api import NamespaceAPI, Namespace, NamespaceNotFoundException
+from .api import AsyncBaseAPI
+from typing import Dict, List
+
+
+class AsyncNamespaceAPI(AsyncBaseAPI, NamespaceAPI):
+    __base_url__: str
+
+    async def exists(self, namespace: Namespace) -> bool:  # type: ignore
+        known = self._known(namespace)
+        if known is not None:
+            return known
+        try:
+            t = await self.get(namespace)
+            return t != None
+        except NamespaceNotFoundException:
+            return False
+
+    async def get(self, namespace: Namespace) -> Namespace:  # type: ignore
+        r = await self._get(self._namespace_url(namespace))
+        return self._parse_namespace(namespace, r)
+
+    async def create(self, namespace: Namespace) -> Namespace:  # type: ignore
+        r = await self._put(self._namespace_url(namespace), json=namespace.api_dict())
+        self._created(namespace, r)
+        return await self.get(namespace)
+
+    async def update(self, namespace: Namespace) -> Namespace:  # type: ignore
+        for method, url, value in self._policy_requests(namespace):
+            r = await self._request(method, url, json=value, idempotent=True)
+            self._ensure_success(r)
+
+        return await self.get(namespace)
+
+    async def delete(self, namespace: Namespace) -> None:  # type: ignore
+        r = await self._delete(self._namespace_url(namespace))
+        self._deleted(namespace, r)
+
+    async def permissions(self, namespace: Namespace) -> Dict[str, List[str]]:  # type: ignore
+        r = await self._get(self._permissions_url(namespace))
+        return self._parse_permissions(r)
+
+    async def sync_permissions(self, namespace: Namespace) -> None:  # type: ignore
+        current_permissions = await self.permissions(namespace)
+
+        try:
+            for role, perms in namespace.permissions.items():
+                await self._set_role_permissions(namespace, role, perms)
+
+            for role in self._removed_roles(namespace, current_permissions):
+                await self._del_role_permissions(namespace, role)
+        finally:
+            self._forget_permissions(namespace)
+
+    async def _set_role_permissions(  # type: ignore
+        self, namespace: Namespace, role: str, permissions: List[str]
+    ) -> None:
+        url = self._role_url(namespace, role)
+        r = await self._post(url, json=permissions, idempotent=True)
+        self._ensure_success(r)
+
+    async def _del_role_permissions(self, namespace: Namespace, role: str) -> None:  # type: ignore
+        r = await self._delete(self._role_url(namespace, role))
+        self._ensure_success(r)
@@ -0,0 +1,32 @@
+import asyncio
+import contextvars
+from ..runtime_config import RuntimeConfigCache
+from typing import Any, Dict, Optional
+
+
+# AsyncRuntimeConfigCache is the asyncio counterpart of RuntimeConfigCache,
+# `fetch` is a coroutine function and the configuration is refreshed in a
+# task. The task doesn't inherit the context of the handler that started
+# it so the refresh isn't bound by its deadline nor counted in its ledger.
+class AsyncRuntimeConfigCache(RuntimeConfigCache):
+    __task__: Optional["asyncio.Task[None]"] = None
+
+    async def get(self) -> Dict[str, Any]:  # type: ignore
+        config = self._cached()
+        if config is None:
+            config = await self.fetch()
+            self.store(config)
+        elif self._start_refresh():
+            loop = asyncio.get_running_loop()
+            self.__task__ = contextvars.Context().run(
+                loop.create_task, self._refresh_async()
+            )
+        return config
+
+    async def _refresh_async(self) -> None:
+        try:
+            self.store(await self.fetch())
+        except Exception as e:
+            self._refresh_failed(e)
+        finally:
+            self._refresh_done()
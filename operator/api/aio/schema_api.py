@@ -0,0 +1,27 @@
+from ..schema_api import SchemaAPI, Schema, SchemaNotFoundException
+from .api import AsyncBaseAPI
+
+
+class AsyncSchemaAPI(AsyncBaseAPI, SchemaAPI):
+    __base_url__: str
+
+    async def get(self, schema: Schema) -> Schema:  # type: ignore
+        r = await self._get(self._schema_url(schema))
+        return self._parse_schema(r)
+
+    async def exists(self, schema: Schema) -> bool:  # type: ignore
+        try:
+            s = await self.get(schema)
+            return s != None
+        except SchemaNotFoundException:
+            return False
+
+    async def update(self, schema: Schema) -> Schema:  # type: ignore
+        r = await self._post(self._schema_url(schema), json=schema.dict())
+        return self._updated(schema, r)
+
+    async def delete(self, schema: Schema) -> None:  # type: ignore
+        r = await self._delete(self._schema_url(schema), json=schema.dict())
+
+        if r.status_code != 200:
+            self._handle_error(r)
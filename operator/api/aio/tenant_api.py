@@ -0,0 +1,36 @@
+from ..tenant_api import TenantAPI, Tenant, TenantNotFoundException
+from .api import AsyncBaseAPI
+
+
+class AsyncTenantAPI(AsyncBaseAPI, TenantAPI):
+    __base_url__: str
+
+    async def exists(self, tenant: Tenant) -> bool:  # type: ignore
+        known = self._known(tenant)
+        if known is not None:
+            return known
+        try:
+            t = await self.get(tenant)
+            return t != None
+        except TenantNotFoundException:
+            return False
+
+    async def get(self, tenant: Tenant) -> Tenant:  # type: ignore
+        r = await self._get(self._tenant_url(tenant))
+        return self._parse_tenant(tenant, r)
+
+    async def create(self, tenant: Tenant) -> Tenant:  # type: ignore
+        r = await self._put(self._tenant_url(tenant), json=tenant.api_dict())
+        self._created(tenant, r)
+        return await self.get(tenant)
+
+    async def update(self, tenant: Tenant) -> Tenant:  # type: ignore
+        r = await self._post(
+            self._tenant_url(tenant), json=tenant.api_dict(), idempotent=True
+        )
+        self._ensure_success(r)
+        return await self.get(tenant)
+
+    async def delete(self, tenant: Tenant) -> None:  # type: ignore
+        r = await self._delete(self._tenant_url(tenant))
+        self._deleted(tenant, r)
@@ -0,0 +1,118 @@
+from ..api import APIRequestType
+from ..topic_api import TopicAPI, Topic
+from .api import AsyncBaseAPI
+from ..lookup import NOT_OWNER_STATUS_CODES, redirected
+from .lookup import AsyncBrokerRouter
+from .runtime_config import AsyncRuntimeConfigCache
+from .transport import APIResponse
+from typing import Optional, Dict, Any, List
+
+
+class AsyncTopicAPI(AsyncBaseAPI, TopicAPI):
+    __base_url__: str
+    router: Optional[AsyncBrokerRouter] = None  # type: ignore
+    config_cache: Optional[AsyncRuntimeConfigCache] = None  # type: ignore
+
+    async def _request(  # type: ignore
+        self, method: APIRequestType, url: str, topic: Optional[Topic] = None, **kwargs
+    ) -> APIResponse:
+        if topic is None or self.router is None:
+            return await super()._request(method, url, **kwargs)
+
+        try:
+            owner = await self.router.resolve(topic)
+        except self.router.errors:
+            return await super()._request(method, url, **kwargs)
+
+        try:
+            r = await super()._request(
+                method, self.router.rewrite(url, owner), **kwargs
+            )
+        except self.transport.connection_errors:
+            self.router.invalidate(topic)
+            # The request might have gone through already
+            if not self.transport.retry_policy.retryable(
+                method.value, kwargs.get("idempotent")
+            ):
+                raise
+            return await super()._request(method, url, **kwargs)
+
+        if redirected(r) or r.status_code in NOT_OWNER_STATUS_CODES:
+            self.router.invalidate(topic)
+
+        return r
+
+    async def exists(self, topic: Topic) -> bool:  # type: ignore
+        known = self._known(topic)
+        if known is not None:
+            return known
+
+        url, kwargs = self._existence_request(topic)
+        found = self._found(topic, await self._get(url, **kwargs))
+        if found is not None:
+            return found
+
+        r = await self._get(self._topic_list_url(topic))
+        return self._listed(topic, r)
+
+    async def partitions(self, topic: Topic) -> int:  # type: ignore
+        r = await self._get(f"{self._topic_url(topic)}/partitions")
+        return self._partitions(r)
+
+    async def create(self, topic: Topic) -> None:  # type: ignore
+        url, body = self._create_request(topic)
+        r = await self._put(url, json=body, topic=topic)
+        self._created(topic, r)
+
+    async def update(self, topic: Topic) -> None:  # type: ignore
+        for method, url, value in self._policy_requests(topic):
+            r = await self._request(
+                method, url, json=value, idempotent=True, topic=topic
+            )
+            self._ensure_success(r)
+
+    async def delete(self, topic: Topic) -> None:  # type: ignore
+        r = await self._delete(self._delete_url(topic), topic=topic)
+        self._deleted(topic, r)
+
+    # Returns the runtime_config of the brokers from a cache that's
+    # refreshed in the background, the async counterpart of the
+    # runtime_config property.
+    async def cached_runtime_config(self) -> Dict[str, Any]:
+        if self.config_cache is None:
+            self.config_cache = AsyncRuntimeConfigCache(self.get_runtime_config)
+
+        return await self.config_cache.get()
+
+    async def topic_level_policies_enabled(self) -> bool:  # type: ignore
+        config = await self.cached_runtime_config()
+        return config.get("topicLevelPoliciesEnabled") == "true"
+
+    async def permissions(self, topic: Topic) -> Dict[str, List[str]]:  # type: ignore
+        namespacePermissions = self._cached_namespace_permissions(topic)
+        if namespacePermissions is None:
+            r = await self._get(self._namespace_permissions_url(topic))
+            namespacePermissions = self._parse_namespace_permissions(topic, r)
+
+        r = await self._get(self._permissions_url(topic), topic=topic)
+        return self._parse_permissions(r, namespacePermissions)
+
+    async def sync_permissions(self, topic: Topic) -> None:  # type: ignore
+        current_permissions = await self.permissions(topic)
+
+        for role, perms in topic.permissions.items():
+            await self._set_role_permissions(topic, role, perms)
+
+        for role in self._removed_roles(topic, current_permissions):
+            await self._del_role_permissions(topic, role)
+
+    async def _set_role_permissions(  # type: ignore
+        self, topic: Topic, role: str, permissions: List[str]
+    ) -> None:
+        url = self._role_url(topic, role)
+        r = await self._post(url, json=permissions, idempotent=True, topic=topic)
+        self._ensure_success(r)
+
+    async def _del_role_permissions(self, topic: Topic, role: str) -> None:  # type: ignore
+        r = await self._delete(self._role_url(topic, role), topic=topic)
+        self._role_deleted(r)
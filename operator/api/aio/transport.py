@@ -0,0 +1,175 @@
+import aiohttp
+import asyncio
+from ..transport import TransportBase, Sleep, DEFAULT_WARMUP_CONNECTIONS
+from ..singleflight import AsyncGroup
+from ..deadline import current_deadline
+from ..codec import json_loads
+from dataclasses import dataclass
+from typing import Optional, Any, Awaitable, Callable, Mapping, Tuple
+
+# Maximum number of connections to the Pulsar API. Async handlers don't
+# hold a thread per call so many more calls can be in flight than with
+# the sync client, whose pool is sized after kopf's thread pool.
+DEFAULT_POOL_MAXSIZE = 256
+
+
+# APIResponse is a fully read response returned by the AsyncTransport.
+# It mimics the parts of `requests.Response` the API classes rely on so
+# response handling (e.g. `BaseAPI._handle_error`) is shared between the
+# sync and async clients.
+@dataclass
+class APIResponse:
+    status_code: int
+    url: str
+    headers: Mapping[str, str]
+    content: bytes
+    # Responses of the redirects that were followed
+    history: Tuple[Any, ...] = ()
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json_loads(self.content)
+
+
+# AsyncTransport is the aiohttp counterpart of Transport. The client
+# session has to be created inside the event loop so it's created lazily
+# on the first request.
+class AsyncTransport(TransportBase):
+    __session__: Optional[aiohttp.ClientSession] = None
+
+    # Coalesces identical GET requests made at the same time
+    singleflight: AsyncGroup
+
+    # Errors of a single attempt that are worth retrying
+    connection_errors: Tuple[type, ...] = (
+        aiohttp.ClientConnectionError,
+        asyncio.TimeoutError,
+    )
+
+    def __init__(self, base_url: str, **kwargs):
+        kwargs.setdefault("pool_maxsize", DEFAULT_POOL_MAXSIZE)
+        super().__init__(base_url, **kwargs)
+        self.singleflight = AsyncGroup()
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self.__session__ is None or self.__session__.closed:
+            connector = {}
+            if self.ssl_context is not None:
+                connector["ssl"] = self.ssl_context
+
+            self.__session__ = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.__pool_maxsize__, **connector
+                ),
+            )
+
+        return self.__session__
+
+    async def close(self) -> None:
+        if self.__session__ is not None:
+            await self.__session__.close()
+            self.__session__ = None
+
+    # warm_up opens up to `connections` connections to each endpoint by
+    # sending that many HEAD requests at once. The connections are kept
+    # alive in the connector for the first real requests. Returns the
+    # number of connections opened.
+    async def warm_up(self, connections: int = DEFAULT_WARMUP_CONNECTIONS) -> int:
+        session = await self.session()
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.connect_timeout, sock_read=self.read_timeout
+        )
+
+        async def connect(url: str) -> None:
+            kwargs = {}
+            if self.__sni__ and url.startswith("https://"):
+                kwargs["server_hostname"] = self.__sni__
+
+            async with session.head(url, timeout=timeout, **kwargs) as r:
+                await r.read()
+
+        results = await asyncio.gather(
+            *[
+                connect(url)
+                for url in self.endpoints.urls
+                for _ in range(min(connections, self.__pool_maxsize__))
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return len(results)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        idempotent: Optional[bool] = None,
+    ) -> APIResponse:
+        session = await self.session()
+
+        kwargs = {}
+        # aiohttp can verify the certificate against another hostname
+        # than the one we connect to. This replaces HostnameCheckAdapter.
+        if self.__sni__ and url.startswith("https://"):
+            kwargs["server_hostname"] = self.__sni__
+
+        data, headers = self._body(data, json)
+
+        async def send(url: str, timeout: Tuple[float, float]) -> APIResponse:
+            connect, read = timeout
+            deadline = current_deadline()
+            async with session.request(
+                method,
+                url,
+                data=data,
+                headers={**headers, **self._headers()},
+                timeout=aiohttp.ClientTimeout(
+                    total=deadline.remaining() if deadline else None,
+                    sock_connect=connect,
+                    sock_read=read,
+                ),
+                **kwargs,
+            ) as r:
+                return APIResponse(
+                    status_code=r.status,
+                    url=str(r.url),
+                    headers=r.headers,
+                    content=await r.read(),
+                    history=tuple(r.history),
+                )
+
+        return await self._send_with_retries(method, url, send, idempotent)
+
+    # Runs the attempts of a request like Transport._send_with_retries,
+    # awaiting `send` and the delays.
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[str, Tuple[float, float]], Awaitable[APIResponse]],
+        idempotent: Optional[bool] = None,
+    ) -> APIResponse:
+        attempts = self._attempts(method, url, idempotent)
+        try:
+            step = next(attempts)
+            while True:
+                try:
+                    if isinstance(step, Sleep):
+                        await asyncio.sleep(step.seconds)
+                        result = None
+                    else:
+                        result = await send(step.url, step.timeout)
+                except BaseException as e:
+                    step = attempts.throw(e)
+                else:
+                    step = attempts.send(result)
+        except StopIteration as stop:
+            return stop.value
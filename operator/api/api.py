@@ -1,7 +1,12 @@
 import requests
-from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+import time
+from .transport import Transport, HostnameCheckAdapter
+from .codec import JSON_CODEC, json_loads, json_dumps
+from .metrics import endpoint_template, resource_path
+from .tracing import request_span, set_response
+from .ledger import call_scope, record_call
 from abc import abstractmethod
-from typing import Optional, Any, Union, Dict
+from typing import Optional, Any, Dict
 from enum import Enum
 
 
@@ -25,54 +30,33 @@ class APIRequestType(str, Enum):
     DELETE = "DELETE"
 
 
-# This is needed to support HTTPS connections where the hostname
-# in the certificate is different from the hostname used to initiate
-# the connection. i.e. in-cluster we use service hostname but the
-# pulsar broker has a certificate for external DNS.
-#
-# requests doesn't have any way of simply specifying the SNI to use
-# for verification so we need to create an HTTPAdapter that will
-# be used to verify all connections made to certain connection prefixes.
-class HostnameCheckAdapter(requests.sessions.HTTPAdapter):
-    __sni_hostname__: Optional[str] = None
-
-    def __init__(self, sni: Optional[str] = None):
-        super().__init__()
-        self.__sni_hostname__ = sni
-
-    def cert_verify(
-        self,
-        conn: Union[HTTPConnectionPool, HTTPSConnectionPool],
-        url: str,
-        verify: Union[None, str, bool],
-        cert,
-    ) -> bool:
-        # Check that the conn is actually a HTTPSConnectionPool and
-        # we have an SNI to verify against.
-        if conn.scheme == "https" and self.__sni_hostname__:
-            # Setting the `assert_hostname` instructs urllib3 that it
-            # should check for that domain in the certification step.
-            setattr(conn, "assert_hostname", self.__sni_hostname__)
-
-        # Handover to HTTPAdapter's `cert_verify` method
-        return super(HostnameCheckAdapter, self).cert_verify(conn, url, verify, cert)
-
-
 class BaseAPI:
     __base_url__: str
-    __token_path__: str = "/var/run/secrets/pulsar/TOKEN"
-    __sni__: Optional[str] = None
+    __transport__: Transport
 
     def __init__(
         self,
         base_url: str,
         token_path: Optional[str] = None,
         sni: Optional[str] = None,
+        transport: Optional[Transport] = None,
+        **kwargs,
     ):
         self.__base_url__ = base_url
-        self.__sni__ = sni
-        if token_path:
-            self.__token_path__ = token_path
+        if transport is None:
+            transport = Transport(base_url, token_path=token_path, sni=sni, **kwargs)
+        self.__transport__ = transport
+
+    @property
+    def transport(self) -> Transport:
+        return self.__transport__
+
+    @property
+    def session(self) -> requests.Session:
+        return self.__transport__.session
+
+    def close(self) -> None:
+        self.__transport__.close()
 
     def _request(
         self,
@@ -81,31 +65,83 @@ class BaseAPI:
         data: Optional[Any] = None,
         json: Optional[Any] = None,
         session: Optional[requests.Session] = None,
+        idempotent: Optional[bool] = None,
     ) -> requests.Response:
-        if not session:
-            # Create a session
-            session = requests.Session()
-
-        # Mount the HostnameCheckAdapter for base url
-        session.mount(self.__base_url__, HostnameCheckAdapter(sni=self.__sni__))
-
-        # Create the request
-        req = requests.Request(method.value, url, json=json, data=data)
-        prepped = req.prepare()
-
-        # Read token file
-        try:
-            with open(self.__token_path__, "r") as token_data:
-                token = token_data.read()
-                prepped.headers["Authorization"] = f"Bearer {token}"
-        except FileNotFoundError:
-            pass
+        started = time.monotonic()
+        endpoint = endpoint_template(url, self.__base_url__)
+        res = None
+        with call_scope() as call, request_span(
+            type(self).__name__, method.value, endpoint
+        ) as span:
+            try:
+                # Only GET, PUT and DELETE are retried on transient errors
+                # unless the caller knows a POST is safe to repeat (e.g.
+                # policy setters)
+                res = self.__transport__.request(
+                    method.value,
+                    url,
+                    data=data,
+                    json=json,
+                    session=session,
+                    idempotent=idempotent,
+                )
+                return res
+            finally:
+                self._observe(
+                    method, url, endpoint, started, res, span, retries=call.retries
+                )
+
+    # Records a call in the Prometheus metrics, its trace span, the
+    # ledger of the running handler and the slow call log
+    def _observe(
+        self,
+        method: APIRequestType,
+        url: str,
+        endpoint: str,
+        started: float,
+        res: Optional[Any],
+        span: Optional[Any] = None,
+        retries: int = 0,
+    ) -> None:
+        status_code = res.status_code if res is not None else None
+        size = len(res.content) if res is not None else 0
+        duration = time.monotonic() - started
+
+        if status_code is not None:
+            set_response(span, status_code)
+        record_call(status_code, size, duration)
+
+        metrics = self.__transport__.api_metrics
+        if metrics is not None:
+            metrics.observe(
+                type(self).__name__,
+                method.value,
+                endpoint,
+                status_code,
+                duration,
+                size,
+            )
 
-        # Send request and return results
-        return session.send(prepped)
+        slow_call_log = self.__transport__.slow_call_log
+        if slow_call_log is not None:
+            slow_call_log.observe(
+                type(self).__name__,
+                method.value,
+                endpoint,
+                resource_path(url, self.__base_url__),
+                status_code,
+                duration,
+                size,
+                retries,
+            )
 
     def _get(self, url: str, **kwargs) -> requests.Response:
-        return self._request(APIRequestType.GET, url, **kwargs)
+        if kwargs:
+            return self._request(APIRequestType.GET, url, **kwargs)
+
+        return self.__transport__.singleflight.do(
+            url, lambda: self._request(APIRequestType.GET, url)
+        )
 
     def _put(self, url: str, **kwargs) -> requests.Response:
         return self._request(APIRequestType.PUT, url, **kwargs)
@@ -116,9 +152,18 @@ class BaseAPI:
     def _delete(self, url: str, **kwargs) -> requests.Response:
         return self._request(APIRequestType.DELETE, url, **kwargs)
 
+    # Decodes a JSON response body with the fastest available codec
+    def _json(self, res: Any) -> Any:
+        return json_loads(res.content)
+
+    # Raises the error of a response that isn't a success (200 to 204)
+    def _ensure_success(self, res: Any) -> None:
+        if not (200 <= res.status_code <= 204):
+            self._handle_error(res)
+
     def _handle_error(self, res: requests.Response):
         try:
-            body = res.json()
+            body = self._json(res)
         except Exception:
             raise APIException(
                 f"Unknown error. status_code='{res.status_code}' body='{res.text}'",
@@ -131,13 +176,13 @@ class BaseAPI:
         raise APIException(res.text, res.status_code)
 
     def get_runtime_config(self) -> Dict[str, Any]:
-        url = f"{self.__base_url__}/brokers/configuration/runtime"
-
-        r = self._get(url)
+        r = self._get(f"{self.__base_url__}/brokers/configuration/runtime")
+        return self._parse_runtime_config(r)
 
+    def _parse_runtime_config(self, r: Any) -> Dict[str, Any]:
         if r.status_code == 200:
             try:
-                config = r.json()
+                config = self._json(r)
                 assert isinstance(config, dict)
                 return config
             except Exception as e:
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Entries kept at most by a cache, the oldest ones are dropped first
+DEFAULT_MAXSIZE = 10000
+
+
+# TTLCache maps keys to values for `ttl` seconds (or the ttl given to
+# `set`). It's shared by the sync and async API classes so it's guarded
+# by a lock and never does any I/O. Expired entries are dropped when
+# they're read, and the oldest entries (which expire first) when the
+# cache is full.
+class TTLCache(Generic[K, V]):
+    ttl: float
+    maxsize: int
+
+    def __init__(self, ttl: float, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.__lock__ = threading.Lock()
+        self.__entries__: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is None:
+                return default
+            if entry[1] <= time.monotonic():
+                del self.__entries__[key]
+                return default
+            return entry[0]
+
+    # A ttl of 0 (or less) doesn't cache the value
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        expires = time.monotonic() + ttl
+        with self.__lock__:
+            self.__entries__.pop(key, None)
+            self.__entries__[key] = (value, expires)
+            while len(self.__entries__) > self.maxsize:
+                self.__entries__.popitem(last=False)
+
+    # Replaces the value of a live entry with `fn(value)`, keeping its
+    # expiry. Does nothing if the key isn't cached.
+    def update(self, key: K, fn: Callable[[V], V]) -> None:
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.__entries__[key] = (fn(entry[0]), entry[1])
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self.__lock__:
+            entry = self.__entries__.pop(key, None)
+        if entry is None or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    # Drops the entries whose (string) key starts with `prefix`, e.g. all
+    # the namespaces of a tenant
+    def discard_prefix(self, prefix: str) -> None:
+        with self.__lock__:
+            for key in [k for k in self.__entries__ if str(k).startswith(prefix)]:
+                del self.__entries__[key]
+
+    def clear(self) -> None:
+        with self.__lock__:
+            self.__entries__.clear()
@@ -0,0 +1,135 @@
+import threading
+import time
+from enum import Enum
+from typing import Optional, FrozenSet
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Status codes that mean Pulsar (or the proxy in front of it) is unavailable
+FAILURE_STATUS_CODES = frozenset([502, 503, 504])
+
+
+class CircuitState(str, Enum):
+    Closed = "Closed"
+    Open = "Open"
+    HalfOpen = "HalfOpen"
+
+
+# Raised instead of sending a request while the circuit is open. This is
+# deliberately not an APIException: callers treating an APIException as
+# an answer from Pulsar (e.g. "unable to check existence, release the
+# resource anyway") must not act on it.
+class CircuitOpenException(Exception):
+    retry_after: float
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Pulsar API unavailable, retrying in {retry_after:.0f} seconds"
+        )
+        self.retry_after = retry_after
+
+
+# CircuitBreaker stops requests to the Pulsar API while it's down.
+#
+# Closed:   requests go through, consecutive failures are counted and
+#           the circuit opens when they reach `failure_threshold`.
+# Open:     requests fail right away with CircuitOpenException until
+#           `reset_timeout` seconds have passed.
+# HalfOpen: a single probe request is let through. If it succeeds the
+#           circuit closes, otherwise it opens again.
+class CircuitBreaker:
+    failure_threshold: int
+    reset_timeout: float
+    failure_status_codes: FrozenSet[int]
+
+    __state__: CircuitState = CircuitState.Closed
+    __failures__: int = 0
+    __opened_at__: float = 0.0
+    __probe_started__: Optional[float] = None
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        failure_status_codes: FrozenSet[int] = FAILURE_STATUS_CODES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_status_codes = failure_status_codes
+        self.__lock__ = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        return self.__state__
+
+    # available tells if a request would currently be let through,
+    # without claiming the half-open probe.
+    @property
+    def available(self) -> bool:
+        with self.__lock__:
+            if self.__state__ == CircuitState.Closed:
+                return True
+            return self._probe_allowed()
+
+    def retry_after(self) -> float:
+        with self.__lock__:
+            if self.__state__ == CircuitState.Closed:
+                return 0.0
+            elapsed = time.monotonic() - self.__opened_at__
+            return max(0.0, self.reset_timeout - elapsed)
+
+    # allow is called before every request. Once the reset timeout has
+    # passed, the first caller gets to send the probe request.
+    def allow(self) -> bool:
+        with self.__lock__:
+            if self.__state__ == CircuitState.Closed:
+                return True
+
+            if not self._probe_allowed():
+                return False
+
+            self.__state__ = CircuitState.HalfOpen
+            self.__probe_started__ = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self.__lock__:
+            self.__state__ = CircuitState.Closed
+            self.__failures__ = 0
+            self.__probe_started__ = None
+
+    def record_failure(self) -> None:
+        with self.__lock__:
+            self.__failures__ += 1
+            self.__probe_started__ = None
+
+            if (
+                self.__state__ == CircuitState.HalfOpen
+                or self.__failures__ >= self.failure_threshold
+            ):
+                self.__state__ = CircuitState.Open
+                self.__opened_at__ = time.monotonic()
+
+    def record(self, status_code: Optional[int]) -> None:
+        if status_code is None or status_code in self.failure_status_codes:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    # release gives up the probe without a verdict, e.g. when the request
+    # failed for reasons unrelated to the API's availability.
+    def release(self) -> None:
+        with self.__lock__:
+            self.__probe_started__ = None
+
+    def _probe_allowed(self) -> bool:
+        now = time.monotonic()
+        if self.__state__ == CircuitState.Open:
+            return now - self.__opened_at__ >= self.reset_timeout
+
+        # HalfOpen: only one probe at a time, unless the probe got lost
+        return (
+            self.__probe_started__ is None
+            or now - self.__probe_started__ >= self.reset_timeout
+        )
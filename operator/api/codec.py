@@ -0,0 +1,40 @@
+import json
+from typing import Any, Union
+
+# The fastest JSON library available is used to encode request bodies and
+# decode responses: orjson, then ujson, then the standard library. Both
+# orjson and ujson are optional dependencies.
+try:
+    import orjson
+
+    JSON_CODEC = "orjson"
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # pragma: no cover
+    try:
+        import ujson
+
+        JSON_CODEC = "ujson"
+
+        def json_loads(data: Union[str, bytes]) -> Any:
+            return ujson.loads(data)
+
+        def json_dumps(obj: Any) -> bytes:
+            return ujson.dumps(obj, escape_forward_slashes=False).encode("utf-8")
+
+    except ImportError:
+        JSON_CODEC = "json"
+
+        def json_loads(data: Union[str, bytes]) -> Any:
+            return json.loads(data)
+
+        def json_dumps(obj: Any) -> bytes:
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+JSON_CONTENT_TYPE = "application/json"
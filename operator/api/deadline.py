@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+# Socket timeouts used for every request to the Pulsar API, shortened to
+# what's left of the current deadline if there's one.
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+# Raised when the time budget of a reconcile is used up. Like
+# CircuitOpenException this isn't an APIException since Pulsar didn't
+# answer anything.
+class DeadlineExceeded(Exception):
+    pass
+
+
+# Deadline is the time budget of a reconcile. It's set for the duration
+# of a handler with `deadline_scope(...)` and picked up by the transport for
+# every request made while it runs, so it doesn't need to be passed
+# through all the API methods.
+class Deadline:
+    timeout: float
+    expires_at: float
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.timeout:.0f} seconds exceeded")
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar(
+    "pulsar_api_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+# Runs the block with a deadline of `timeout` seconds. A deadline already
+# set by the caller is kept if it expires sooner.
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[Deadline]]:
+    current = _current.get()
+    if not timeout or (current is not None and current.remaining() <= timeout):
+        yield current
+        return
+
+    token = _current.set(Deadline(timeout))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+# Returns the (connect, read) timeouts for the next request, raising
+# DeadlineExceeded if there's no time left.
+def request_timeouts(
+    connect: float = DEFAULT_CONNECT_TIMEOUT, read: float = DEFAULT_READ_TIMEOUT
+) -> Tuple[float, float]:
+    current = _current.get()
+    if current is None:
+        return connect, read
+
+    current.check()
+    remaining = current.remaining()
+    return min(connect, remaining), min(read, remaining)
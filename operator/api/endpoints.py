@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from typing import Iterable, List, Optional, Sequence
+
+# Weight of the newest sample in the moving averages
+DEFAULT_DECAY = 0.3
+# How long an endpoint is avoided after a failed request (in seconds)
+DEFAULT_COOLDOWN = 10.0
+# How much a 100% error rate multiplies the latency score of an endpoint
+ERROR_PENALTY = 10.0
+
+
+# Endpoint keeps the exponentially weighted moving averages (EWMA) of the
+# latency and error rate of one Pulsar admin endpoint (a proxy or a
+# broker) along with the number of requests currently in flight.
+class Endpoint:
+    url: str
+    # Scheme and location of the endpoint, which non-admin calls such as
+    # topic lookups are made under
+    root: str
+    latency: float = 0.0
+    error_rate: float = 0.0
+    in_flight: int = 0
+    failed_at: Optional[float] = None
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        parts = urlsplit(self.url)
+        self.root = f"{parts.scheme}://{parts.netloc}"
+
+    def healthy(self, cooldown: float, now: float) -> bool:
+        return self.failed_at is None or now - self.failed_at >= cooldown
+
+    # Lower is better. Endpoints that have never been used score 0 so
+    # they are tried right away.
+    def score(self) -> float:
+        return (
+            self.latency * (self.in_flight + 1) * (1 + ERROR_PENALTY * self.error_rate)
+        )
+
+
+# EndpointPool spreads requests over several Pulsar admin endpoints. The
+# API classes build their URLs from the first (primary) endpoint and the
+# transport rewrites them to the endpoint picked for each attempt. An
+# endpoint is picked with "power of two choices": two random healthy
+# endpoints are compared and the one with the better score wins, which
+# avoids sending all requests to whatever endpoint looked fastest last.
+# Endpoints that just failed are skipped until their cooldown is over,
+# unless none are left.
+class EndpointPool:
+    endpoints: List[Endpoint]
+    decay: float
+    cooldown: float
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        decay: float = DEFAULT_DECAY,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        if not urls:
+            raise ValueError("At least one endpoint is required")
+
+        self.endpoints = []
+        for url in urls:
+            if all(e.url != url.rstrip("/") for e in self.endpoints):
+                self.endpoints.append(Endpoint(url))
+
+        self.decay = decay
+        self.cooldown = cooldown
+        self.__lock__ = threading.Lock()
+
+    @property
+    def primary(self) -> Endpoint:
+        return self.endpoints[0]
+
+    @property
+    def urls(self) -> List[str]:
+        return [e.url for e in self.endpoints]
+
+    # Returns the endpoint to use for the next attempt. `exclude` are the
+    # endpoints that already failed for the request being sent.
+    def acquire(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        with self.__lock__:
+            if len(self.endpoints) == 1:
+                endpoint = self.endpoints[0]
+            else:
+                endpoint = self._pick([e for e in self.endpoints if e not in exclude])
+            endpoint.in_flight += 1
+            return endpoint
+
+    # Records the outcome of an attempt started with `acquire`. Without a
+    # latency (the request failed for reasons unrelated to the endpoint)
+    # only the in-flight count is updated.
+    def release(self, endpoint: Endpoint, latency: Optional[float], ok: bool) -> None:
+        with self.__lock__:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            if latency is None:
+                return
+
+            if endpoint.latency == 0:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.decay * (latency - endpoint.latency)
+            endpoint.error_rate += self.decay * (
+                (0.0 if ok else 1.0) - endpoint.error_rate
+            )
+            endpoint.failed_at = None if ok else time.monotonic()
+
+    # Tells if `url` is built from the primary endpoint, as opposed to
+    # URLs of other hosts such as the brokers topic calls are routed to.
+    # URLs outside of the admin path of the endpoint (lookups) count too.
+    def owns(self, url: str) -> bool:
+        return url.startswith(self.primary.url) or url.startswith(
+            self.primary.root + "/"
+        )
+
+    # Returns the URL of `url`, built from the primary endpoint, on the
+    # given endpoint.
+    def rewrite(self, url: str, endpoint: Endpoint) -> str:
+        primary = self.primary
+        if endpoint is primary or not self.owns(url):
+            return url
+        if url.startswith(primary.url):
+            return endpoint.url + url[len(primary.url) :]
+        return endpoint.root + url[len(primary.root) :]
+
+    def _pick(self, candidates: List[Endpoint]) -> Endpoint:
+        if not candidates:
+            # Everything failed already, start over
+            candidates = self.endpoints
+
+        now = time.monotonic()
+        healthy = [e for e in candidates if e.healthy(self.cooldown, now)]
+        if not healthy:
+            # Use the endpoint that failed the longest time ago
+            return min(candidates, key=lambda e: e.failed_at or 0.0)
+
+        if len(healthy) == 1:
+            return healthy[0]
+
+        a, b = random.sample(healthy, 2)
+        return a if a.score() <= b.score() else b
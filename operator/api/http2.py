@@ -0,0 +1,134 @@
+import certifi
+import threading
+from .transport import Transport, DEFAULT_WARMUP_CONNECTIONS
+from .tls import create_ssl_context
+from typing import Optional, Any, Tuple
+
+# httpx (with the `h2` extra) is an optional dependency only needed when
+# the HTTP/2 transport is enabled.
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+
+# HTTP2Transport sends requests with httpx over HTTP/2 so concurrent
+# requests (e.g. the policy updates of `TopicAPI.update`) are multiplexed
+# over a few connections instead of each needing its own. It goes
+# through the same retry, rate limiting, circuit breaker and endpoint
+# selection as Transport, only the I/O of each attempt differs.
+#
+# The SNI override of HostnameCheckAdapter is done with httpx's
+# `sni_hostname` request extension: the certificate is verified against
+# that name instead of the hostname we connect to.
+class HTTP2Transport(Transport):
+    __client__: Optional["httpx.Client"] = None
+
+    def __init__(self, base_url: str, **kwargs):
+        if httpx is None:
+            raise ImportError("The HTTP/2 transport requires httpx[http2]")
+
+        super().__init__(base_url, **kwargs)
+        self.__client_lock__ = threading.Lock()
+        self.connection_errors = (
+            httpx.TimeoutException,
+            httpx.NetworkError,
+            httpx.RemoteProtocolError,
+        )
+
+    @property
+    def client(self) -> "httpx.Client":
+        if self.__client__ is None:
+            with self.__client_lock__:
+                if self.__client__ is None:
+                    self.__client__ = httpx.Client(
+                        http2=True,
+                        # Unlike urllib3, httpx leaves checking the hostname
+                        # to the SSL context. `ssl_context` is still used by
+                        # the requests adapter of caller provided sessions.
+                        verify=(
+                            create_ssl_context(
+                                check_hostname=True, cafile=certifi.where()
+                            )
+                            if self.ssl_context is not None
+                            else True
+                        ),
+                        # Like requests, follow the redirects to the broker
+                        # owning a topic
+                        follow_redirects=True,
+                        limits=httpx.Limits(
+                            # Like pool_block for requests, only cap the
+                            # number of connections if asked to
+                            max_connections=(
+                                self.__pool_maxsize__ if self.__pool_block__ else None
+                            ),
+                            max_keepalive_connections=self.__pool_maxsize__,
+                        ),
+                    )
+
+        return self.__client__
+
+    # HTTP/2 multiplexes requests over a single connection per endpoint
+    # so only one is opened regardless of `connections`.
+    def warm_up(self, connections: int = DEFAULT_WARMUP_CONNECTIONS) -> int:
+        if connections < 1:
+            return 0
+
+        for url in self.endpoints.urls:
+            extensions = {}
+            if self.__sni__ and url.startswith("https://"):
+                extensions["sni_hostname"] = self.__sni__
+
+            self.client.head(
+                url,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                extensions=extensions,
+            )
+
+        return len(self.endpoints.urls)
+
+    def close(self) -> None:
+        super().close()
+        with self.__client_lock__:
+            if self.__client__ is not None:
+                self.__client__.close()
+                self.__client__ = None
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        session: Optional[Any] = None,
+        idempotent: Optional[bool] = None,
+    ) -> "httpx.Response":
+        # A caller provided requests session can only be used by requests
+        if session is not None:
+            return super().request(
+                method,
+                url,
+                data=data,
+                json=json,
+                session=session,
+                idempotent=idempotent,
+            )
+
+        data, headers = self._body(data, json)
+        extensions = {}
+        if self.__sni__ and url.startswith("https://"):
+            extensions["sni_hostname"] = self.__sni__
+
+        def send(url: str, timeout: Tuple[float, float]) -> "httpx.Response":
+            connect, read = timeout
+            return self.client.request(
+                method,
+                url,
+                content=data if isinstance(data, (str, bytes)) else None,
+                data=data if isinstance(data, dict) else None,
+                headers={**headers, **self._headers()},
+                timeout=httpx.Timeout(read, connect=connect),
+                extensions=extensions,
+            )
+
+        return self._send_with_retries(method, url, send, idempotent)
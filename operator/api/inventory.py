@@ -0,0 +1,163 @@
+from .cache import TTLCache
+from typing import Any, FrozenSet, Iterable, Optional
+
+# How long (in seconds) something seen in Pulsar is assumed to still be
+# there. Changes made by the operator itself update the inventory right
+# away, this only bounds how long changes made by others go unnoticed.
+DEFAULT_INVENTORY_TTL = 60.0
+# How long (in seconds) a tenant or namespace found missing is assumed to
+# still be missing. The handlers of everything it contains retry every
+# few seconds, this lets one of them find out per interval for all.
+DEFAULT_MISSING_TTL = 5.0
+DEFAULT_INVENTORY_SIZE = 100000
+
+PERSISTENCES = ("persistent", "non-persistent")
+
+
+def _topic_prefix(persistence: str, tenant: str, namespace: Optional[str] = None):
+    if namespace is None:
+        return f"{persistence}://{tenant}/"
+    return f"{persistence}://{tenant}/{namespace}/"
+
+
+def _persistence(topic: Any) -> str:
+    return "persistent" if topic.persistent else "non-persistent"
+
+
+# Inventory remembers the tenants, namespaces and topics the API classes
+# have seen in Pulsar so the existence checks the handlers start with
+# don't cost a call every time. It's owned by the API facade and shared
+# by its API classes, which keep it up to date with the results of their
+# own calls: what's found or created is added, what's deleted or not
+# found anymore is dropped (along with what it contained).
+#
+# Topics are known individually, with their number of partitions, or
+# through the topic list of their namespace that's fetched anyway to
+# look for a topic.
+#
+# Tenants and namespaces found missing are remembered for a shorter
+# time, unless the operator creates them in the meantime.
+class Inventory:
+    tenants: TTLCache[str, bool]
+    namespaces: TTLCache[str, bool]
+    missing_tenants: TTLCache[str, bool]
+    missing_namespaces: TTLCache[str, bool]
+    # Full topic name -> number of partitions (0 if not partitioned)
+    topics: TTLCache[str, int]
+    # Topic list of a namespace, "persistent://tenant/namespace/all" or
+    # ".../partitioned" for the partitioned topics only
+    topic_lists: TTLCache[str, FrozenSet[str]]
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_INVENTORY_TTL,
+        missing_ttl: float = DEFAULT_MISSING_TTL,
+        maxsize: int = DEFAULT_INVENTORY_SIZE,
+    ):
+        self.tenants = TTLCache(ttl, maxsize)
+        self.namespaces = TTLCache(ttl, maxsize)
+        self.topics = TTLCache(ttl, maxsize)
+        self.topic_lists = TTLCache(ttl, maxsize)
+        self.missing_tenants = TTLCache(missing_ttl, maxsize)
+        self.missing_namespaces = TTLCache(missing_ttl, maxsize)
+
+    def clear(self) -> None:
+        for cache in (
+            self.tenants,
+            self.namespaces,
+            self.topics,
+            self.topic_lists,
+            self.missing_tenants,
+            self.missing_namespaces,
+        ):
+            cache.clear()
+
+    # Returns whether the tenant exists, or None if the inventory doesn't
+    # know.
+    def has_tenant(self, name: str) -> Optional[bool]:
+        if name in self.tenants:
+            return True
+        if name in self.missing_tenants:
+            return False
+        return None
+
+    def add_tenant(self, name: str) -> None:
+        self.tenants.set(name, True)
+        self.missing_tenants.pop(name)
+
+    def remove_tenant(self, name: str) -> None:
+        self.tenants.pop(name)
+        self.missing_tenants.set(name, True)
+        self.namespaces.discard_prefix(f"{name}/")
+        for persistence in PERSISTENCES:
+            self.topics.discard_prefix(_topic_prefix(persistence, name))
+            self.topic_lists.discard_prefix(_topic_prefix(persistence, name))
+
+    # Returns whether the namespace exists, or None if the inventory
+    # doesn't know. Namespaces of a missing tenant are missing too.
+    def has_namespace(self, tenant: str, name: str) -> Optional[bool]:
+        key = f"{tenant}/{name}"
+        if key in self.namespaces:
+            return True
+        if key in self.missing_namespaces or tenant in self.missing_tenants:
+            return False
+        return None
+
+    def add_namespace(self, tenant: str, name: str) -> None:
+        self.namespaces.set(f"{tenant}/{name}", True)
+        self.missing_namespaces.pop(f"{tenant}/{name}")
+        # A namespace can only be created in an existing tenant
+        self.add_tenant(tenant)
+
+    def remove_namespace(self, tenant: str, name: str) -> None:
+        self.namespaces.pop(f"{tenant}/{name}")
+        self.missing_namespaces.set(f"{tenant}/{name}", True)
+        for persistence in PERSISTENCES:
+            self.topics.discard_prefix(_topic_prefix(persistence, tenant, name))
+            self.topic_lists.discard_prefix(_topic_prefix(persistence, tenant, name))
+
+    # Returns whether the topic exists with the kind (partitioned or not)
+    # it's expected to have, or None if the inventory doesn't know.
+    def has_topic(self, topic: Any) -> Optional[bool]:
+        partitions = self.topics.get(topic.full_name)
+        if partitions is not None:
+            return (partitions > 0) == (topic.partitions > 0)
+
+        names = self.topic_lists.get(self._list_key(topic))
+        if names is not None:
+            return topic.full_name in names
+        return None
+
+    # Returns the number of partitions of a known topic
+    def topic_partitions(self, topic: Any) -> Optional[int]:
+        return self.topics.get(topic.full_name)
+
+    def add_topic(self, topic: Any, partitions: Optional[int] = None) -> None:
+        if partitions is None:
+            partitions = topic.partitions
+        self.topics.set(topic.full_name, partitions)
+        self.topic_lists.update(
+            self._list_key(topic, partitions > 0),
+            lambda names: names | {topic.full_name},
+        )
+        self.add_namespace(topic.tenant, topic.namespace)
+
+    def remove_topic(self, topic: Any) -> None:
+        self.topics.pop(topic.full_name)
+        for partitioned in (False, True):
+            self.topic_lists.update(
+                self._list_key(topic, partitioned),
+                lambda names: names - {topic.full_name},
+            )
+
+    # Records the topic list of the namespace of `topic` (the partitioned
+    # topics if it's partitioned)
+    def add_topic_list(self, topic: Any, names: Iterable[str]) -> None:
+        self.topic_lists.set(self._list_key(topic), frozenset(names))
+        self.add_namespace(topic.tenant, topic.namespace)
+
+    def _list_key(self, topic: Any, partitioned: Optional[bool] = None) -> str:
+        if partitioned is None:
+            partitioned = topic.partitions > 0
+        prefix = _topic_prefix(_persistence(topic), topic.tenant, topic.namespace)
+        return prefix + ("partitioned" if partitioned else "all")
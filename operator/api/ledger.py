@@ -0,0 +1,95 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+# CallLedger adds up the Pulsar API calls made by a single reconcile. Like
+# the deadline it's set for the duration of a handler with
+# `ledger_scope()` and picked up by the API classes and the transport for
+# every call made while it runs. A ledger with a parent also records
+# everything in its parent, which is how the API classes count the
+# retries of a single call without hiding them from the handler.
+class CallLedger:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    # Time spent waiting on the calls, in seconds
+    latency: float = 0.0
+
+    def __init__(self, parent: Optional["CallLedger"] = None):
+        self.__lock__ = threading.Lock()
+        self.__parent__ = parent
+
+    def record(
+        self, status_code: Optional[int], size: int = 0, duration: float = 0.0
+    ) -> None:
+        with self.__lock__:
+            self.calls += 1
+            self.bytes_received += size
+            self.latency += duration
+            if status_code is None or status_code >= 500:
+                self.errors += 1
+        if self.__parent__ is not None:
+            self.__parent__.record(status_code, size, duration)
+
+    def record_retry(self) -> None:
+        with self.__lock__:
+            self.retries += 1
+        if self.__parent__ is not None:
+            self.__parent__.record_retry()
+
+    # Compact summary shown in the status of the resource, e.g.
+    # "calls=12 ms=340 retries=1 bytes=18432"
+    def summary(self) -> str:
+        return (
+            f"calls={self.calls} ms={self.latency * 1000:.0f} "
+            f"retries={self.retries} bytes={self.bytes_received}"
+        )
+
+
+_current: ContextVar[Optional[CallLedger]] = ContextVar(
+    "pulsar_api_ledger", default=None
+)
+
+
+def current_ledger() -> Optional[CallLedger]:
+    return _current.get()
+
+
+# Records the calls made by the block in a new ledger
+@contextmanager
+def ledger_scope() -> Iterator[CallLedger]:
+    ledger = CallLedger()
+    token = _current.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current.reset(token)
+
+
+# Records a single API call in its own ledger, which passes everything on
+# to the ledger of the running handler (if any).
+@contextmanager
+def call_scope() -> Iterator[CallLedger]:
+    ledger = CallLedger(parent=_current.get())
+    token = _current.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current.reset(token)
+
+
+def record_call(
+    status_code: Optional[int], size: int = 0, duration: float = 0.0
+) -> None:
+    ledger = _current.get()
+    if ledger is not None:
+        ledger.record(status_code, size, duration)
+
+
+def record_retry() -> None:
+    ledger = _current.get()
+    if ledger is not None:
+        ledger.record_retry()
@@ -0,0 +1,203 @@
+import threading
+import time
+import zlib
+from .circuit_breaker import CircuitOpenException
+from .codec import json_loads
+from .deadline import DeadlineExceeded
+from .transport import Transport, TransportBase
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional, Tuple
+
+# How long bundle boundaries and bundle owners are cached (in seconds)
+DEFAULT_OWNER_TTL = 300.0
+
+# Statuses returned by a broker that doesn't (or no longer) own a topic,
+# e.g. while its bundle is being unloaded
+NOT_OWNER_STATUS_CODES = frozenset([307, 503])
+
+_MASK = 0xFFFFFFFF
+
+
+class LookupException(Exception):
+    pass
+
+
+# Hash Pulsar assigns topics to the bundles of their namespace with: the
+# CRC32 of the full topic name (Guava's Hashing.crc32() used by the
+# NamespaceBundleFactory of the broker).
+def bundle_hash(name: str) -> int:
+    return zlib.crc32(name.encode("utf-8")) & _MASK
+
+
+# Tells if the response went through a redirect, which means the broker we
+# sent the request to didn't own the topic.
+def redirected(res: Any) -> bool:
+    return bool(getattr(res, "history", None))
+
+
+# BrokerRouterBase finds the broker owning a topic so topic admin calls
+# can be sent to it directly instead of being forwarded (or redirected)
+# by the proxy. Topics are assigned to the bundles of their namespace by
+# the hash of their name, so a single lookup per bundle is enough for all
+# the topics of that bundle. Both the bundle boundaries and the owners
+# are cached for `ttl` seconds and dropped as soon as a broker turns out
+# not to own a topic anymore.
+#
+# This class holds everything but the I/O, see BrokerRouter and
+# AsyncBrokerRouter.
+class BrokerRouterBase:
+    ttl: float
+
+    __base_url__: str
+    __root_url__: str
+    __admin_path__: str
+    __tls__: bool
+
+    def __init__(self, transport: TransportBase, ttl: float = DEFAULT_OWNER_TTL):
+        self.transport = transport
+        self.ttl = ttl
+        self.__lock__ = threading.Lock()
+        self.__bundles__: Dict[str, Tuple[List[int], float]] = {}
+        self.__owners__: Dict[str, Tuple[str, float]] = {}
+
+        self.__base_url__ = transport.base_url.rstrip("/")
+        parts = urlsplit(self.__base_url__)
+        # Lookups are built from the primary endpoint like admin calls so
+        # they fail over to the other endpoints too
+        self.__root_url__ = transport.endpoints.primary.root
+        self.__admin_path__ = parts.path
+        self.__tls__ = parts.scheme == "https"
+
+        # Lookups are made outside of the admin path
+        for endpoint in transport.endpoints.endpoints:
+            transport.add_route(endpoint.root)
+
+    # Errors of `resolve` after which the request is sent to the proxy
+    # instead of the owner.
+    @property
+    def errors(self) -> Tuple[type, ...]:
+        return (
+            LookupException,
+            CircuitOpenException,
+            DeadlineExceeded,
+            *self.transport.connection_errors,
+        )
+
+    # Returns the URL `url` (built from the API base URL) on the broker
+    # with the given admin base URL.
+    def rewrite(self, url: str, owner: str) -> str:
+        if not url.startswith(self.__base_url__):
+            return url
+        return owner + url[len(self.__base_url__) :]
+
+    def invalidate(self, topic) -> None:
+        namespace = self._namespace(topic)
+        with self.__lock__:
+            cached = self.__bundles__.pop(namespace, None)
+            if cached is not None:
+                bundle = self._bundle(topic, cached[0])
+                self.__owners__.pop(bundle, None)
+
+    def _namespace(self, topic) -> str:
+        return f"{topic.tenant}/{topic.namespace}"
+
+    def _bundles_url(self, topic) -> str:
+        return "{base_url}/namespaces/{tenant}/{namespace}/bundles".format(
+            base_url=self.__base_url__,
+            tenant=topic.tenant,
+            namespace=topic.namespace,
+        )
+
+    def _lookup_url(self, topic) -> str:
+        return "{root_url}/lookup/v2/topic/{persistence}/{tenant}/{namespace}/{topic}".format(
+            root_url=self.__root_url__,
+            persistence="persistent" if topic.persistent else "non-persistent",
+            tenant=topic.tenant,
+            namespace=topic.namespace,
+            topic=topic.name,
+        )
+
+    # Returns the name of the bundle (e.g. "tenant/ns/0x00000000_0x40000000")
+    # the topic belongs to.
+    def _bundle(self, topic, boundaries: List[int]) -> str:
+        code = bundle_hash(topic.full_name)
+        lower, upper = boundaries[-2], boundaries[-1]
+        for i in range(len(boundaries) - 1):
+            if boundaries[i] <= code < boundaries[i + 1]:
+                lower, upper = boundaries[i], boundaries[i + 1]
+                break
+
+        return f"{self._namespace(topic)}/0x{lower:08x}_0x{upper:08x}"
+
+    def _cached_bundles(self, topic) -> Optional[List[int]]:
+        with self.__lock__:
+            cached = self.__bundles__.get(self._namespace(topic))
+        if cached is None or cached[1] < time.monotonic():
+            return None
+        return cached[0]
+
+    def _store_bundles(self, topic, data: Any) -> List[int]:
+        try:
+            boundaries = sorted(int(b, 16) for b in data["boundaries"])
+            assert len(boundaries) >= 2
+        except Exception as e:
+            raise LookupException(f"Unable to parse bundles: {e}")
+
+        with self.__lock__:
+            self.__bundles__[self._namespace(topic)] = (
+                boundaries,
+                time.monotonic() + self.ttl,
+            )
+        return boundaries
+
+    def _cached_owner(self, bundle: str) -> Optional[str]:
+        with self.__lock__:
+            cached = self.__owners__.get(bundle)
+        if cached is None or cached[1] < time.monotonic():
+            return None
+        return cached[0]
+
+    def _store_owner(self, bundle: str, data: Any) -> str:
+        try:
+            http_url = (self.__tls__ and data.get("httpUrlTls")) or data["httpUrl"]
+            assert isinstance(http_url, str) and http_url
+        except Exception as e:
+            raise LookupException(f"Unable to parse lookup: {e}")
+
+        owner = http_url.rstrip("/") + self.__admin_path__
+        self.transport.add_route(owner)
+        with self.__lock__:
+            self.__owners__[bundle] = (owner, time.monotonic() + self.ttl)
+        return owner
+
+    def _parse(self, res: Any) -> Any:
+        if res.status_code != 200:
+            raise LookupException(f"Lookup failed with status {res.status_code}")
+        try:
+            return json_loads(res.content)
+        except Exception as e:
+            raise LookupException(f"Unable to parse response: {e}")
+
+
+class BrokerRouter(BrokerRouterBase):
+    transport: Transport
+
+    # Returns the admin base URL of the broker owning the topic.
+    def resolve(self, topic) -> str:
+        boundaries = self._cached_bundles(topic)
+        if boundaries is None:
+            data = self._fetch(self._bundles_url(topic))
+            boundaries = self._store_bundles(topic, data)
+
+        bundle = self._bundle(topic, boundaries)
+        owner = self._cached_owner(bundle)
+        if owner is None:
+            owner = self._store_owner(bundle, self._fetch(self._lookup_url(topic)))
+
+        return owner
+
+    def _fetch(self, url: str) -> Any:
+        res = self.transport.singleflight.do(
+            url, lambda: self.transport.request("GET", url)
+        )
+        return self._parse(res)
@@ -0,0 +1,154 @@
+import re
+from urllib.parse import urlsplit
+from typing import Optional, Any, List
+
+# prometheus_client is an optional dependency only needed to export the
+# API call metrics.
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None  # type: ignore
+
+# Latency buckets in seconds, from a cached lookup to a slow policy update
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Response size buckets in bytes, up to the topic lists of big namespaces
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Status label of calls that didn't get a response
+NO_RESPONSE = "error"
+
+# Segments naming resources after the collection at the start of a path
+RESOURCE_SEGMENTS = {
+    "tenants": ["{tenant}"],
+    "namespaces": ["{tenant}", "{namespace}"],
+    "persistent": ["{tenant}", "{namespace}", "{topic}"],
+    "non-persistent": ["{tenant}", "{namespace}", "{topic}"],
+    "schemas": ["{tenant}", "{namespace}", "{topic}"],
+}
+
+# Namespace bundle range, e.g. 0x40000000_0x80000000
+BUNDLE = re.compile(r"^0x[0-9a-fA-F]{8}_0x[0-9a-fA-F]{8}$")
+
+
+def _template(segments: List[str]) -> List[str]:
+    if not segments:
+        return []
+
+    head, rest = segments[0], segments[1:]
+
+    # Lookup of the broker owning a topic, /lookup/v2/topic/persistent/...
+    if head == "lookup" and rest[:2] == ["v2", "topic"]:
+        return [head, *rest[:2], *_template(rest[2:])]
+
+    names = list(RESOURCE_SEGMENTS.get(head, []))
+    # Topics of a namespace, /persistent/{tenant}/{namespace}/partitioned
+    if len(names) == 3 and rest[2:] == ["partitioned"]:
+        names[2] = "partitioned"
+
+    template = [head, *names[: len(rest)]]
+    previous = None
+    for segment in rest[len(names) :]:
+        if previous == "permissions":
+            segment = "{role}"
+        elif BUNDLE.match(segment):
+            segment = "{bundle}"
+        template.append(segment)
+        previous = segment
+
+    return template
+
+
+# endpoint_template turns the URL of an admin API call into the endpoint
+# it calls with the names of tenants, namespaces, topics, roles and
+# bundles replaced by placeholders, e.g.
+# /persistent/{tenant}/{namespace}/{topic}/permissions/{role}. This keeps
+# the number of label values down to the number of endpoints used.
+def endpoint_template(url: str, base_url: str) -> str:
+    path = resource_path(url, base_url)
+    return "/" + "/".join(_template([s for s in path.split("/") if s]))
+
+
+# Returns the path of an admin API call below the base URL, e.g.
+# /persistent/public/default/orders
+def resource_path(url: str, base_url: str) -> str:
+    path = urlsplit(url).path
+    # Calls routed to another endpoint or broker share the base path
+    base_path = urlsplit(base_url).path.rstrip("/")
+    if base_path and path.startswith(f"{base_path}/"):
+        path = path[len(base_path) :]
+    return path
+
+
+# APIMetrics records Prometheus metrics of the calls made by the API
+# classes: their number and status code, latency and response size,
+# labelled by API class, method and endpoint template.
+class APIMetrics:
+    def __init__(self, registry: Optional[Any] = None):
+        if prometheus_client is None:
+            raise ImportError("API metrics require prometheus_client")
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self.registry = registry
+
+        labels = ["api", "method", "endpoint"]
+        self.requests = prometheus_client.Counter(
+            "pulsar_api_requests_total",
+            "Pulsar admin API calls",
+            [*labels, "status"],
+            registry=registry,
+        )
+        self.latency = prometheus_client.Histogram(
+            "pulsar_api_request_duration_seconds",
+            "Latency of Pulsar admin API calls, including retries",
+            labels,
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.response_size = prometheus_client.Histogram(
+            "pulsar_api_response_size_bytes",
+            "Size of Pulsar admin API response bodies",
+            labels,
+            buckets=SIZE_BUCKETS,
+            registry=registry,
+        )
+
+    def observe(
+        self,
+        api: str,
+        method: str,
+        endpoint: str,
+        status_code: Optional[int],
+        duration: float,
+        size: int = 0,
+    ) -> None:
+        status = NO_RESPONSE if status_code is None else str(status_code)
+        self.requests.labels(api, method, endpoint, status).inc()
+        self.latency.labels(api, method, endpoint).observe(duration)
+        if status_code is not None:
+            self.response_size.labels(api, method, endpoint).observe(size)
+
+
+_default: Optional[APIMetrics] = None
+
+
+# Returns the metrics registered with the default Prometheus registry,
+# created on first use since metrics can only be registered once.
+def default_metrics() -> APIMetrics:
+    global _default
+    if _default is None:
+        _default = APIMetrics()
+    return _default
+
+
+# Serves the metrics of the registry on http://<addr>:<port>/metrics
+def start_metrics_server(
+    port: int, addr: str = "0.0.0.0", registry: Optional[Any] = None
+) -> None:
+    if prometheus_client is None:
+        raise ImportError("API metrics require prometheus_client")
+
+    prometheus_client.start_http_server(
+        port, addr=addr, registry=registry or prometheus_client.REGISTRY
+    )
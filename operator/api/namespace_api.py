@@ -1,7 +1,15 @@
 from .api import BaseAPI, APIException, APIRequestType
+from .inventory import Inventory
+from .cache import TTLCache
 from models import NamespaceSpec, PulsarNamespacePolicies, RolePermissionEnum
 from pydantic import Field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# How long (in seconds) the permissions of a namespace are reused to work
+# out the topic level permissions of its topics. Changes made through the
+# NamespaceAPI drop them right away, this only bounds how long changes made
+# by others go unnoticed.
+DEFAULT_PERMISSION_TTL = 60.0
 
 
 class NamespaceNotFoundException(Exception):
@@ -45,7 +53,17 @@ class Namespace(PulsarNamespacePolicies):
 class NamespaceAPI(BaseAPI):
     __base_url__: str
 
+    # Namespaces known to exist, shared by the API classes of the facade
+    inventory: Optional[Inventory] = None
+    # Namespace permissions cached for the TopicAPI, see TopicAPI.permissions.
+    # The permissions are always fetched here, this only drops them when
+    # they change.
+    permission_cache: Optional[TTLCache[str, Dict[str, List[str]]]] = None
+
     def exists(self, namespace: Namespace) -> bool:
+        known = self._known(namespace)
+        if known is not None:
+            return known
         try:
             t = self.get(namespace)
             return t != None
@@ -53,87 +71,149 @@ class NamespaceAPI(BaseAPI):
             return False
 
     def get(self, namespace: Namespace) -> Namespace:
-        url = "{base_url}/namespaces/{tenant}/{name}".format(
+        r = self._get(self._namespace_url(namespace))
+        return self._parse_namespace(namespace, r)
+
+    def create(self, namespace: Namespace) -> Namespace:
+        r = self._put(self._namespace_url(namespace), json=namespace.api_dict())
+        self._created(namespace, r)
+        return self.get(namespace)
+
+    def update(self, namespace: Namespace) -> Namespace:
+        for method, url, value in self._policy_requests(namespace):
+            # Policy setters can safely be repeated
+            r = self._request(method, url, json=value, idempotent=True)
+            self._ensure_success(r)
+
+        return self.get(namespace)
+
+    def delete(self, namespace: Namespace) -> None:
+        r = self._delete(self._namespace_url(namespace))
+        self._deleted(namespace, r)
+
+    def permissions(self, namespace: Namespace) -> Dict[str, List[str]]:
+        r = self._get(self._permissions_url(namespace))
+        return self._parse_permissions(r)
+
+    def sync_permissions(self, namespace: Namespace) -> None:
+        current_permissions = self.permissions(namespace)
+
+        try:
+            for role, perms in namespace.permissions.items():
+                self._set_role_permissions(namespace, role, perms)
+
+            for role in self._removed_roles(namespace, current_permissions):
+                self._del_role_permissions(namespace, role)
+        finally:
+            # Even if only some of the writes went through
+            self._forget_permissions(namespace)
+
+    def _set_role_permissions(
+        self, namespace: Namespace, role: str, permissions: List[str]
+    ) -> None:
+        url = self._role_url(namespace, role)
+        r = self._post(url, json=permissions, idempotent=True)
+        self._ensure_success(r)
+
+    def _del_role_permissions(self, namespace: Namespace, role: str) -> None:
+        r = self._delete(self._role_url(namespace, role))
+        self._ensure_success(r)
+
+    def _known(self, namespace: Namespace) -> Optional[bool]:
+        if self.inventory is None:
+            return None
+        return self.inventory.has_namespace(namespace.tenant, namespace.name)
+
+    # Records what a call told about the existence of the namespace
+    def _seen(self, namespace: Namespace, exists: bool) -> None:
+        if self.inventory is None:
+            return
+        if exists:
+            self.inventory.add_namespace(namespace.tenant, namespace.name)
+        else:
+            self.inventory.remove_namespace(namespace.tenant, namespace.name)
+
+    # Drops the cached permissions of the namespace so its topics diff
+    # their permissions against the new ones
+    def _forget_permissions(self, namespace: Namespace) -> None:
+        if self.permission_cache is not None:
+            self.permission_cache.pop(f"{namespace.tenant}/{namespace.name}")
+
+    # The helpers below build the requests and handle the responses of
+    # both NamespaceAPI and AsyncNamespaceAPI, which only differ in the I/O.
+    def _namespace_url(self, namespace: Namespace) -> str:
+        return "{base_url}/namespaces/{tenant}/{name}".format(
             base_url=self.__base_url__,
             tenant=namespace.tenant,
             name=namespace.name,
         )
 
-        r = self._get(url)
+    def _permissions_url(self, namespace: Namespace) -> str:
+        return "{base_url}/namespaces/{tenant}/{namespace}/permissions".format(
+            base_url=self.__base_url__,
+            tenant=namespace.tenant,
+            namespace=namespace.name,
+        )
 
+    def _role_url(self, namespace: Namespace, role: str) -> str:
+        return "{base_url}/namespaces/{tenant}/{name}/permissions/{role}".format(
+            base_url=self.__base_url__,
+            tenant=namespace.tenant,
+            name=namespace.name,
+            role=role,
+        )
+
+    # Returns the (method, url, body) of the requests setting the policies
+    # of the namespace
+    def _policy_requests(
+        self, namespace: Namespace
+    ) -> List[Tuple[APIRequestType, str, Any]]:
+        base_url = self._namespace_url(namespace)
+        requests = []
+        for _, uri in namespace.api_uris().items():
+            method, url = uri.endpoint(base_url)
+            requests.append((APIRequestType(method), url, uri.value))
+        return requests
+
+    def _parse_namespace(self, namespace: Namespace, r: Any) -> Namespace:
         if r.status_code == 200:
             try:
-                policies = r.json()
-                return Namespace(
+                policies = self._json(r)
+                found = Namespace(
                     name=namespace.name, tenant=namespace.tenant, **policies
                 )
             except Exception as e:
                 raise ParsingException(f"Unable to parse response: {e}")
+            self._seen(namespace, True)
+            return found
         else:
             try:
                 self._handle_error(r)
             except APIException as e:
                 if e.status_code == 404:
+                    self._seen(namespace, False)
                     raise NamespaceNotFoundException()
                 raise e
 
-    def create(self, namespace: Namespace) -> Namespace:
-        url = "{base_url}/namespaces/{tenant}/{name}".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            name=namespace.name,
-        )
-
-        r = self._put(url, json=namespace.api_dict())
-
+    def _created(self, namespace: Namespace, r: Any) -> None:
         if 200 <= r.status_code <= 204:
-            return self.get(namespace)
+            self._seen(namespace, True)
         else:
+            if r.status_code == 409:
+                self._seen(namespace, True)
             self._handle_error(r)
 
-    def update(self, namespace: Namespace) -> Namespace:
-        base_url = "{base_url}/namespaces/{tenant}/{name}".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            name=namespace.name,
-        )
-
-        for _, uri in namespace.api_uris().items():
-            method, url = uri.endpoint(base_url)
-
-            r = self._request(APIRequestType(method), url, json=uri.value)
-
-            if 200 <= r.status_code <= 204:
-                continue
-            else:
-                self._handle_error(r)
-
-        return self.get(namespace)
-
-    def delete(self, namespace: Namespace) -> None:
-        url = "{base_url}/namespaces/{tenant}/{name}".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            name=namespace.name,
-        )
-
-        r = self._delete(url)
-
+    def _deleted(self, namespace: Namespace, r: Any) -> None:
+        if r.status_code in (204, 404):
+            self._seen(namespace, False)
+            self._forget_permissions(namespace)
         if r.status_code != 204:
             self._handle_error(r)
 
-    def permissions(self, namespace: Namespace) -> Dict[str, List[str]]:
-        url = "{base_url}/namespaces/{tenant}/{namespace}/permissions".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            namespace=namespace.name,
-        )
-
-        r = self._get(url)
-
+    def _parse_permissions(self, r: Any) -> Dict[str, List[str]]:
         if r.status_code == 200:
             try:
-                permissions = r.json()
+                permissions = self._json(r)
                 assert isinstance(permissions, dict)
                 return permissions
             except Exception as e:
@@ -141,40 +221,10 @@ class NamespaceAPI(BaseAPI):
         else:
             self._handle_error(r)
 
-    def sync_permissions(self, namespace: Namespace) -> None:
-        current_permissions = self.permissions(namespace)
-
-        for role, perms in namespace.permissions.items():
-            self._set_role_permissions(namespace, role, perms)
-
-        for role in current_permissions.keys():
-            if role not in namespace.permissions:
-                self._del_role_permissions(namespace, role)
-
-    def _set_role_permissions(
-        self, namespace: Namespace, role: str, permissions: List[str]
-    ) -> None:
-        url = "{base_url}/namespaces/{tenant}/{name}/permissions/{role}".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            name=namespace.name,
-            role=role,
-        )
-
-        r = self._post(url, json=permissions)
-
-        if not (200 <= r.status_code <= 204):
-            self._handle_error(r)
-
-    def _del_role_permissions(self, namespace: Namespace, role: str) -> None:
-        url = "{base_url}/namespaces/{tenant}/{name}/permissions/{role}".format(
-            base_url=self.__base_url__,
-            tenant=namespace.tenant,
-            name=namespace.name,
-            role=role,
-        )
-
-        r = self._delete(url)
-
-        if not (200 <= r.status_code <= 204):
-            self._handle_error(r)
+    # Roles that have permissions in Pulsar but not in the spec
+    def _removed_roles(
+        self, namespace: Namespace, current_permissions: Dict[str, List[str]]
+    ) -> List[str]:
+        return [
+            role for role in current_permissions if role not in namespace.permissions
+        ]
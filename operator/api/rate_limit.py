@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Optional, List
+
+# Methods that only read from the Pulsar API
+READ_METHODS = frozenset(["GET", "HEAD"])
+
+
+# TokenBucket allows `rate` requests per second on average and bursts of
+# up to `burst` requests. Instead of blocking, `reserve` takes a token
+# right away (going into debt if needed) and returns how long the caller
+# has to wait before using it. This lets the sync and async transports
+# share the bucket and sleep in their own way.
+class TokenBucket:
+    rate: float
+    burst: float
+
+    __tokens__: float
+    __updated__: float
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.__tokens__ = self.burst
+        self.__updated__ = time.monotonic()
+        self.__lock__ = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self.__lock__:
+            self._refill()
+            self.__tokens__ -= tokens
+            if self.__tokens__ >= 0:
+                return 0.0
+            return -self.__tokens__ / self.rate
+
+    # Takes the tokens only if they are available right away, for callers
+    # that drop what's over the rate instead of waiting.
+    def try_take(self, tokens: float = 1.0) -> bool:
+        with self.__lock__:
+            self._refill()
+            if self.__tokens__ < tokens:
+                return False
+            self.__tokens__ -= tokens
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.__updated__
+        self.__tokens__ = min(self.burst, self.__tokens__ + elapsed * self.rate)
+        self.__updated__ = now
+
+
+# RateLimiter caps the number of requests sent to the Pulsar API. Every
+# request takes a token from the global bucket and from the bucket of its
+# class (reads or writes) so reads can be given a larger burst than the
+# policy updates that hit the metadata store. A missing rate means no
+# limit.
+class RateLimiter:
+    bucket: Optional[TokenBucket] = None
+    read_bucket: Optional[TokenBucket] = None
+    write_bucket: Optional[TokenBucket] = None
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        read_rate: Optional[float] = None,
+        read_burst: Optional[float] = None,
+        write_rate: Optional[float] = None,
+        write_burst: Optional[float] = None,
+    ):
+        if rate:
+            self.bucket = TokenBucket(rate, burst)
+        if read_rate:
+            self.read_bucket = TokenBucket(read_rate, read_burst)
+        if write_rate:
+            self.write_bucket = TokenBucket(write_rate, write_burst)
+
+    @property
+    def unlimited(self) -> bool:
+        return not (self.bucket or self.read_bucket or self.write_bucket)
+
+    # Returns the number of seconds to wait before sending the request
+    def reserve(self, method: str) -> float:
+        buckets: List[Optional[TokenBucket]] = [self.bucket]
+        if method.upper() in READ_METHODS:
+            buckets.append(self.read_bucket)
+        else:
+            buckets.append(self.write_bucket)
+
+        return max(
+            (bucket.reserve() for bucket in buckets if bucket is not None),
+            default=0.0,
+        )
+
+
+# Limiter that never throttles
+UNLIMITED = RateLimiter()
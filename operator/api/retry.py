@@ -0,0 +1,90 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Mapping, FrozenSet
+
+# Methods that can always be retried without side effects
+IDEMPOTENT_METHODS = frozenset(["GET", "PUT", "DELETE"])
+
+# Status codes returned by Pulsar (or the proxy in front of it) when a
+# request can be tried again
+RETRY_STATUS_CODES = frozenset([429, 502, 503, 504])
+
+# 429 Too Many Requests means the request wasn't processed at all so
+# it's safe to retry for any method
+NOT_PROCESSED_STATUS_CODES = frozenset([429])
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.1
+DEFAULT_MAX_DELAY = 5.0
+
+
+# Returns the number of seconds to wait according to a Retry-After
+# header which is either a number of seconds or an HTTP date.
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+# RetryPolicy decides if and when a failed request to the Pulsar API is
+# retried. Delays use "decorrelated jitter" (each delay is picked
+# randomly between the base delay and three times the previous delay)
+# so that handlers failing at the same time don't retry in lockstep. A
+# Retry-After header sent by the API takes precedence.
+@dataclass
+class RetryPolicy:
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = DEFAULT_BASE_DELAY
+    max_delay: float = DEFAULT_MAX_DELAY
+    status_codes: FrozenSet[int] = RETRY_STATUS_CODES
+
+    def retryable(self, method: str, idempotent: Optional[bool] = None) -> bool:
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        return idempotent and self.max_attempts > 1
+
+    def retry_status(
+        self, method: str, status_code: int, idempotent: Optional[bool] = None
+    ) -> bool:
+        if status_code not in self.status_codes:
+            return False
+
+        return status_code in NOT_PROCESSED_STATUS_CODES or self.retryable(
+            method, idempotent
+        )
+
+    # Returns how long to wait before the next attempt or None if the API
+    # asked us to back off for longer than we're willing to wait, in which
+    # case the error is passed on to the caller.
+    def delay(
+        self, previous: float, headers: Optional[Mapping[str, str]] = None
+    ) -> Optional[float]:
+        if headers is not None:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_delay else None
+
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+# Policy that never retries
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER_NAME = "neuron.api"
+
+# Seconds the runtime configuration of the brokers is considered fresh
+DEFAULT_CONFIG_TTL = 60.0
+# Share of the ttl after which the configuration is refreshed in the
+# background, so it's usually refreshed before it expires
+DEFAULT_REFRESH_AHEAD = 0.75
+# Seconds a configuration that couldn't be refreshed is still served
+# before the callers have to wait for a new one (and get its errors)
+DEFAULT_MAX_STALE = 300.0
+# Seconds between two background refreshes when they fail
+DEFAULT_RETRY_DELAY = 5.0
+
+# Called with the old and the new value of a configuration key
+Listener = Callable[[Any, Any], None]
+
+
+# RuntimeConfigCache keeps the runtime configuration of the brokers
+# (GET /brokers/configuration/runtime), which the topic handlers check on
+# every run, out of the request path. The last configuration is returned
+# right away and refreshed in the background once it's getting old; the
+# callers only wait for the configuration the first time and once it's
+# more than `max_stale` seconds old because refreshing it kept failing.
+#
+# Listeners registered for a key are called (from the refresh) when its
+# value changes, e.g. when topic level policies get enabled.
+#
+# It's owned by the API facade and shared by its API classes. This class
+# refreshes the configuration in a thread, see AsyncRuntimeConfigCache.
+class RuntimeConfigCache:
+    ttl: float
+    max_stale: float
+    retry_delay: float
+
+    def __init__(
+        self,
+        fetch: Callable[[], Any],
+        ttl: float = DEFAULT_CONFIG_TTL,
+        refresh_ahead: float = DEFAULT_REFRESH_AHEAD,
+        max_stale: float = DEFAULT_MAX_STALE,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max(ttl, max_stale)
+        self.retry_delay = retry_delay
+        self.__refresh_after__ = ttl * refresh_ahead
+        self.__lock__ = threading.Lock()
+        self.__config__: Optional[Dict[str, Any]] = None
+        self.__fetched__ = 0.0
+        self.__refresh_at__ = 0.0
+        self.__refreshing__ = False
+        self.__thread__: Optional[threading.Thread] = None
+        self.__listeners__: List[Tuple[str, Listener]] = []
+
+    def get(self) -> Dict[str, Any]:
+        config = self._cached()
+        if config is None:
+            config = self.fetch()
+            self.store(config)
+        elif self._start_refresh():
+            # Threads don't inherit the context (deadline, ledger) of the
+            # handler that starts them
+            self.__thread__ = threading.Thread(
+                target=self._refresh, name="neuron-runtime-config", daemon=True
+            )
+            self.__thread__.start()
+        return config
+
+    def add_listener(self, key: str, listener: Listener) -> None:
+        with self.__lock__:
+            self.__listeners__.append((key, listener))
+
+    # Replaces the configuration and tells the listeners what changed
+    def store(self, config: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self.__lock__:
+            previous = self.__config__
+            self.__config__ = config
+            self.__fetched__ = now
+            self.__refresh_at__ = now + self.__refresh_after__
+            listeners = list(self.__listeners__)
+
+        if previous is None:
+            return
+
+        for key, listener in listeners:
+            if previous.get(key) != config.get(key):
+                try:
+                    listener(previous.get(key), config.get(key))
+                except Exception:
+                    logging.getLogger(LOGGER_NAME).exception(
+                        f"Runtime configuration listener of {key} failed"
+                    )
+
+    # Returns the configuration unless there's none or it's too old to be
+    # served while it's refreshed
+    def _cached(self) -> Optional[Dict[str, Any]]:
+        with self.__lock__:
+            if self.__config__ is None:
+                return None
+            if time.monotonic() - self.__fetched__ > self.max_stale:
+                return None
+            return self.__config__
+
+    # Tells if the caller should refresh the configuration, making sure a
+    # single refresh runs at a time
+    def _start_refresh(self) -> bool:
+        with self.__lock__:
+            if self.__refreshing__ or time.monotonic() < self.__refresh_at__:
+                return False
+            self.__refreshing__ = True
+            return True
+
+    def _refresh_failed(self, e: Exception) -> None:
+        with self.__lock__:
+            self.__refresh_at__ = time.monotonic() + self.retry_delay
+        logging.getLogger(LOGGER_NAME).warning(
+            f"Unable to refresh the broker runtime configuration: {e}"
+        )
+
+    def _refresh_done(self) -> None:
+        with self.__lock__:
+            self.__refreshing__ = False
+
+    def _refresh(self) -> None:
+        try:
+            self.store(self.fetch())
+        except Exception as e:
+            self._refresh_failed(e)
+        finally:
+            self._refresh_done()
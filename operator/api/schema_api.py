@@ -1,6 +1,6 @@
 import json
 from models import SchemaSpec
-from .api import BaseAPI, APIException, APIRequestType
+from .api import BaseAPI, APIException, APIRequestType, json_loads
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
@@ -54,12 +54,15 @@ class Schema:
 
     @classmethod
     def from_api(cls, data: str, **kwargs):
-        schema = json.loads(data)
+        schema = json_loads(data)
         return cls(**dict(kwargs, schema=schema))
 
     def dict(self) -> Dict[str, str]:
         # API expects the nested schema field to be a JSON string instead
         # of a nested object
+        # The string is encoded with the standard library on purpose:
+        # Pulsar versions schemas by their exact bytes so the formatting
+        # must not depend on which JSON codec is installed.
         return no_none(
             {
                 "type": self.type,
@@ -73,18 +76,40 @@ class SchemaAPI(BaseAPI):
     __base_url__: str
 
     def get(self, schema: Schema) -> Schema:
-        url = "{base_url}/schemas/{tenant}/{namespace}/{topic}/schema".format(
+        r = self._get(self._schema_url(schema))
+        return self._parse_schema(r)
+
+    def exists(self, schema: Schema) -> bool:
+        try:
+            s = self.get(schema)
+            return s != None
+        except SchemaNotFoundException:
+            return False
+
+    def update(self, schema: Schema) -> Schema:
+        r = self._post(self._schema_url(schema), json=schema.dict())
+        return self._updated(schema, r)
+
+    def delete(self, schema: Schema) -> None:
+        r = self._delete(self._schema_url(schema), json=schema.dict())
+
+        if r.status_code != 200:
+            self._handle_error(r)
+
+    # The helpers below build the requests and handle the responses of
+    # both SchemaAPI and AsyncSchemaAPI, which only differ in the I/O.
+    def _schema_url(self, schema: Schema) -> str:
+        return "{base_url}/schemas/{tenant}/{namespace}/{topic}/schema".format(
             base_url=self.__base_url__,
             tenant=schema.tenant,
             namespace=schema.namespace,
             topic=schema.topic,
         )
 
-        r = self._get(url)
-
+    def _parse_schema(self, r: Any) -> Schema:
         if r.status_code == 200:
             try:
-                data = r.json()
+                data = self._json(r)
                 return Schema.from_api(**data)
             except Exception as e:
                 raise ParsingException(f"Unable to parse response: {e}")
@@ -96,28 +121,12 @@ class SchemaAPI(BaseAPI):
                     raise SchemaNotFoundException()
                 raise e
 
-    def exists(self, schema: Schema) -> bool:
-        try:
-            s = self.get(schema)
-            return s != None
-        except SchemaNotFoundException:
-            return False
-
-    def update(self, schema: Schema) -> Schema:
-        url = "{base_url}/schemas/{tenant}/{namespace}/{topic}/schema".format(
-            base_url=self.__base_url__,
-            tenant=schema.tenant,
-            namespace=schema.namespace,
-            topic=schema.topic,
-        )
-
-        r = self._post(url, json=schema.dict())
-
+    def _updated(self, schema: Schema, r: Any) -> Schema:
         # API docs say 200 is success but I've only ever seen
         # 202. Let's catch 200-202 just in case as success ;)
         if 200 <= r.status_code <= 202:
             try:
-                data = r.json()
+                data = self._json(r)
                 # I'm expexting `{"version": {"version": 1}}` back
                 if (
                     isinstance(data, dict)
@@ -136,16 +145,3 @@ class SchemaAPI(BaseAPI):
                 if e.status_code == 409:  # 409 Conflict
                     raise IncompatibleSchemaException("Schema is incompatible")
                 raise e
-
-    def delete(self, schema: Schema) -> None:
-        url = "{base_url}/schemas/{tenant}/{namespace}/{topic}/schema".format(
-            base_url=self.__base_url__,
-            tenant=schema.tenant,
-            namespace=schema.namespace,
-            topic=schema.topic,
-        )
-
-        r = self._delete(url, json=schema.dict())
-
-        if r.status_code != 200:
-            self._handle_error(r)
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from .deadline import Deadline, DeadlineExceeded, current_deadline
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _exceeded(deadline: Deadline) -> DeadlineExceeded:
+    return DeadlineExceeded(
+        f"Deadline of {deadline.timeout:.0f} seconds exceeded waiting for a shared call"
+    )
+
+
+class _Call:
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+# Group coalesces concurrent calls sharing the same key: the first caller
+# runs the function while the others wait for it and get the same result
+# (or exception). Once the call completes the key is forgotten, so this
+# is not a cache, only requests that are in flight at the same time are
+# shared. The callers waiting for the call give up once their own
+# deadline is exceeded, which may be before the deadline of the first.
+class Group:
+    shared: int = 0
+
+    def __init__(self):
+        self.__lock__ = threading.Lock()
+        self.__calls__: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self.__lock__:
+            call = self.__calls__.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls__[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            deadline = current_deadline()
+            if not call.done.wait(deadline.remaining() if deadline else None):
+                raise _exceeded(deadline)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock__:
+                del self.__calls__[key]
+            call.done.set()
+
+
+# AsyncGroup is the asyncio counterpart of Group. The call runs in its own
+# task so that a cancelled caller doesn't cancel the request for the
+# others waiting on it.
+class AsyncGroup:
+    shared: int = 0
+
+    def __init__(self):
+        self.__calls__: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self.__calls__.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            task = self.__calls__[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._done(key, t))
+
+        deadline = current_deadline()
+        if deadline is None:
+            return await asyncio.shield(task)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except asyncio.TimeoutError:
+            # The call itself might have timed out as well
+            if task.done():
+                raise
+            raise _exceeded(deadline)
+
+    def _done(self, key: str, task: asyncio.Future) -> None:
+        if self.__calls__.get(key) is task:
+            del self.__calls__[key]
+
+        # Mark the exception as retrieved in case all callers went away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from .rate_limit import TokenBucket
+from typing import Optional, Dict, List, Tuple
+
+LOGGER_NAME = "neuron.api"
+
+# Calls taking longer than this (in seconds, retries included) are logged
+DEFAULT_SLOW_CALL_THRESHOLD = 1.0
+# Responses larger than this (in bytes) are logged, e.g. the topic list of
+# a namespace that keeps growing
+DEFAULT_LARGE_RESPONSE_SIZE = 1024 * 1024
+# Lines logged per second on average and in a burst. What's over the rate
+# is counted and reported with the next line that gets through.
+DEFAULT_LOG_RATE = 1.0
+DEFAULT_LOG_BURST = 10
+# Seconds between two summaries of the slowest endpoints, 0 disables them
+DEFAULT_SUMMARY_INTERVAL = 300.0
+DEFAULT_SUMMARY_TOP = 10
+
+
+class EndpointStats:
+    calls: int = 0
+    slow: int = 0
+    # Time spent in the calls, in seconds
+    total: float = 0.0
+    max: float = 0.0
+    largest: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def record(self, duration: float, size: int, slow: bool) -> None:
+        self.calls += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.largest = max(self.largest, size)
+        if slow:
+            self.slow += 1
+
+
+# SlowCallLog logs the Pulsar API calls that are slower or return more
+# data than the thresholds, with the endpoint template, the resource and
+# the number of retries so they can be found and grouped in the operator
+# logs. The lines are rate limited so a slow broker doesn't flood them.
+#
+# Every call is also added up per endpoint, and every `summary_interval`
+# seconds the `top` slowest endpoints (by mean latency) are logged and
+# the counts start over.
+class SlowCallLog:
+    threshold: float
+    size_threshold: int
+    summary_interval: float
+    top: int
+    logger: logging.Logger
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SLOW_CALL_THRESHOLD,
+        size_threshold: int = DEFAULT_LARGE_RESPONSE_SIZE,
+        rate: float = DEFAULT_LOG_RATE,
+        burst: float = DEFAULT_LOG_BURST,
+        summary_interval: float = DEFAULT_SUMMARY_INTERVAL,
+        top: int = DEFAULT_SUMMARY_TOP,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.threshold = threshold
+        self.size_threshold = size_threshold
+        self.summary_interval = summary_interval
+        self.top = top
+        self.logger = logger or logging.getLogger(LOGGER_NAME)
+        self.__bucket__ = TokenBucket(rate, burst)
+        self.__lock__ = threading.Lock()
+        self.__suppressed__ = 0
+        self.__stats__: Dict[Tuple[str, str], EndpointStats] = {}
+        self.__summary_at__ = time.monotonic() + summary_interval
+
+    def observe(
+        self,
+        api: str,
+        method: str,
+        endpoint: str,
+        resource: str,
+        status_code: Optional[int],
+        duration: float,
+        size: int = 0,
+        retries: int = 0,
+    ) -> None:
+        slow = duration >= self.threshold
+        large = size >= self.size_threshold
+
+        with self.__lock__:
+            key = (method, endpoint)
+            stats = self.__stats__.get(key)
+            if stats is None:
+                stats = self.__stats__[key] = EndpointStats()
+            stats.record(duration, size, slow)
+
+        if slow or large:
+            self._log_call(
+                "Slow Pulsar API call" if slow else "Large Pulsar API response",
+                {
+                    "api": api,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "resource": resource,
+                    "status": status_code,
+                    "ms": round(duration * 1000),
+                    "bytes": size,
+                    "retries": retries,
+                },
+            )
+
+        if self.summary_interval > 0 and time.monotonic() >= self.__summary_at__:
+            self.log_summary()
+
+    # Returns the `top` slowest endpoints since the last summary, as
+    # ("GET /tenants/{tenant}", stats) pairs
+    def slowest(self) -> List[Tuple[str, EndpointStats]]:
+        with self.__lock__:
+            stats = list(self.__stats__.items())
+
+        stats.sort(key=lambda item: item[1].mean, reverse=True)
+        return [(f"{method} {endpoint}", s) for (method, endpoint), s in stats][
+            : self.top
+        ]
+
+    # Logs the slowest endpoints and starts counting over
+    def log_summary(self) -> None:
+        slowest = self.slowest()
+        with self.__lock__:
+            self.__stats__ = {}
+            self.__summary_at__ = time.monotonic() + self.summary_interval
+
+        if not slowest:
+            return
+
+        lines = [
+            f"{name} calls={s.calls} slow={s.slow} mean_ms={s.mean * 1000:.0f} "
+            f"max_ms={s.max * 1000:.0f} max_bytes={s.largest}"
+            for name, s in slowest
+        ]
+        self.logger.info(
+            "Slowest Pulsar API endpoints:\n  " + "\n  ".join(lines),
+            extra={
+                "pulsar_api_endpoints": [
+                    {
+                        "endpoint": name,
+                        "calls": s.calls,
+                        "slow": s.slow,
+                        "mean_ms": round(s.mean * 1000),
+                        "max_ms": round(s.max * 1000),
+                        "max_bytes": s.largest,
+                    }
+                    for name, s in slowest
+                ]
+            },
+        )
+
+    def _log_call(self, message: str, fields: dict) -> None:
+        if not self.__bucket__.try_take():
+            with self.__lock__:
+                self.__suppressed__ += 1
+            return
+
+        with self.__lock__:
+            fields["suppressed"], self.__suppressed__ = self.__suppressed__, 0
+
+        # The fields are in the message for plain text logs and in the
+        # record for structured (JSON) ones
+        self.logger.warning(
+            f"{message}: " + " ".join(f"{k}={v}" for k, v in fields.items()),
+            extra={"pulsar_api_call": fields},
+        )
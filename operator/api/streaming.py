@@ -0,0 +1,76 @@
+import json
+import re
+from typing import Any, Iterator, Union
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+# Yields the elements of a JSON array one at a time instead of building
+# the whole list, so a caller looking for one element can stop early.
+# Raises ValueError if the document isn't a JSON array.
+def iter_json_array(document: Union[str, bytes]) -> Iterator[Any]:
+    if isinstance(document, bytes):
+        document = document.decode("utf-8")
+
+    pos = _WHITESPACE.match(document, 0).end()
+    if document[pos : pos + 1] != "[":
+        raise ValueError("Expected a JSON array")
+
+    pos = _WHITESPACE.match(document, pos + 1).end()
+    if document[pos : pos + 1] == "]":
+        return
+
+    while True:
+        element, pos = _decoder.raw_decode(document, pos)
+        yield element
+
+        pos = _WHITESPACE.match(document, pos).end()
+        separator = document[pos : pos + 1]
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' at position {pos}")
+        pos = _WHITESPACE.match(document, pos + 1).end()
+
+
+_WHITESPACE_BYTES = b" \t\n\r"
+
+
+def _char_before(document: bytes, pos: int) -> bytes:
+    while pos > 0 and document[pos - 1] in _WHITESPACE_BYTES:
+        pos -= 1
+    return document[pos - 1 : pos]
+
+
+def _char_after(document: bytes, pos: int) -> bytes:
+    while pos < len(document) and document[pos] in _WHITESPACE_BYTES:
+        pos += 1
+    return document[pos : pos + 1]
+
+
+# Tells if a JSON array of strings contains `value`. The raw bytes are
+# searched for the encoded string, which finds it without decoding the
+# document. A match only counts if it's a whole element of the array: a
+# quote inside another string is always escaped so a match preceded by
+# `[` or `,` can't be part of another element. Only if the document has
+# escape sequences, and could hold `value` encoded differently, is the
+# array decoded element by element.
+def json_array_contains(document: bytes, value: str) -> bool:
+    if _char_after(document, 0) != b"[":
+        raise ValueError("Expected a JSON array")
+
+    needle = json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    start = document.find(needle)
+    while start != -1:
+        if _char_before(document, start) in (b"[", b",") and _char_after(
+            document, start + len(needle)
+        ) in (b",", b"]"):
+            return True
+        start = document.find(needle, start + 1)
+
+    if b"\\" not in document:
+        return False
+
+    return any(element == value for element in iter_json_array(document))
@@ -1,6 +1,8 @@
 from .api import BaseAPI, APIException, APIRequestType
+from .inventory import Inventory
 from models import TenantSpec, PulsarTenantSettings
 from pydantic import Field
+from typing import Any, Optional
 
 
 class TenantNotFoundException(Exception):
@@ -26,7 +28,13 @@ class Tenant(PulsarTenantSettings):
 class TenantAPI(BaseAPI):
     __base_url__: str
 
+    # Tenants known to exist, shared by the API classes of the facade
+    inventory: Optional[Inventory] = None
+
     def exists(self, tenant: Tenant) -> bool:
+        known = self._known(tenant)
+        if known is not None:
+            return known
         try:
             t = self.get(tenant)
             return t != None
@@ -34,60 +42,75 @@ class TenantAPI(BaseAPI):
             return False
 
     def get(self, tenant: Tenant) -> Tenant:
-        url = "{base_url}/tenants/{name}".format(
+        r = self._get(self._tenant_url(tenant))
+        return self._parse_tenant(tenant, r)
+
+    def create(self, tenant: Tenant) -> Tenant:
+        r = self._put(self._tenant_url(tenant), json=tenant.api_dict())
+        self._created(tenant, r)
+        return self.get(tenant)
+
+    def update(self, tenant: Tenant) -> Tenant:
+        r = self._post(
+            self._tenant_url(tenant), json=tenant.api_dict(), idempotent=True
+        )
+        self._ensure_success(r)
+        return self.get(tenant)
+
+    def delete(self, tenant: Tenant) -> None:
+        r = self._delete(self._tenant_url(tenant))
+        self._deleted(tenant, r)
+
+    # The helpers below build the requests and handle the responses of
+    # both TenantAPI and AsyncTenantAPI, which only differ in the I/O.
+    def _tenant_url(self, tenant: Tenant) -> str:
+        return "{base_url}/tenants/{name}".format(
             base_url=self.__base_url__,
             name=tenant.name,
         )
 
-        r = self._get(url)
-
+    def _parse_tenant(self, tenant: Tenant, r: Any) -> Tenant:
         if r.status_code == 200:
             try:
-                settings = r.json()
-                return Tenant(name=tenant.name, **settings)
+                settings = self._json(r)
+                found = Tenant(name=tenant.name, **settings)
             except Exception as e:
                 raise ParsingException(f"Unable to parse response: {e}")
+            self._seen(tenant, True)
+            return found
         else:
             try:
                 self._handle_error(r)
             except APIException as e:
                 if e.status_code == 404:
+                    self._seen(tenant, False)
                     raise TenantNotFoundException()
                 raise e
 
-    def create(self, tenant: Tenant) -> Tenant:
-        url = "{base_url}/tenants/{name}".format(
-            base_url=self.__base_url__,
-            name=tenant.name,
-        )
-
-        r = self._put(url, json=tenant.api_dict())
-
-        if 200 <= r.status_code <= 204:
-            return self.get(tenant)
-        else:
-            self._handle_error(r)
-
-    def update(self, tenant: Tenant) -> Tenant:
-        url = "{base_url}/tenants/{name}".format(
-            base_url=self.__base_url__,
-            name=tenant.name,
-        )
-
-        r = self._post(url, json=tenant.api_dict())
-
+    def _created(self, tenant: Tenant, r: Any) -> None:
         if 200 <= r.status_code <= 204:
-            return self.get(tenant)
+            self._seen(tenant, True)
         else:
+            if r.status_code == 409:
+                self._seen(tenant, True)
             self._handle_error(r)
 
-    def delete(self, tenant: Tenant) -> None:
-        url = "{base_url}/tenants/{name}".format(
-            base_url=self.__base_url__,
-            name=tenant.name,
-        )
-
-        r = self._delete(url)
-
+    def _deleted(self, tenant: Tenant, r: Any) -> None:
+        if r.status_code in (204, 404):
+            self._seen(tenant, False)
         if r.status_code != 204:
             self._handle_error(r)
+
+    def _known(self, tenant: Tenant) -> Optional[bool]:
+        if self.inventory is None:
+            return None
+        return self.inventory.has_tenant(tenant.name)
+
+    # Records what a call told about the existence of the tenant
+    def _seen(self, tenant: Tenant, exists: bool) -> None:
+        if self.inventory is None:
+            return
+        if exists:
+            self.inventory.add_tenant(tenant.name)
+        else:
+            self.inventory.remove_tenant(tenant.name)
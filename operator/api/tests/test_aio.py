@@ -0,0 +1,283 @@
+from ..aio import AsyncAPI
+from ..aio.transport import DEFAULT_POOL_MAXSIZE
+from ..tenant_api import Tenant
+from ..namespace_api import Namespace
+from ..topic_api import Topic
+from ..api import APIException
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from models import RolePermissionEnum
+import asyncio
+import pytest
+
+
+# Runs `test(api, requests)` against a local Pulsar API fake serving the
+# given routes. `requests` is a list of (method, path, body) tuples of
+# all the requests the fake received.
+def run(routes: dict, test):
+    async def main():
+        requests = []
+
+        async def handle(request: web.Request):
+            body = await request.json() if request.can_read_body else None
+            requests.append((request.method, request.path, body))
+            status, payload = routes.get(
+                (request.method, request.path), (404, {"reason": "Not found"})
+            )
+            if payload is None:
+                return web.Response(status=status)
+            return web.json_response(payload, status=status)
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle)
+
+        async with TestServer(app) as server:
+            api = AsyncAPI(str(server.make_url("/admin/v2")))
+            try:
+                await test(api, requests)
+            finally:
+                await api.close()
+
+    asyncio.run(main())
+
+
+###############
+## TRANSPORT ##
+###############
+def test_warm_up():
+    async def test(api: AsyncAPI, requests: list):
+        assert await api.warm_up(2) == 2
+        assert requests == [("HEAD", "/admin/v2", None), ("HEAD", "/admin/v2", None)]
+
+    run({}, test)
+
+
+############
+## TENANT ##
+############
+def test_tenant_exists():
+    routes = {
+        ("GET", "/admin/v2/tenants/sample"): (
+            200,
+            {"adminRoles": ["admin"], "allowedClusters": ["dev01"]},
+        ),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        assert await api.tenant.exists(Tenant(name="sample", **{})) == True
+        assert await api.tenant.exists(Tenant(name="missing", **{})) == False
+
+        tenant = await api.tenant.get(Tenant(name="sample", **{}))
+        assert tenant.adminRoles == ["admin"]
+
+    run(routes, test)
+
+
+def test_tenant_exists_is_cached():
+    routes = {
+        ("GET", "/admin/v2/tenants/sample"): (200, {}),
+        ("DELETE", "/admin/v2/tenants/sample"): (204, None),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        tenant = Tenant(name="sample", **{})
+        assert await api.tenant.exists(tenant) == True
+        assert await api.tenant.exists(tenant) == True
+        assert len(requests) == 1
+
+        await api.tenant.delete(tenant)
+        assert api.inventory is not None
+        assert not api.inventory.has_tenant("sample")
+
+    run(routes, test)
+
+
+def test_tenant_error():
+    routes = {
+        ("GET", "/admin/v2/tenants/sample"): (500, {"reason": "Broken"}),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        with pytest.raises(APIException) as e:
+            await api.tenant.exists(Tenant(name="sample", **{}))
+        assert e.value.message == "Broken"
+        assert e.value.status_code == 500
+
+    run(routes, test)
+
+
+###############
+## NAMESPACE ##
+###############
+def test_namespace_sync_permissions():
+    ns = Namespace(
+        name="sample-namespace",
+        tenant="sample-tenant",
+        role_permissions={"MY-PRODUCER": [RolePermissionEnum.produce]},
+        **{},
+    )
+    base = "/admin/v2/namespaces/sample-tenant/sample-namespace/permissions"
+    routes = {
+        ("GET", base): (200, {"OLD-ROLE": ["consume"]}),
+        ("POST", f"{base}/MY-PRODUCER"): (204, None),
+        ("DELETE", f"{base}/OLD-ROLE"): (204, None),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        await api.namespace.sync_permissions(ns)
+
+        assert requests == [
+            ("GET", base, None),
+            ("POST", f"{base}/MY-PRODUCER", ["produce"]),
+            ("DELETE", f"{base}/OLD-ROLE", None),
+        ]
+
+    run(routes, test)
+
+
+###########
+## TOPIC ##
+###########
+def test_topic_create_and_exists():
+    topic = Topic(
+        name="sample",
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        partitions=4,
+        **{},
+    )
+    base = "/admin/v2/persistent/sample-tenant/sample-namespace"
+    routes = {
+        ("PUT", f"{base}/sample/partitions"): (204, None),
+        ("GET", f"{base}/partitioned"): (
+            200,
+            ["persistent://sample-tenant/sample-namespace/sample"],
+        ),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        await api.topic.create(topic)
+        assert await api.topic.exists(topic) == True
+        assert requests[0] == ("PUT", f"{base}/sample/partitions", 4)
+
+    run(routes, test)
+
+
+def test_topic_exists():
+    base = "/admin/v2/persistent/sample-tenant/sample-namespace"
+    routes = {
+        ("GET", f"{base}/partitioned-topic/partitions"): (200, {"partitions": 4}),
+        ("GET", f"{base}/topic/internal-info"): (200, {}),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        partitioned = Topic(
+            name="partitioned-topic",
+            tenant="sample-tenant",
+            namespace="sample-namespace",
+            partitions=4,
+            **{},
+        )
+        topic = Topic(
+            name="topic", tenant="sample-tenant", namespace="sample-namespace", **{}
+        )
+        missing = Topic(
+            name="missing", tenant="sample-tenant", namespace="sample-namespace", **{}
+        )
+        assert await api.topic.exists(partitioned) == True
+        assert await api.topic.partitions(partitioned) == 4
+        assert await api.topic.exists(topic) == True
+        assert await api.topic.exists(missing) == False
+
+    run(routes, test)
+
+
+def test_topic_level_policies_enabled():
+    routes = {
+        ("GET", "/admin/v2/brokers/configuration/runtime"): (
+            200,
+            {"topicLevelPoliciesEnabled": "true"},
+        ),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        assert await api.topic.topic_level_policies_enabled() == True
+        assert await api.topic.topic_level_policies_enabled() == True
+        assert len(requests) == 1
+
+    run(routes, test)
+
+
+def test_runtime_config_is_refreshed_in_background():
+    routes = {
+        ("GET", "/admin/v2/brokers/configuration/runtime"): (
+            200,
+            {"topicLevelPoliciesEnabled": "true"},
+        ),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        changes = []
+        api.config_cache.add_listener(
+            "topicLevelPoliciesEnabled", lambda o, n: changes.append((o, n))
+        )
+        api.config_cache.store({"topicLevelPoliciesEnabled": "false"})
+        api.config_cache.__refresh_at__ = 0.0
+
+        # The last value is served while it's refreshed
+        assert await api.topic.topic_level_policies_enabled() == False
+        await api.config_cache.__task__
+        assert await api.topic.topic_level_policies_enabled() == True
+        assert changes == [("false", "true")]
+        assert len(requests) == 1
+
+    run(routes, test)
+
+
+def test_namespace_permissions_are_shared():
+    ns = Namespace(
+        name="sample-namespace",
+        tenant="sample-tenant",
+        role_permissions={"MY-ROLE": [RolePermissionEnum.consume]},
+        **{},
+    )
+    namespace = "/admin/v2/namespaces/sample-tenant/sample-namespace/permissions"
+    topic = "/admin/v2/persistent/sample-tenant/sample-namespace/sample/permissions"
+    routes = {
+        ("GET", namespace): (200, {"MY-ROLE": ["consume"]}),
+        ("POST", f"{namespace}/MY-ROLE"): (204, None),
+        ("GET", topic): (200, {"MY-ROLE": ["consume", "produce"]}),
+    }
+
+    async def test(api: AsyncAPI, requests: list):
+        t = Topic(
+            name="sample", tenant="sample-tenant", namespace="sample-namespace", **{}
+        )
+        assert await api.topic.permissions(t) == {"MY-ROLE": ["produce"]}
+        assert await api.topic.permissions(t) == {"MY-ROLE": ["produce"]}
+        assert [r[1] for r in requests] == [namespace, topic, topic]
+
+        await api.namespace.sync_permissions(ns)
+        await api.topic.permissions(t)
+        assert [r[1] for r in requests[3:]] == [
+            namespace,
+            f"{namespace}/MY-ROLE",
+            namespace,
+            topic,
+        ]
+
+    run(routes, test)
+
+
+def test_pool_size():
+    async def main():
+        # Not bound by a thread pool like the sync client
+        api = AsyncAPI("http://localhost:8080/admin/v2")
+        assert (await api.transport.session()).connector.limit == DEFAULT_POOL_MAXSIZE
+        await api.close()
+
+        api = AsyncAPI("http://localhost:8080/admin/v2", pool_maxsize=8)
+        assert (await api.transport.session()).connector.limit == 8
+        await api.close()
+
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+from ..api import BaseAPI, HostnameCheckAdapter
+from ..transport import Transport
+import requests_mock
+
+
+#############
+## SESSION ##
+#############
+def test_session_is_reused():
+    api = BaseAPI("http://localhost:8080/admin/v2")
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants", json=[])
+        api._get("http://localhost:8080/admin/v2/tenants")
+        session = api.session
+        api._get("http://localhost:8080/admin/v2/tenants")
+
+        assert m.call_count == 2
+        assert api.session is session
+
+
+def test_session_pool_settings():
+    api = BaseAPI(
+        "http://localhost:8080/admin/v2",
+        sni="pulsar.example.com",
+        pool_maxsize=32,
+        pool_block=True,
+    )
+    adapter = api.session.get_adapter("http://localhost:8080/admin/v2/tenants")
+
+    assert isinstance(adapter, HostnameCheckAdapter)
+    assert adapter.__sni_hostname__ == "pulsar.example.com"
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block == True
+
+
+def test_close():
+    api = BaseAPI("http://localhost:8080/admin/v2")
+    session = api.session
+    api.close()
+
+    assert api.session is not session
+
+
+def test_shared_transport():
+    transport = Transport("http://localhost:8080/admin/v2")
+    tenants = BaseAPI("http://localhost:8080/admin/v2", transport=transport)
+    namespaces = BaseAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants", json=[])
+        m.get("http://localhost:8080/admin/v2/namespaces/tenant", status_code=404)
+        tenants._get("http://localhost:8080/admin/v2/tenants")
+        namespaces._get("http://localhost:8080/admin/v2/namespaces/tenant")
+
+    assert tenants.session is namespaces.session
+    assert transport.metrics.requests == 2
+    assert transport.metrics.errors == 1
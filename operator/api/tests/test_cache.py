@@ -0,0 +1,68 @@
+from ..cache import TTLCache
+import time
+
+
+def test_get_and_set():
+    cache: TTLCache[str, int] = TTLCache(ttl=60)
+
+    assert cache.get("a") is None
+    assert cache.get("a", 0) == 0
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert cache.pop("a") == 1
+    assert "a" not in cache
+
+
+def test_expiry():
+    cache: TTLCache[str, int] = TTLCache(ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    cache.set("b", 2)
+
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    # Expired entries aren't updated
+    cache.update("a", lambda v: v + 1)
+    assert cache.get("a") is None
+
+
+def test_update_keeps_expiry():
+    cache: TTLCache[str, int] = TTLCache(ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.03)
+    cache.update("a", lambda v: v + 1)
+    assert cache.get("a") == 2
+
+    time.sleep(0.03)
+    assert cache.get("a") is None
+
+
+def test_zero_ttl():
+    cache: TTLCache[str, int] = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+def test_maxsize():
+    cache: TTLCache[int, int] = TTLCache(ttl=60, maxsize=2)
+    cache.set(1, 1)
+    cache.set(2, 2)
+    cache.set(1, 1)
+    cache.set(3, 3)
+
+    # The oldest entry is dropped
+    assert len(cache) == 2
+    assert 2 not in cache
+    assert 1 in cache and 3 in cache
+
+
+def test_discard_prefix():
+    cache: TTLCache[str, bool] = TTLCache(ttl=60)
+    for key in ["t/a", "t/b", "t2/a"]:
+        cache.set(key, True)
+
+    cache.discard_prefix("t/")
+    assert "t/a" not in cache
+    assert "t/b" not in cache
+    assert "t2/a" in cache
@@ -0,0 +1,88 @@
+from ..circuit_breaker import CircuitBreaker, CircuitState, CircuitOpenException
+from ..retry import RetryPolicy
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import pytest
+import requests
+import requests_mock
+import time
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record(503)
+    assert breaker.state == CircuitState.Closed
+    breaker.record(None)
+    assert breaker.state == CircuitState.Open
+    assert breaker.allow() == False
+    assert breaker.available == False
+    assert 59 < breaker.retry_after() <= 60
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record(503)
+    breaker.record(404)
+    breaker.record(503)
+    assert breaker.state == CircuitState.Closed
+
+
+def test_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.available == True
+    assert breaker.allow() == True
+    assert breaker.state == CircuitState.HalfOpen
+    # Only one probe at a time
+    assert breaker.allow() == False
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.Closed
+    assert breaker.allow() == True
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow() == True
+    breaker.record(502)
+    assert breaker.state == CircuitState.Open
+    assert breaker.allow() == False
+
+
+def test_released_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow() == True
+    breaker.release()
+    assert breaker.allow() == True
+
+
+def test_transport_short_circuits():
+    transport = Transport(
+        "http://localhost:8080/admin/v2",
+        retry_policy=RetryPolicy(max_attempts=1),
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    api = TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            exc=requests.exceptions.ConnectionError,
+        )
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                api.exists(Tenant(name="sample", **{}))
+
+        with pytest.raises(CircuitOpenException):
+            api.exists(Tenant(name="sample", **{}))
+
+        assert m.call_count == 2
@@ -0,0 +1,44 @@
+from ..codec import json_loads, json_dumps, JSON_CODEC
+from ..namespace_api import NamespaceAPI, Namespace
+from ..schema_api import Schema
+from models import RolePermissionEnum
+import json
+import requests_mock
+
+
+def test_codec_roundtrip():
+    assert JSON_CODEC in ("orjson", "ujson", "json")
+
+    data = {"a": [1, 2.5, None, True], "b": {"c": "persistent://t/ns/topic"}}
+    encoded = json_dumps(data)
+    assert isinstance(encoded, bytes)
+    assert json_loads(encoded) == data
+    assert json_loads(encoded.decode()) == data
+
+
+def test_codec_str_enum():
+    assert json_loads(json_dumps([RolePermissionEnum.produce])) == ["produce"]
+
+
+def test_schema_definition_is_stable():
+    schema = Schema(type="AVRO", schema={"type": "record", "fields": []})
+    # Pulsar versions schemas by their exact definition
+    assert schema.dict()["schema"] == '{"type": "record", "fields": []}'
+
+    parsed = Schema.from_api(schema.dict()["schema"], type="AVRO")
+    assert parsed.schema == schema.schema
+
+
+def test_request_body():
+    api = NamespaceAPI("http://localhost:8080/admin/v2")
+    namespace = Namespace(name="sample", tenant="sample-tenant", **{})
+
+    with requests_mock.Mocker() as m:
+        m.post(
+            "http://localhost:8080/admin/v2/namespaces/sample-tenant/sample/permissions/ROLE",
+            status_code=204,
+        )
+        api._set_role_permissions(namespace, "ROLE", [RolePermissionEnum.consume])
+
+        assert m.last_request.headers["Content-Type"] == "application/json"
+        assert json.loads(m.last_request.body) == ["consume"]
@@ -0,0 +1,97 @@
+from ..deadline import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    request_timeouts,
+)
+from ..retry import RetryPolicy
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import pytest
+import requests
+import requests_mock
+import time
+
+
+def test_no_deadline():
+    assert current_deadline() == None
+    assert request_timeouts(5, 30) == (5, 30)
+
+
+def test_deadline_scope():
+    with deadline_scope(10) as deadline:
+        assert current_deadline() is deadline
+        connect, read = request_timeouts(5, 30)
+        assert connect == 5
+        assert 9 < read <= 10
+
+    assert current_deadline() == None
+
+
+def test_nested_scope_keeps_shorter_deadline():
+    with deadline_scope(1) as outer:
+        with deadline_scope(10) as inner:
+            assert inner is outer
+
+        with deadline_scope(0.5) as inner:
+            assert inner is not outer
+            assert current_deadline() is inner
+
+        assert current_deadline() is outer
+
+
+def test_expired_deadline():
+    deadline = Deadline(0)
+    assert deadline.expired == True
+    assert deadline.remaining() == 0
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+    with deadline_scope(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            request_timeouts()
+
+
+def test_transport_timeouts():
+    transport = Transport(
+        "http://localhost:8080/admin/v2", connect_timeout=2, read_timeout=20
+    )
+    api = TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants/sample", json={})
+
+        api.exists(Tenant(name="sample", **{}))
+        assert m.last_request.timeout == (2, 20)
+
+        with deadline_scope(5):
+            api.exists(Tenant(name="sample", **{}))
+        connect, read = m.last_request.timeout
+        assert connect == 2
+        assert 4 < read <= 5
+
+
+def test_transport_stops_retrying_after_deadline(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    transport = Transport(
+        "http://localhost:8080/admin/v2",
+        retry_policy=RetryPolicy(max_attempts=100),
+    )
+    api = TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    def timeout(request, context):
+        # Simulate a request using up the time budget
+        deadline = current_deadline()
+        deadline.expires_at = time.monotonic()
+        raise requests.exceptions.ReadTimeout
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants/sample", json=timeout)
+
+        with deadline_scope(60):
+            with pytest.raises(DeadlineExceeded):
+                api.exists(Tenant(name="sample", **{}))
+
+        assert m.call_count == 1
@@ -0,0 +1,100 @@
+from ..endpoints import EndpointPool
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import requests
+import requests_mock
+
+PRIMARY = "http://proxy-0:8080/admin/v2"
+SECONDARY = "http://proxy-1:8080/admin/v2"
+
+
+def test_pool_urls():
+    pool = EndpointPool([PRIMARY, SECONDARY + "/", PRIMARY])
+    assert pool.urls == [PRIMARY, SECONDARY]
+    assert pool.primary.url == PRIMARY
+
+
+def test_rewrite():
+    pool = EndpointPool([PRIMARY, SECONDARY])
+    primary, secondary = pool.endpoints
+
+    assert pool.rewrite(f"{PRIMARY}/tenants/a", primary) == f"{PRIMARY}/tenants/a"
+    assert pool.rewrite(f"{PRIMARY}/tenants/a", secondary) == f"{SECONDARY}/tenants/a"
+    assert pool.rewrite("http://other/x", secondary) == "http://other/x"
+    # Calls outside of the admin path go to the same host
+    assert (
+        pool.rewrite("http://proxy-0:8080/lookup/v2/topic/a", secondary)
+        == "http://proxy-1:8080/lookup/v2/topic/a"
+    )
+
+
+def test_owns():
+    pool = EndpointPool([PRIMARY, SECONDARY])
+
+    assert pool.owns(f"{PRIMARY}/tenants/a")
+    assert pool.owns("http://proxy-0:8080/lookup/v2/topic/a")
+    assert not pool.owns("http://proxy-0:80801/admin/v2/tenants/a")
+    assert not pool.owns("http://broker-0:8080/admin/v2/tenants/a")
+
+
+def test_prefers_faster_endpoint():
+    pool = EndpointPool([PRIMARY, SECONDARY])
+    primary, secondary = pool.endpoints
+    pool.release(pool.acquire(exclude=[secondary]), 0.5, True)
+    pool.release(pool.acquire(exclude=[primary]), 0.01, True)
+
+    for _ in range(20):
+        endpoint = pool.acquire()
+        assert endpoint is secondary
+        pool.release(endpoint, 0.01, True)
+
+
+def test_avoids_failed_endpoint():
+    pool = EndpointPool([PRIMARY, SECONDARY])
+    primary, secondary = pool.endpoints
+    pool.release(pool.acquire(exclude=[secondary]), 0.01, False)
+    pool.release(pool.acquire(exclude=[primary]), 0.5, True)
+
+    assert primary.error_rate > 0
+    for _ in range(20):
+        endpoint = pool.acquire()
+        assert endpoint is secondary
+        pool.release(endpoint, None, True)
+
+    # Only failed endpoints left, use the one that failed first
+    pool.release(pool.acquire(exclude=[primary]), 0.5, False)
+    assert pool.acquire() is primary
+
+
+def test_in_flight_is_tracked():
+    pool = EndpointPool([PRIMARY])
+    endpoint = pool.acquire()
+    assert endpoint.in_flight == 1
+    pool.release(endpoint, None, True)
+    assert endpoint.in_flight == 0
+    assert endpoint.latency == 0
+
+
+def test_transport_fails_over():
+    transport = Transport(PRIMARY, endpoints=[SECONDARY])
+    api = TenantAPI(PRIMARY, transport=transport)
+    primary, secondary = transport.endpoints.endpoints
+    # Make sure the primary is tried first
+    secondary.latency = 1.0
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{PRIMARY}/tenants/sample", exc=requests.exceptions.ConnectionError)
+        m.get(f"{SECONDARY}/tenants/sample", json={})
+
+        assert api.exists(Tenant(name="sample", **{})) == True
+        assert m.last_request.url == f"{SECONDARY}/tenants/sample"
+
+    assert primary.failed_at is not None
+    assert secondary.failed_at is None
+
+
+def test_transport_mounts_all_endpoints():
+    transport = Transport(PRIMARY, endpoints=[SECONDARY])
+    assert transport.session.get_adapter(
+        f"{PRIMARY}/x"
+    ) is transport.session.get_adapter(f"{SECONDARY}/x")
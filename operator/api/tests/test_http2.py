@@ -0,0 +1,57 @@
+from .. import API
+from ..http2 import HTTP2Transport
+from ..retry import RetryPolicy
+from ..tenant_api import Tenant
+import importlib.util
+import pytest
+
+HAS_HTTPX = importlib.util.find_spec("httpx") is not None
+
+
+@pytest.mark.skipif(HAS_HTTPX, reason="httpx is installed")
+def test_requires_httpx():
+    with pytest.raises(ImportError):
+        API("http://localhost:8080/admin/v2", http2=True)
+
+
+# Returns an API using the HTTP/2 transport with its client answering
+# requests with `handler` instead of going to the network.
+def mock_api(handler, **kwargs) -> API:
+    httpx = pytest.importorskip("httpx")
+
+    api = API("https://localhost:8443/admin/v2", http2=True, **kwargs)
+    api.transport.__client__ = httpx.Client(transport=httpx.MockTransport(handler))
+    return api
+
+
+def test_http2_transport():
+    requests = []
+
+    def handler(request):
+        import httpx
+
+        requests.append(request)
+        return httpx.Response(200, json={"adminRoles": ["admin"]})
+
+    api = mock_api(handler, sni="pulsar.example.com")
+    assert isinstance(api.transport, HTTP2Transport)
+
+    tenant = api.tenant.get(Tenant(name="sample", **{}))
+    assert tenant.adminRoles == ["admin"]
+
+    assert str(requests[0].url) == "https://localhost:8443/admin/v2/tenants/sample"
+    assert requests[0].extensions["sni_hostname"] == "pulsar.example.com"
+
+
+def test_http2_transport_retries(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    responses = [503, 200]
+
+    def handler(request):
+        import httpx
+
+        return httpx.Response(responses.pop(0), json={})
+
+    api = mock_api(handler, retry_policy=RetryPolicy(max_attempts=2))
+    assert api.tenant.exists(Tenant(name="sample", **{})) == True
+    assert api.transport.metrics.retries == 1
@@ -0,0 +1,218 @@
+from ..inventory import Inventory
+from ..tenant_api import TenantAPI, Tenant
+from ..namespace_api import NamespaceAPI, Namespace
+from ..topic_api import TopicAPI, Topic
+from ..transport import Transport
+from .. import API
+import re
+import time
+import requests_mock
+
+BASE_URL = "http://localhost:8080/admin/v2"
+TOPICS_URL = f"{BASE_URL}/persistent/sample-tenant/sample-namespace"
+
+
+def topic(name: str, partitions: int = 0) -> Topic:
+    return Topic(
+        name=name,
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        partitions=partitions,
+        **{},
+    )
+
+
+def apis():
+    inventory = Inventory()
+    transport = Transport(BASE_URL)
+    tenants = TenantAPI(BASE_URL, transport=transport)
+    namespaces = NamespaceAPI(BASE_URL, transport=transport)
+    topics = TopicAPI(BASE_URL, transport=transport)
+    for api in (tenants, namespaces, topics):
+        api.inventory = inventory
+    return inventory, tenants, namespaces, topics
+
+
+def test_inventory():
+    inventory = Inventory()
+    inventory.add_topic(topic("a", partitions=4))
+
+    assert inventory.has_tenant("sample-tenant")
+    assert inventory.has_namespace("sample-tenant", "sample-namespace")
+    assert inventory.has_topic(topic("a", partitions=4)) == True
+    assert inventory.topic_partitions(topic("a")) == 4
+    # The topic exists but isn't partitioned as expected
+    assert inventory.has_topic(topic("a")) == False
+    assert inventory.has_topic(topic("b")) is None
+
+    inventory.add_topic_list(
+        topic("b"), ["persistent://sample-tenant/sample-namespace/b"]
+    )
+    assert inventory.has_topic(topic("b")) == True
+    assert inventory.has_topic(topic("c")) == False
+    inventory.remove_topic(topic("b"))
+    assert inventory.has_topic(topic("b")) == False
+
+    # Everything below a tenant goes with it
+    inventory.remove_tenant("sample-tenant")
+    assert not inventory.has_namespace("sample-tenant", "sample-namespace")
+    assert inventory.has_topic(topic("a", partitions=4)) is None
+    assert inventory.has_topic(topic("c")) is None
+
+
+def test_existence_is_cached():
+    _, tenants, namespaces, _ = apis()
+    tenant = Tenant(name="sample-tenant", **{})
+    namespace = Namespace(name="sample-namespace", tenant="sample-tenant", **{})
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/sample-tenant", json={})
+        m.get(f"{BASE_URL}/namespaces/sample-tenant/sample-namespace", json={})
+
+        for _ in range(3):
+            assert tenants.exists(tenant) == True
+            assert namespaces.exists(namespace) == True
+
+        assert m.call_count == 2
+
+
+def test_missing_resources_are_cached():
+    _, tenants, namespaces, _ = apis()
+    tenant = Tenant(name="sample-tenant", **{})
+    namespace = Namespace(name="sample-namespace", tenant="sample-tenant", **{})
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/sample-tenant", status_code=404)
+        m.put(f"{BASE_URL}/tenants/sample-tenant", status_code=204)
+
+        for _ in range(3):
+            assert tenants.exists(tenant) == False
+            # So are the namespaces of a missing tenant
+            assert namespaces.exists(namespace) == False
+        assert m.call_count == 1
+
+        # Until the operator creates it
+        m.get(f"{BASE_URL}/tenants/sample-tenant", json={})
+        tenants.create(tenant)
+        assert tenants.exists(tenant) == True
+
+
+def test_missing_resources_expire():
+    inventory = Inventory(missing_ttl=0.01)
+    inventory.remove_namespace("sample-tenant", "sample-namespace")
+    assert inventory.has_namespace("sample-tenant", "sample-namespace") == False
+
+    time.sleep(0.02)
+    assert inventory.has_namespace("sample-tenant", "sample-namespace") is None
+
+    # Disabled with a ttl of 0
+    inventory = Inventory(missing_ttl=0)
+    inventory.remove_tenant("sample-tenant")
+    assert inventory.has_tenant("sample-tenant") is None
+
+
+def test_create_and_delete_update_the_inventory():
+    inventory, tenants, namespaces, _ = apis()
+    tenant = Tenant(name="sample-tenant", **{})
+    namespace = Namespace(name="sample-namespace", tenant="sample-tenant", **{})
+
+    with requests_mock.Mocker() as m:
+        m.put(f"{BASE_URL}/tenants/sample-tenant", status_code=204)
+        m.get(f"{BASE_URL}/tenants/sample-tenant", json={})
+        m.delete(f"{BASE_URL}/tenants/sample-tenant", status_code=204)
+        m.put(f"{BASE_URL}/namespaces/sample-tenant/sample-namespace", status_code=204)
+        m.get(f"{BASE_URL}/namespaces/sample-tenant/sample-namespace", json={})
+
+        tenants.create(tenant)
+        namespaces.create(namespace)
+        assert inventory.has_tenant("sample-tenant")
+        assert inventory.has_namespace("sample-tenant", "sample-namespace")
+
+        tenants.delete(tenant)
+        assert not inventory.has_tenant("sample-tenant")
+        assert not inventory.has_namespace("sample-tenant", "sample-namespace")
+
+
+def test_topic_list_is_shared():
+    inventory, _, _, topics = apis()
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            TOPICS_URL,
+            json=[
+                "persistent://sample-tenant/sample-namespace/a",
+                "persistent://sample-tenant/sample-namespace/b",
+            ],
+        )
+        # Brokers that can't look a single topic up
+        m.get(re.compile(r".*/internal-info$"), status_code=405)
+        m.put(f"{TOPICS_URL}/c", status_code=204)
+        m.delete(f"{TOPICS_URL}/a", status_code=204)
+
+        assert topics.exists(topic("a")) == True
+        assert topics.exists(topic("b")) == True
+        assert topics.exists(topic("c")) == False
+        assert m.call_count == 2
+
+        topics.create(topic("c"))
+        assert topics.exists(topic("c")) == True
+        topics.delete(topic("a"))
+        assert topics.exists(topic("a")) == False
+        assert m.call_count == 4
+
+    assert inventory.has_namespace("sample-tenant", "sample-namespace")
+
+
+def test_topic_lookup_records_partitions():
+    inventory, _, _, topics = apis()
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{TOPICS_URL}/a/partitions", json={"partitions": 8})
+        assert topics.exists(topic("a", partitions=4)) == True
+        assert topics.exists(topic("a", partitions=4)) == True
+        assert m.call_count == 1
+
+    assert inventory.topic_partitions(topic("a")) == 8
+
+
+def test_missing_partitioned_topic_is_forgotten():
+    inventory, _, _, topics = apis()
+    inventory.add_topic(topic("a", partitions=4))
+
+    with requests_mock.Mocker() as m:
+        # Partitioned metadata of a topic that doesn't exist
+        m.get(f"{TOPICS_URL}/a/partitions", json={"partitions": 0})
+        r = topics._get(f"{TOPICS_URL}/a/partitions")
+        assert topics._found(topic("a", partitions=4), r) == False
+
+    assert inventory.has_topic(topic("a", partitions=4)) is None
+
+def test_deleting_missing_topic_forgets_it():
+    inventory, _, _, topics = apis()
+    inventory.add_topic(topic("a"))
+
+    with requests_mock.Mocker() as m:
+        m.delete(f"{TOPICS_URL}/a", status_code=404, json={})
+        try:
+            topics.delete(topic("a"))
+        except Exception:
+            pass
+
+    assert inventory.has_topic(topic("a")) is None
+
+
+def test_facade_inventory():
+    api = API(BASE_URL)
+    assert api.inventory is not None
+    assert api.tenant.inventory is api.inventory
+    assert api.topic.inventory is api.inventory
+
+    # Only caching what's missing
+    api = API(BASE_URL, inventory_ttl=0)
+    assert api.inventory is not None
+    assert api.inventory.tenants.ttl == 0
+
+    # Disabled with ttls of 0
+    api = API(BASE_URL, inventory_ttl=0, missing_ttl=0)
+    assert api.inventory is None
+    assert api.topic.inventory is None
@@ -0,0 +1,51 @@
+from ..ledger import current_ledger, ledger_scope, record_call
+from ..retry import RetryPolicy
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import requests_mock
+
+BASE_URL = "http://localhost:8080/admin/v2"
+
+
+def test_ledger_scope():
+    assert current_ledger() is None
+    # Calls outside of a scope aren't recorded anywhere
+    record_call(200)
+
+    with ledger_scope() as ledger:
+        assert current_ledger() is ledger
+        record_call(200, size=10, duration=0.5)
+        record_call(None, duration=1.0)
+
+        with ledger_scope() as inner:
+            record_call(200)
+        assert inner.calls == 1
+
+    assert current_ledger() is None
+    assert ledger.calls == 2
+    assert ledger.errors == 1
+    assert ledger.bytes_received == 10
+    assert ledger.summary() == "calls=2 ms=1500 retries=0 bytes=10"
+
+
+def test_ledger_records_api_calls():
+    transport = Transport(BASE_URL, retry_policy=RetryPolicy(base_delay=0, max_delay=0))
+    api = TenantAPI(BASE_URL, transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            f"{BASE_URL}/tenants/sample",
+            [{"status_code": 503}, {"json": {"adminRoles": []}}],
+        )
+        m.get(f"{BASE_URL}/tenants/missing", status_code=404)
+
+        with ledger_scope() as ledger:
+            assert api.exists(Tenant(name="sample", **{})) == True
+            assert api.exists(Tenant(name="missing", **{})) == False
+
+    # A retried call counts once
+    assert ledger.calls == 2
+    assert ledger.retries == 1
+    assert ledger.errors == 0
+    assert ledger.bytes_received == len(b'{"adminRoles": []}')
+    assert ledger.latency > 0
@@ -0,0 +1,275 @@
+from ..lookup import BrokerRouter, bundle_hash
+from ..topic_api import TopicAPI, Topic
+from ..transport import Transport
+import requests
+import requests_mock
+
+PROXY = "http://proxy:8080"
+PROXY_1 = "http://proxy-1:8080"
+BROKER_0 = "http://broker-0:8080"
+BROKER_1 = "http://broker-1:8080"
+
+BUNDLES = f"{PROXY}/admin/v2/namespaces/sample-tenant/sample-namespace/bundles"
+LOOKUP = f"{PROXY}/lookup/v2/topic/persistent/sample-tenant/sample-namespace/sample"
+PERMISSIONS = "/admin/v2/persistent/sample-tenant/sample-namespace/sample/permissions"
+
+
+def make_topic(name: str = "sample") -> Topic:
+    return Topic(name=name, tenant="sample-tenant", namespace="sample-namespace", **{})
+
+
+def make_api() -> TopicAPI:
+    transport = Transport(f"{PROXY}/admin/v2")
+    api = TopicAPI(f"{PROXY}/admin/v2", transport=transport)
+    api.router = BrokerRouter(transport)
+    return api
+
+
+def test_bundle_hash():
+    # Check value of CRC32
+    assert bundle_hash("123456789") == 0xCBF43926
+    assert bundle_hash("persistent://public/default/my-topic") == 0x2BAD45F7
+
+
+def test_bundle():
+    router = BrokerRouter(Transport(f"{PROXY}/admin/v2"))
+    boundaries = [0x00000000, 0x40000000, 0x80000000, 0xC0000000, 0xFFFFFFFF]
+
+    assert (
+        router._bundle(make_topic(), boundaries)
+        == "sample-tenant/sample-namespace/0x80000000_0xc0000000"
+    )
+
+    topic = Topic(name="my-topic", tenant="public", namespace="default", **{})
+    assert router._bundle(topic, boundaries) == "public/default/0x00000000_0x40000000"
+
+    # The upper boundary of the last bundle is inclusive
+    assert (
+        router._bundle(topic, [0, 0x2BAD45F7]) == "public/default/0x00000000_0x2bad45f7"
+    )
+
+
+def test_routes_to_owner():
+    api = make_api()
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, json={"httpUrl": BROKER_0, "brokerUrl": "pulsar://broker-0"})
+        m.get(f"{BROKER_0}{PERMISSIONS}", json={})
+        m.post(f"{BROKER_0}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+
+        # Bundles and owner are looked up once
+        assert [r.url for r in m.request_history] == [
+            BUNDLES,
+            LOOKUP,
+            f"{BROKER_0}{PERMISSIONS}/ROLE",
+            f"{BROKER_0}{PERMISSIONS}/ROLE",
+        ]
+
+
+def test_redirect_invalidates_owner():
+    api = make_api()
+    owners = [BROKER_0, BROKER_1]
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, [{"json": {"httpUrl": owner}} for owner in owners])
+        # The topic moved to broker-1
+        m.post(
+            f"{BROKER_0}{PERMISSIONS}/ROLE",
+            status_code=307,
+            headers={"Location": f"{BROKER_1}{PERMISSIONS}/ROLE"},
+        )
+        m.post(f"{BROKER_1}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert m.last_request.url == f"{BROKER_1}{PERMISSIONS}/ROLE"
+        assert m.last_request.json() == ["consume"]
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert [r.url for r in m.request_history][-3:] == [
+            BUNDLES,
+            LOOKUP,
+            f"{BROKER_1}{PERMISSIONS}/ROLE",
+        ]
+
+
+def test_falls_back_to_proxy():
+    api = make_api()
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, status_code=500, json={"reason": "Broken"})
+        m.post(f"{PROXY}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert m.last_request.url == f"{PROXY}{PERMISSIONS}/ROLE"
+
+
+def test_unreachable_owner_falls_back_to_proxy(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    api = make_api()
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, json={"httpUrl": BROKER_0})
+        m.post(f"{BROKER_0}{PERMISSIONS}/ROLE", exc=requests.exceptions.ConnectionError)
+        m.post(f"{PROXY}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert m.last_request.url == f"{PROXY}{PERMISSIONS}/ROLE"
+        assert (
+            api.router._cached_owner(api.router._bundle(make_topic(), [0, 0xFFFFFFFF]))
+            == None
+        )
+
+
+def test_unreachable_owner_is_not_retried_nor_counted(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    api = make_api()
+    api.transport.breaker.failure_threshold = 1
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, json={"httpUrl": BROKER_0})
+        m.post(f"{BROKER_0}{PERMISSIONS}/ROLE", exc=requests.exceptions.ConnectionError)
+        m.post(f"{PROXY}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+
+        # The broker is tried once, and not on the proxy URL rewritten
+        # to another endpoint
+        assert [r.url for r in m.request_history] == [
+            BUNDLES,
+            LOOKUP,
+            f"{BROKER_0}{PERMISSIONS}/ROLE",
+            f"{PROXY}{PERMISSIONS}/ROLE",
+        ]
+        # Only the endpoints count for the circuit breaker
+        assert api.transport.breaker.available
+
+
+def test_unreachable_lookup_falls_back_to_proxy(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    api = make_api()
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, exc=requests.exceptions.ConnectionError)
+        m.post(f"{PROXY}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert m.last_request.url == f"{PROXY}{PERMISSIONS}/ROLE"
+
+
+def test_lookup_fails_over(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    transport = Transport(f"{PROXY}/admin/v2", endpoints=[f"{PROXY_1}/admin/v2"])
+    api = TopicAPI(f"{PROXY}/admin/v2", transport=transport)
+    api.router = BrokerRouter(transport)
+    primary, secondary = transport.endpoints.endpoints
+    # Make sure the primary is tried first
+    secondary.latency = 1.0
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, exc=requests.exceptions.ConnectionError)
+        m.get(LOOKUP.replace(PROXY, PROXY_1), json={"httpUrl": BROKER_0})
+        m.post(f"{BROKER_0}{PERMISSIONS}/ROLE", status_code=204)
+
+        api._set_role_permissions(make_topic(), "ROLE", ["consume"])
+        assert m.last_request.url == f"{BROKER_0}{PERMISSIONS}/ROLE"
+
+    assert primary.failed_at is not None
+
+
+def test_namespace_calls_are_not_routed():
+    api = make_api()
+    topic = Topic(
+        name="sample",
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        partitions=4,
+    )
+
+    with requests_mock.Mocker() as m:
+        # Neither is the partitioned topic metadata
+        m.get(
+            f"{PROXY}/admin/v2/persistent/sample-tenant/sample-namespace/sample/partitions",
+            status_code=405,
+        )
+        m.get(
+            f"{PROXY}/admin/v2/persistent/sample-tenant/sample-namespace/partitioned",
+            json=[topic.full_name],
+        )
+        assert api.exists(topic) == True
+        assert m.call_count == 2
+
+
+def test_topic_metadata_is_routed():
+    api = make_api()
+
+    with requests_mock.Mocker() as m:
+        m.get(BUNDLES, json={"boundaries": ["0x00000000", "0xffffffff"]})
+        m.get(LOOKUP, json={"httpUrl": BROKER_0})
+        m.get(
+            f"{BROKER_0}/admin/v2/persistent/sample-tenant/sample-namespace/sample/internal-info",
+            json={},
+        )
+        assert api.exists(make_topic()) == True
+        assert m.last_request.url.startswith(BROKER_0)
+
+
+def test_async_routes_to_owner():
+    from ..aio import AsyncAPI
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    import asyncio
+
+    async def main():
+        received = []
+        lookups = []
+        urls = {}
+
+        async def proxy_handler(request: web.Request):
+            received.append(("proxy", request.method, request.path))
+            if request.path.endswith("/bundles"):
+                return web.json_response({"boundaries": ["0x00000000", "0xffffffff"]})
+            if request.path.startswith("/lookup/"):
+                lookups.append(request.path)
+                return web.json_response({"httpUrl": urls["broker"]})
+            return web.Response(status=204)
+
+        async def broker_handler(request: web.Request):
+            received.append(("broker", request.method, request.path))
+            if len(received) > 3:
+                # The topic moved away
+                raise web.HTTPTemporaryRedirect(f"{urls['proxy']}{request.path}")
+            return web.Response(status=204)
+
+        proxy_app = web.Application()
+        proxy_app.router.add_route("*", "/{tail:.*}", proxy_handler)
+        broker_app = web.Application()
+        broker_app.router.add_route("*", "/{tail:.*}", broker_handler)
+
+        async with TestServer(proxy_app) as proxy, TestServer(broker_app) as broker:
+            urls["proxy"] = str(proxy.make_url("")).rstrip("/")
+            urls["broker"] = str(broker.make_url("")).rstrip("/")
+
+            api = AsyncAPI(f"{urls['proxy']}/admin/v2", direct_routing=True)
+            try:
+                await api.topic._set_role_permissions(make_topic(), "ROLE", ["consume"])
+                assert received[-1] == ("broker", "POST", f"{PERMISSIONS}/ROLE")
+
+                # Redirected back to the proxy
+                await api.topic._set_role_permissions(make_topic(), "ROLE", ["consume"])
+                assert received[-1] == ("proxy", "POST", f"{PERMISSIONS}/ROLE")
+
+                await api.topic._set_role_permissions(make_topic(), "ROLE", ["consume"])
+                assert len(lookups) == 2
+            finally:
+                await api.close()
+
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+from ..metrics import endpoint_template, APIMetrics
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import pytest
+import requests
+import requests_mock
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+BASE_URL = "http://localhost:8080/admin/v2"
+
+
+def test_endpoint_template():
+    cases = {
+        "/tenants/sample": "/tenants/{tenant}",
+        "/namespaces/t/ns": "/namespaces/{tenant}/{namespace}",
+        "/namespaces/t/ns/permissions": "/namespaces/{tenant}/{namespace}/permissions",
+        "/namespaces/t/ns/permissions/ROLE": "/namespaces/{tenant}/{namespace}/permissions/{role}",
+        "/namespaces/t/ns/retention": "/namespaces/{tenant}/{namespace}/retention",
+        "/namespaces/t/ns/bundles": "/namespaces/{tenant}/{namespace}/bundles",
+        "/namespaces/t/ns/0x00000000_0x40000000/unload": "/namespaces/{tenant}/{namespace}/{bundle}/unload",
+        "/persistent/t/ns": "/persistent/{tenant}/{namespace}",
+        "/persistent/t/ns/partitioned": "/persistent/{tenant}/{namespace}/partitioned",
+        "/persistent/t/ns/topic/partitions": "/persistent/{tenant}/{namespace}/{topic}/partitions",
+        "/non-persistent/t/ns/topic/permissions/ROLE": "/non-persistent/{tenant}/{namespace}/{topic}/permissions/{role}",
+        "/schemas/t/ns/topic/schema": "/schemas/{tenant}/{namespace}/{topic}/schema",
+        "/brokers/configuration/runtime": "/brokers/configuration/runtime",
+    }
+    for path, template in cases.items():
+        assert endpoint_template(f"{BASE_URL}{path}?force=true", BASE_URL) == template
+
+    # Calls routed to a broker
+    assert (
+        endpoint_template("http://broker-1:8080/admin/v2/persistent/t/ns/x", BASE_URL)
+        == "/persistent/{tenant}/{namespace}/{topic}"
+    )
+    assert (
+        endpoint_template(
+            "http://localhost:8080/lookup/v2/topic/persistent/t/ns/x", BASE_URL
+        )
+        == "/lookup/v2/topic/persistent/{tenant}/{namespace}/{topic}"
+    )
+
+
+def test_api_metrics():
+    registry = prometheus_client.CollectorRegistry()
+    api = TenantAPI(
+        BASE_URL,
+        transport=Transport(BASE_URL, api_metrics=APIMetrics(registry=registry)),
+    )
+    labels = {"api": "TenantAPI", "method": "GET", "endpoint": "/tenants/{tenant}"}
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/sample", json={"adminRoles": []})
+        m.get(f"{BASE_URL}/tenants/missing", status_code=404)
+        m.get(f"{BASE_URL}/tenants/broken", exc=requests.exceptions.ConnectTimeout)
+
+        assert api.exists(Tenant(name="sample", **{})) == True
+        assert api.exists(Tenant(name="missing", **{})) == False
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            api.exists(Tenant(name="broken", **{}))
+
+    sample = registry.get_sample_value
+    assert sample("pulsar_api_requests_total", {**labels, "status": "200"}) == 1
+    assert sample("pulsar_api_requests_total", {**labels, "status": "404"}) == 1
+    assert sample("pulsar_api_requests_total", {**labels, "status": "error"}) == 1
+    assert sample("pulsar_api_request_duration_seconds_count", labels) == 3
+    # Only responses have a size
+    assert sample("pulsar_api_response_size_bytes_count", labels) == 2
+    assert sample("pulsar_api_response_size_bytes_sum", labels) == len(
+        b'{"adminRoles": []}'
+    )
+
+
+def test_api_metrics_disabled():
+    api = TenantAPI(BASE_URL)
+    assert api.transport.api_metrics is None
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/sample", json={})
+        assert api.exists(Tenant(name="sample", **{})) == True
@@ -0,0 +1,117 @@
+from ..circuit_breaker import CircuitBreaker
+from ..rate_limit import TokenBucket, RateLimiter
+from ..retry import RetryPolicy
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport, CircuitOpenException
+import pytest
+import requests
+import requests_mock
+import time
+
+
+# Stops the clock so the waits don't depend on how long the test takes
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    monkeypatch.setattr(time, "monotonic", lambda: 1000.0)
+
+
+def test_bucket_burst(frozen_clock):
+    bucket = TokenBucket(rate=10, burst=3)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    # Reservations queue up behind each other
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_bucket_try_take(frozen_clock):
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.try_take() == True
+    assert bucket.try_take() == True
+    # Doesn't go into debt
+    assert bucket.try_take() == False
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_unlimited():
+    limiter = RateLimiter()
+    assert limiter.unlimited == True
+    for _ in range(100):
+        assert limiter.reserve("POST") == 0
+
+
+def test_read_write_buckets(frozen_clock):
+    limiter = RateLimiter(read_rate=10, read_burst=5, write_rate=1, write_burst=1)
+
+    for _ in range(5):
+        assert limiter.reserve("GET") == 0
+    assert limiter.reserve("GET") > 0
+
+    assert limiter.reserve("POST") == 0
+    assert limiter.reserve("PUT") == pytest.approx(1, abs=0.01)
+
+
+def test_global_bucket():
+    limiter = RateLimiter(rate=10, burst=2, read_rate=100, read_burst=100)
+
+    assert limiter.reserve("GET") == 0
+    assert limiter.reserve("DELETE") == 0
+    assert limiter.reserve("GET") > 0
+
+
+def test_transport_throttles(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", lambda s: sleeps.append(s))
+
+    transport = Transport(
+        "http://localhost:8080/admin/v2",
+        rate_limiter=RateLimiter(rate=10, burst=1),
+    )
+    api = TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants/sample", json={})
+        api.exists(Tenant(name="sample", **{}))
+        api.exists(Tenant(name="sample", **{}))
+
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.1, abs=0.01)
+    assert transport.metrics.throttled == 1
+    assert transport.metrics.throttle_wait == pytest.approx(0.1, abs=0.01)
+
+
+def test_open_circuit_is_not_throttled(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", lambda s: sleeps.append(s))
+
+    transport = Transport(
+        "http://localhost:8080/admin/v2",
+        retry_policy=RetryPolicy(max_attempts=1),
+        rate_limiter=RateLimiter(rate=10, burst=1),
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+    )
+    api = TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            exc=requests.exceptions.ConnectionError,
+        )
+        with pytest.raises(requests.exceptions.ConnectionError):
+            api.exists(Tenant(name="sample", **{}))
+
+        for _ in range(3):
+            with pytest.raises(CircuitOpenException):
+                api.exists(Tenant(name="sample", **{}))
+
+    assert m.call_count == 1
+    assert sleeps == []
+    assert transport.metrics.throttled == 0
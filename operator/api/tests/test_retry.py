@@ -0,0 +1,113 @@
+from ..retry import RetryPolicy, parse_retry_after
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import pytest
+import requests
+import requests_mock
+
+
+def make_api(**kwargs) -> TenantAPI:
+    policy = RetryPolicy(base_delay=0, max_delay=0.01, **kwargs)
+    transport = Transport("http://localhost:8080/admin/v2", retry_policy=policy)
+    return TenantAPI("http://localhost:8080/admin/v2", transport=transport)
+
+
+############
+## POLICY ##
+############
+def test_parse_retry_after():
+    assert parse_retry_after(None) == None
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("garbage") == None
+
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(date, usegmt=True)) <= 30
+
+
+def test_retryable():
+    policy = RetryPolicy()
+    assert policy.retryable("GET") == True
+    assert policy.retryable("PUT") == True
+    assert policy.retryable("DELETE") == True
+    assert policy.retryable("POST") == False
+    assert policy.retryable("POST", idempotent=True) == True
+    assert RetryPolicy(max_attempts=1).retryable("GET") == False
+
+
+def test_retry_status():
+    policy = RetryPolicy()
+    assert policy.retry_status("GET", 503) == True
+    assert policy.retry_status("GET", 500) == False
+    assert policy.retry_status("POST", 503) == False
+    assert policy.retry_status("POST", 429) == True
+
+
+def test_delay():
+    policy = RetryPolicy(base_delay=0.1, max_delay=5)
+    for _ in range(100):
+        assert 0.1 <= policy.delay(1) <= 3
+        assert policy.delay(10) <= 5
+
+    assert policy.delay(1, {"Retry-After": "2"}) == 2
+    assert policy.delay(1, {"Retry-After": "60"}) == None
+
+
+###############
+## TRANSPORT ##
+###############
+def test_retry_get():
+    api = make_api()
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            [
+                {"status_code": 503, "headers": {"Retry-After": "0"}},
+                {"exc": requests.exceptions.ConnectionError},
+                {"json": {"adminRoles": ["admin"]}},
+            ],
+        )
+        tenant = api.get(Tenant(name="sample", **{}))
+
+        assert tenant.adminRoles == ["admin"]
+        assert m.call_count == 3
+        assert api.transport.metrics.retries == 2
+
+
+def test_retry_gives_up():
+    api = make_api(max_attempts=2)
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            exc=requests.exceptions.ConnectionError,
+        )
+        with pytest.raises(requests.exceptions.ConnectionError):
+            api.get(Tenant(name="sample", **{}))
+
+        assert m.call_count == 2
+
+
+def test_no_retry_post():
+    api = make_api()
+    with requests_mock.Mocker() as m:
+        m.post(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            [{"status_code": 503}, {"status_code": 204}],
+        )
+        api._post("http://localhost:8080/admin/v2/tenants/sample", json={})
+
+        assert m.call_count == 1
+
+
+def test_retry_idempotent_post():
+    api = make_api()
+    with requests_mock.Mocker() as m:
+        m.post(
+            "http://localhost:8080/admin/v2/tenants/sample",
+            [{"status_code": 503}, {"status_code": 204}],
+        )
+        m.get("http://localhost:8080/admin/v2/tenants/sample", json={})
+        api.update(Tenant(name="sample", **{}))
+
+        assert [r.method for r in m.request_history] == ["POST", "POST", "GET"]
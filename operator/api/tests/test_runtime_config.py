@@ -0,0 +1,84 @@
+from ..runtime_config import RuntimeConfigCache
+from ..topic_api import TopicAPI
+import requests_mock
+import time
+
+BASE_URL = "http://localhost:8080/admin/v2"
+RUNTIME_URL = f"{BASE_URL}/brokers/configuration/runtime"
+
+
+def test_first_fetch_waits():
+    cache = RuntimeConfigCache(lambda: {"a": "1"})
+    assert cache.get() == {"a": "1"}
+    assert cache.__thread__ is None
+
+
+def test_stale_config_is_refreshed_in_background():
+    configs = iter([{"a": "1"}, {"a": "2"}])
+    cache = RuntimeConfigCache(lambda: next(configs), ttl=60)
+    assert cache.get() == {"a": "1"}
+
+    # Getting old, the last value is served while it's refreshed
+    cache.__refresh_at__ = 0.0
+    assert cache.get() == {"a": "1"}
+    cache.__thread__.join()
+    assert cache.get() == {"a": "2"}
+
+
+def test_expired_config_waits():
+    configs = iter([{"a": "1"}, {"a": "2"}])
+    cache = RuntimeConfigCache(lambda: next(configs), ttl=60, max_stale=120)
+    cache.get()
+
+    cache.__fetched__ -= 121
+    assert cache.get() == {"a": "2"}
+
+
+def test_failed_refresh_keeps_config(caplog):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            raise Exception("Broken")
+        return {"a": "1"}
+
+    cache = RuntimeConfigCache(fetch, retry_delay=60)
+    cache.get()
+    cache.__refresh_at__ = 0.0
+    cache.get()
+    cache.__thread__.join()
+
+    assert cache.get() == {"a": "1"}
+    assert "Unable to refresh the broker runtime configuration: Broken" in caplog.text
+    # The next refresh waits for the retry delay
+    cache.get()
+    assert len(calls) == 2
+
+
+def test_listeners():
+    changes = []
+    cache = RuntimeConfigCache(lambda: {})
+    cache.add_listener("topicLevelPoliciesEnabled", lambda o, n: changes.append((o, n)))
+
+    cache.store({"topicLevelPoliciesEnabled": "false", "other": "1"})
+    cache.store({"topicLevelPoliciesEnabled": "false", "other": "2"})
+    assert changes == []
+
+    cache.store({"topicLevelPoliciesEnabled": "true"})
+    assert changes == [("false", "true")]
+
+
+def test_topic_api_refreshes_in_background():
+    api = TopicAPI(BASE_URL)
+
+    with requests_mock.Mocker() as m:
+        m.get(RUNTIME_URL, json={"topicLevelPoliciesEnabled": "false"})
+        assert api.topic_level_policies_enabled() == False
+
+        m.get(RUNTIME_URL, json={"topicLevelPoliciesEnabled": "true"})
+        api.config_cache.__refresh_at__ = time.monotonic() - 1
+        assert api.topic_level_policies_enabled() == False
+        api.config_cache.__thread__.join()
+        assert api.topic_level_policies_enabled() == True
+        assert m.call_count == 2
@@ -0,0 +1,195 @@
+from ..deadline import DeadlineExceeded, deadline_scope
+from ..singleflight import Group, AsyncGroup
+from ..tenant_api import TenantAPI, Tenant
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import pytest
+import requests_mock
+import threading
+import time
+
+
+def test_group_shares_call():
+    group = Group()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(group.do, "key", fn)
+        started.wait()
+        followers = [pool.submit(group.do, "key", fn) for _ in range(3)]
+        # Wait for the followers to join the call
+        while group.shared < 3:
+            time.sleep(0.001)
+        release.set()
+
+        assert leader.result() == "result"
+        assert [f.result() for f in followers] == ["result"] * 3
+
+    assert len(calls) == 1
+
+
+def test_group_shares_error():
+    group = Group()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait()
+        raise ValueError("Broken")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(group.do, "key", fn)
+        started.wait()
+        follower = pool.submit(group.do, "key", fn)
+        while group.shared < 1:
+            time.sleep(0.001)
+        release.set()
+
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            follower.result()
+
+
+def test_group_follower_deadline():
+    group = Group()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait()
+        return "result"
+
+    def follow():
+        with deadline_scope(0.05):
+            return group.do("key", fn)
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(group.do, "key", fn)
+        started.wait()
+        follower = pool.submit(follow)
+
+        # The follower gives up without waiting for the leader
+        with pytest.raises(DeadlineExceeded):
+            follower.result(timeout=5)
+
+        release.set()
+        assert leader.result() == "result"
+
+
+def test_group_forgets_completed_calls():
+    group = Group()
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+    assert group.shared == 0
+
+
+def test_async_group_shares_call():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        group = AsyncGroup()
+        results = await asyncio.gather(*[group.do("key", fn) for _ in range(5)])
+        assert results == ["result"] * 5
+        assert group.shared == 4
+
+        assert await group.do("key", fn) == "result"
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_async_group_survives_cancelled_caller():
+    async def fn():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        group = AsyncGroup()
+        first = asyncio.ensure_future(group.do("key", fn))
+        second = asyncio.ensure_future(group.do("key", fn))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        assert await second == "result"
+
+    asyncio.run(main())
+
+
+def test_async_group_follower_deadline():
+    release = None
+
+    async def fn():
+        await release.wait()
+        return "result"
+
+    async def follow(group):
+        with deadline_scope(0.05):
+            return await group.do("key", fn)
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        group = AsyncGroup()
+        leader = asyncio.ensure_future(group.do("key", fn))
+        await asyncio.sleep(0)
+
+        with pytest.raises(DeadlineExceeded):
+            await asyncio.wait_for(follow(group), 5)
+
+        release.set()
+        assert await leader == "result"
+
+    asyncio.run(main())
+
+
+def test_async_group_passes_call_timeout():
+    async def fn():
+        raise asyncio.TimeoutError()
+
+    async def main():
+        group = AsyncGroup()
+        with deadline_scope(5):
+            with pytest.raises(asyncio.TimeoutError):
+                await group.do("key", fn)
+
+    asyncio.run(main())
+
+
+def test_concurrent_exists_share_request():
+    api = TenantAPI("http://localhost:8080/admin/v2")
+    release = threading.Event()
+
+    def callback(request, context):
+        release.wait()
+        return {}
+
+    with requests_mock.Mocker() as m:
+        m.get("http://localhost:8080/admin/v2/tenants/sample", json=callback)
+
+        with ThreadPoolExecutor(5) as pool:
+            results = [
+                pool.submit(api.exists, Tenant(name="sample", **{})) for _ in range(5)
+            ]
+            while api.transport.singleflight.shared < 4:
+                time.sleep(0.001)
+            release.set()
+
+            assert [r.result() for r in results] == [True] * 5
+
+        assert m.call_count == 1
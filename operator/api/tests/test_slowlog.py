@@ -0,0 +1,118 @@
+from ..slowlog import SlowCallLog, LOGGER_NAME
+from ..retry import RetryPolicy
+from ..tenant_api import TenantAPI, Tenant
+from ..transport import Transport
+import logging
+import time
+import requests_mock
+
+BASE_URL = "http://localhost:8080/admin/v2"
+
+
+def test_slow_calls_are_logged(caplog):
+    log = SlowCallLog(threshold=1.0, size_threshold=1000)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        log.observe("TopicAPI", "GET", "/t", "/t", 200, 0.5, 10)
+        assert caplog.records == []
+
+        log.observe(
+            "TopicAPI",
+            "GET",
+            "/persistent/{tenant}/{namespace}/{topic}/stats",
+            "/persistent/public/default/orders/stats",
+            200,
+            1.5,
+            10,
+            retries=2,
+        )
+        log.observe("TopicAPI", "GET", "/t", "/t", 200, 0.1, 2000)
+
+    slow, large = caplog.records
+    assert slow.levelno == logging.WARNING
+    assert slow.getMessage().startswith("Slow Pulsar API call: api=TopicAPI")
+    assert slow.pulsar_api_call == {
+        "api": "TopicAPI",
+        "method": "GET",
+        "endpoint": "/persistent/{tenant}/{namespace}/{topic}/stats",
+        "resource": "/persistent/public/default/orders/stats",
+        "status": 200,
+        "ms": 1500,
+        "bytes": 10,
+        "retries": 2,
+        "suppressed": 0,
+    }
+    assert large.getMessage().startswith("Large Pulsar API response")
+    assert large.pulsar_api_call["bytes"] == 2000
+
+
+def test_slow_calls_are_rate_limited(caplog):
+    log = SlowCallLog(threshold=0, rate=0.01, burst=2)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        for _ in range(5):
+            log.observe("TenantAPI", "GET", "/tenants", "/tenants", 200, 0.1)
+    assert len(caplog.records) == 2
+
+    # The next line getting through reports what was dropped
+    log.__bucket__.try_take = lambda: True
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        log.observe("TenantAPI", "GET", "/tenants", "/tenants", 200, 0.1)
+    assert caplog.records[-1].pulsar_api_call["suppressed"] == 3
+
+
+def test_summary(caplog):
+    log = SlowCallLog(summary_interval=300, top=2)
+    log.observe("TenantAPI", "GET", "/tenants", "/tenants", 200, 0.1)
+    log.observe("TenantAPI", "GET", "/tenants", "/tenants", 200, 0.3)
+    log.observe("TopicAPI", "PUT", "/a", "/a", 204, 0.5)
+    log.observe("TopicAPI", "GET", "/b", "/b", 200, 0.01)
+
+    slowest = log.slowest()
+    assert [name for name, _ in slowest] == ["PUT /a", "GET /tenants"]
+    assert slowest[1][1].calls == 2
+    assert slowest[1][1].max == 0.3
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        log.log_summary()
+    (summary,) = caplog.records
+    assert summary.getMessage().startswith("Slowest Pulsar API endpoints:")
+    assert [e["endpoint"] for e in summary.pulsar_api_endpoints] == [
+        "PUT /a",
+        "GET /tenants",
+    ]
+    # The counts start over
+    assert log.slowest() == []
+
+
+def test_summary_is_logged_periodically(caplog):
+    log = SlowCallLog(summary_interval=0.001)
+    time.sleep(0.01)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        log.observe("TenantAPI", "GET", "/tenants", "/tenants", 200, 0.1)
+    assert caplog.records[-1].getMessage().startswith("Slowest Pulsar API endpoints")
+
+
+def test_api_calls_are_logged_with_retries(caplog):
+    log = SlowCallLog(threshold=0)
+    transport = Transport(
+        BASE_URL,
+        retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        slow_call_log=log,
+    )
+    api = TenantAPI(BASE_URL, transport=transport)
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            f"{BASE_URL}/tenants/sample",
+            [{"status_code": 503}, {"json": {}}],
+        )
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            assert api.exists(Tenant(name="sample", **{})) == True
+
+    (record,) = caplog.records
+    assert record.pulsar_api_call["api"] == "TenantAPI"
+    assert record.pulsar_api_call["endpoint"] == "/tenants/{tenant}"
+    assert record.pulsar_api_call["resource"] == "/tenants/sample"
+    assert record.pulsar_api_call["retries"] == 1
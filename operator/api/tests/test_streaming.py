@@ -0,0 +1,71 @@
+from ..streaming import iter_json_array, json_array_contains
+from ..topic_api import TopicAPI, Topic
+import gzip
+import json
+import pytest
+import requests_mock
+
+TOPIC = "persistent://sample-tenant/sample-namespace/sample"
+
+
+def test_iter_json_array():
+    assert list(iter_json_array(b"[]")) == []
+    assert list(iter_json_array(b' [ "a" , 1,{"b": [2]} ] ')) == ["a", 1, {"b": [2]}]
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(b'{"a": 1}'))
+    with pytest.raises(ValueError):
+        list(iter_json_array(b'["a" "b"]'))
+
+
+def test_iter_json_array_stops_early():
+    elements = iter_json_array(b'["a", "b", broken')
+    assert next(elements) == "a"
+    assert next(elements) == "b"
+
+
+def test_json_array_contains():
+    document = json.dumps([f"{TOPIC}-{i}" for i in range(1000)] + [TOPIC]).encode()
+
+    assert json_array_contains(document, TOPIC) == True
+    assert json_array_contains(document, f"{TOPIC}-999") == True
+    assert json_array_contains(document, f"{TOPIC}-1000") == False
+    assert json_array_contains(b"[]", TOPIC) == False
+
+
+def test_json_array_contains_whole_elements_only():
+    # The topic name is part of another element
+    document = json.dumps([f'prefix "{TOPIC}"', {"name": TOPIC}]).encode()
+    assert json_array_contains(document, TOPIC) == False
+
+
+def test_json_array_contains_escaped():
+    document = b'["persistent:\\/\\/sample-tenant\\/sample-namespace\\/sample"]'
+    assert json_array_contains(document, TOPIC) == True
+
+
+def test_json_array_contains_invalid():
+    with pytest.raises(ValueError):
+        json_array_contains(b'{"topics": []}', TOPIC)
+
+
+def test_exists_with_gzip():
+    api = TopicAPI("http://localhost:8080/admin/v2")
+    topic = Topic(
+        name="sample", tenant="sample-tenant", namespace="sample-namespace", **{}
+    )
+    body = json.dumps([f"{TOPIC}-{i}" for i in range(1000)] + [TOPIC]).encode()
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/internal-info",
+            status_code=405,
+        )
+        m.get(
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace",
+            content=gzip.compress(body),
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        assert api.exists(topic) == True
+        assert "gzip" in m.last_request.headers["Accept-Encoding"]
@@ -0,0 +1,165 @@
+from ..tls import ResumingSSLContext, create_ssl_context
+from ..transport import Transport, HostnameCheckAdapter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import http.client
+import shutil
+import ssl
+import subprocess
+import threading
+import pytest
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+
+    def do_GET(self):
+        self.do_HEAD()
+        self.wfile.write(b"[]")
+
+    def log_message(self, *args):
+        pass
+
+
+# Self-signed certificate for localhost
+@pytest.fixture
+def cert(tmp_path):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+
+    cert, key = str(tmp_path / "cert.pem"), str(tmp_path / "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+# HTTPS server on localhost, yields its port
+@pytest.fixture
+def server(cert):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*cert)
+
+    httpd = ThreadingHTTPServer(("localhost", 0), Handler)
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd.server_address[1]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_create_ssl_context():
+    context = create_ssl_context(check_hostname=False)
+    assert isinstance(context, ResumingSSLContext)
+    assert context.check_hostname == False
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.options & ssl.OP_NO_COMPRESSION
+    assert not context.options & ssl.OP_NO_TICKET
+
+    assert create_ssl_context(check_hostname=True).check_hostname == True
+
+
+def test_adapter_uses_ssl_context():
+    context = create_ssl_context(check_hostname=False)
+    adapter = HostnameCheckAdapter(ssl_context=context)
+    assert adapter.poolmanager.connection_pool_kw["ssl_context"] is context
+
+    adapter = HostnameCheckAdapter()
+    assert "ssl_context" not in adapter.poolmanager.connection_pool_kw
+
+
+def test_transport_ssl_context():
+    assert isinstance(Transport("https://localhost").ssl_context, ResumingSSLContext)
+    assert (
+        Transport("https://localhost", tls_session_resumption=False).ssl_context is None
+    )
+
+
+def test_resumes_session(server, cert):
+    context = create_ssl_context(check_hostname=True, cafile=cert[0])
+
+    def get():
+        conn = http.client.HTTPSConnection("localhost", server, context=context)
+        conn.request("GET", "/")
+        # Reading the response also reads the TLS 1.3 session ticket
+        assert conn.getresponse().read() == b"[]"
+        return conn
+
+    first = get()
+    assert first.sock.session_reused == False
+
+    second = get()
+    assert second.sock.session_reused == True
+
+    first.close()
+    second.close()
+
+
+def test_sessions_are_per_host(server, cert):
+    context = create_ssl_context(check_hostname=False, cafile=cert[0])
+
+    conn = http.client.HTTPSConnection("localhost", server, context=context)
+    conn.request("GET", "/")
+    conn.getresponse().read()
+    conn.close()
+
+    other = http.client.HTTPSConnection("127.0.0.1", server, context=context)
+    other.request("GET", "/")
+    other.getresponse().read()
+    assert other.sock.session_reused == False
+    other.close()
+
+
+def test_warm_up(server, cert):
+    transport = Transport(f"https://localhost:{server}/admin/v2", pool_maxsize=2)
+    transport.ssl_context.load_verify_locations(cafile=cert[0])
+
+    assert transport.warm_up(3) == 2
+    pool = transport.session.get_adapter(transport.base_url).get_connection(
+        transport.base_url
+    )
+    assert pool.num_connections == 2
+    # The second connection resumed the session of the first
+    assert [conn.sock.session_reused for conn in pool.pool.queue] == [False, True]
+
+    # Requests use the connections opened by warm_up
+    assert transport.request("GET", transport.base_url).status_code == 200
+    assert pool.num_connections == 2
+
+    # Warm connections are not opened twice
+    assert transport.warm_up(2) == 0
+
+    transport.close()
+
+
+def test_warm_up_error():
+    transport = Transport("http://localhost:1/admin/v2", connect_timeout=1)
+    with pytest.raises(Exception):
+        transport.warm_up(1)
+    transport.close()
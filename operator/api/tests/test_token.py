@@ -0,0 +1,80 @@
+from ..token import TokenCache, jwt_expiry
+import base64
+import json
+import os
+import time
+
+
+def make_jwt(claims: dict) -> str:
+    def encode(data: dict) -> str:
+        raw = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.signature"
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(make_jwt({"sub": "operator", "exp": 1700000000})) == 1700000000
+    assert jwt_expiry(make_jwt({"sub": "operator"})) == None
+    assert jwt_expiry("not-a-jwt") == None
+    assert jwt_expiry("a.b.c") == None
+
+
+def test_token_is_cached(tmp_path):
+    path = tmp_path / "TOKEN"
+    path.write_text("first\n")
+    cache = TokenCache(str(path), check_interval=3600)
+
+    assert cache.get() == "first"
+
+    path.write_text("second")
+    assert cache.get() == "first"
+
+
+def test_token_reloads_on_change(tmp_path):
+    path = tmp_path / "TOKEN"
+    path.write_text("first")
+    cache = TokenCache(str(path), check_interval=0)
+
+    assert cache.get() == "first"
+
+    # Simulate the symlink swap done for projected secrets
+    new_path = tmp_path / "TOKEN.new"
+    new_path.write_text("second")
+    os.replace(new_path, path)
+
+    assert cache.get() == "second"
+
+
+def test_token_reloads_after_invalidate(tmp_path):
+    path = tmp_path / "TOKEN"
+    path.write_text("first")
+    cache = TokenCache(str(path), check_interval=3600)
+    assert cache.get() == "first"
+
+    path.write_text("second")
+    cache.invalidate()
+
+    assert cache.get() == "second"
+
+
+def test_token_missing(tmp_path):
+    cache = TokenCache(str(tmp_path / "TOKEN"), check_interval=0)
+    assert cache.get() == None
+
+
+def test_expiring_token_is_refreshed(tmp_path):
+    path = tmp_path / "TOKEN"
+    path.write_text(make_jwt({"exp": time.time() + 30}))
+    cache = TokenCache(
+        str(path), check_interval=3600, refresh_margin=60, expiring_check_interval=0
+    )
+
+    cache.get()
+    assert cache.expiring() == True
+
+    token = make_jwt({"exp": time.time() + 3600})
+    path.write_text(token)
+
+    assert cache.get() == token
+    assert cache.expiring() == False
@@ -1,7 +1,11 @@
 from models import TopicSpec, RolePermissionEnum
 from models.pulsar import APIValue
 from ..topic_api import TopicAPI, Topic
-from datetime import datetime
+from ..namespace_api import NamespaceAPI, Namespace
+from ..runtime_config import RuntimeConfigCache
+from ..cache import TTLCache
+from ..api import APIException
+import pytest
 import requests_mock
 
 
@@ -280,14 +284,31 @@ def test_exists_success():
     api = TopicAPI("http://localhost:8080/admin/v2")
     with requests_mock.Mocker() as m:
         m.get(
-            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace",
-            json=[
-                "persistent://sample-tenant/sample-namespace/sample",
-                "persistent://sample-tenant/sample-namespace/another-topic",
-            ],
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/internal-info",
+            json={"version": 1, "creationDate": "2023-01-01T00:00:00Z"},
         )
         exists = api.exists(topic)
         assert exists == True
+        # Only the topic is looked up
+        assert m.call_count == 1
+
+
+def test_exists_non_persistent():
+    topic = Topic(
+        name="sample",
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        persistent=False,
+    )
+    api = TopicAPI("http://localhost:8080/admin/v2")
+    with requests_mock.Mocker() as m:
+        # Non-persistent topics have no metadata
+        m.get(
+            "http://localhost:8080/admin/v2/non-persistent/sample-tenant/sample-namespace/sample/stats",
+            json={"msgRateIn": 0.0},
+        )
+        assert api.exists(topic) == True
+        assert m.call_count == 1
 
 
 def test_exists_failure():
@@ -310,6 +331,49 @@ def test_exists_failure():
     )
     api = TopicAPI("http://localhost:8080/admin/v2")
     with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/internal-info",
+            status_code=404,
+            json={"reason": "Topic not found"},
+        )
+        exists = api.exists(topic)
+        assert exists == False
+
+
+def test_exists_partitioned():
+    topic = Topic(
+        name="sample",
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        partitions=4,
+        **{},
+    )
+    api = TopicAPI("http://localhost:8080/admin/v2")
+    with requests_mock.Mocker() as m:
+        url = "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/partitions"
+        m.get(url, json={"partitions": 4})
+        assert api.exists(topic) == True
+        assert api.partitions(topic) == 4
+
+        # Missing and non-partitioned topics have no partitions
+        m.get(url, json={"partitions": 0})
+        assert api.exists(topic) == False
+        assert api.partitions(topic) == 0
+
+
+def test_exists_list_fallback():
+    topic = Topic(
+        name="sample",
+        tenant="sample-tenant",
+        namespace="sample-namespace",
+        **{},
+    )
+    api = TopicAPI("http://localhost:8080/admin/v2")
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/internal-info",
+            status_code=405,
+        )
         m.get(
             "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace",
             json=[
@@ -317,8 +381,16 @@ def test_exists_failure():
                 "persistent://sample-tenant/sample-namespace/another-topic",
             ],
         )
-        exists = api.exists(topic)
-        assert exists == False
+        assert api.exists(topic) == False
+
+        m.get(
+            "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace",
+            json=[
+                "persistent://sample-tenant/sample-namespace/sample",
+                "persistent://sample-tenant/sample-namespace/another-topic",
+            ],
+        )
+        assert api.exists(topic) == True
 
 
 ##########################
@@ -348,8 +420,8 @@ def test_topic_level_policies_is_cached():
     api = TopicAPI("http://localhost:8080/admin/v2")
 
     # Prefilling the cache
-    api.__config__ = {"topicLevelPoliciesEnabled": "true"}
-    api.__config_fetched__ = datetime.now()
+    api.config_cache = RuntimeConfigCache(api.get_runtime_config)
+    api.config_cache.store({"topicLevelPoliciesEnabled": "true"})
 
     with requests_mock.Mocker() as m:
         m.get(
@@ -465,3 +537,76 @@ def test_sync_permissions():
             history[4].url
             == "http://localhost:8080/admin/v2/persistent/sample-tenant/sample-namespace/sample/permissions/OLD-ROLE"
         )
+
+
+def test_namespace_permissions_are_cached():
+    base = "http://localhost:8080/admin/v2"
+    cache = TTLCache(60)
+    api = TopicAPI(base)
+    api.permission_cache = cache
+    namespace_api = NamespaceAPI(base)
+    namespace_api.permission_cache = cache
+    ns = Namespace(
+        name="sample-namespace",
+        tenant="sample-tenant",
+        role_permissions={"MY-ROLE": [RolePermissionEnum.consume]},
+        **{},
+    )
+    topics = [
+        Topic(name=name, tenant="sample-tenant", namespace="sample-namespace", **{})
+        for name in ("first", "second")
+    ]
+
+    with requests_mock.Mocker() as m:
+        namespace_permissions = m.get(
+            f"{base}/namespaces/sample-tenant/sample-namespace/permissions",
+            json={"MY-ROLE": ["consume"]},
+        )
+        for topic in topics:
+            m.get(
+                f"{base}/persistent/sample-tenant/sample-namespace/{topic.name}/permissions",
+                json={"MY-ROLE": ["consume", "produce"]},
+            )
+
+        # Fetched once for all the topics of the namespace
+        for topic in topics:
+            assert api.permissions(topic) == {"MY-ROLE": ["produce"]}
+        assert namespace_permissions.call_count == 1
+
+        # Changing the namespace permissions drops them
+        m.post(f"{base}/namespaces/sample-tenant/sample-namespace/permissions/MY-ROLE")
+        namespace_api.sync_permissions(ns)
+        assert namespace_permissions.call_count == 2
+        assert len(cache) == 0
+
+        api.permissions(topics[0])
+        assert namespace_permissions.call_count == 3
+
+
+def test_namespace_permissions_are_dropped_on_errors():
+    base = "http://localhost:8080/admin/v2"
+    cache = TTLCache(60)
+    cache.set("sample-tenant/sample-namespace", {"MY-ROLE": ["consume"]})
+    namespace_api = NamespaceAPI(base)
+    namespace_api.permission_cache = cache
+    ns = Namespace(
+        name="sample-namespace",
+        tenant="sample-tenant",
+        role_permissions={"MY-ROLE": [RolePermissionEnum.produce]},
+        **{},
+    )
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            f"{base}/namespaces/sample-tenant/sample-namespace/permissions",
+            json={"MY-ROLE": ["consume"]},
+        )
+        m.post(
+            f"{base}/namespaces/sample-tenant/sample-namespace/permissions/MY-ROLE",
+            status_code=500,
+            json={"reason": "Broken"},
+        )
+
+        with pytest.raises(APIException):
+            namespace_api.sync_permissions(ns)
+        assert "sample-tenant/sample-namespace" not in cache
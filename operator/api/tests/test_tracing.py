@@ -0,0 +1,81 @@
+from .. import tracing
+from ..tenant_api import TenantAPI, Tenant
+import json
+import pytest
+import requests
+import requests_mock
+
+pytest.importorskip("opentelemetry.sdk")
+
+BASE_URL = "http://localhost:8080/admin/v2"
+
+
+# The tracer provider can only be set once per process
+@pytest.fixture(scope="module")
+def trace_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("traces") / "traces.jsonl")
+    tracing.configure_tracing(path)
+    yield path
+    tracing.shutdown_tracing()
+
+
+# Returns the spans written since the last call
+@pytest.fixture
+def spans(trace_file):
+    open(trace_file, "w").close()
+
+    def read():
+        tracing._provider.force_flush()
+        with open(trace_file) as f:
+            lines = f.readlines()
+        open(trace_file, "w").close()
+        return {span["name"]: span for span in map(json.loads, lines)}
+
+    return read
+
+
+def test_request_span(spans):
+    api = TenantAPI(BASE_URL)
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/sample", json={})
+        with tracing.span("tenant.tenant_handler", {"neuron.resource.name": "x"}):
+            assert api.exists(Tenant(name="sample", **{})) == True
+
+    traced = spans()
+    handler = traced["tenant.tenant_handler"]
+    call = traced["GET /tenants/{tenant}"]
+
+    assert handler["attributes"] == {"neuron.resource.name": "x"}
+    assert call["parent_id"] == handler["context"]["span_id"]
+    assert call["context"]["trace_id"] == handler["context"]["trace_id"]
+    assert call["kind"] == "SpanKind.CLIENT"
+    assert call["attributes"] == {
+        "http.request.method": "GET",
+        "url.template": "/tenants/{tenant}",
+        "neuron.api": "TenantAPI",
+        "http.response.status_code": 200,
+    }
+    assert call["status"]["status_code"] == "UNSET"
+
+
+def test_request_span_errors(spans):
+    api = TenantAPI(BASE_URL)
+
+    with requests_mock.Mocker() as m:
+        m.get(f"{BASE_URL}/tenants/missing", status_code=404)
+        assert api.exists(Tenant(name="missing", **{})) == False
+        # Not finding something is not an error
+        assert spans()["GET /tenants/{tenant}"]["status"]["status_code"] == "UNSET"
+
+        m.get(f"{BASE_URL}/tenants/broken", status_code=500, json={})
+        with pytest.raises(Exception):
+            api.exists(Tenant(name="broken", **{}))
+        assert spans()["GET /tenants/{tenant}"]["status"]["status_code"] == "ERROR"
+
+        m.get(f"{BASE_URL}/tenants/down", exc=requests.exceptions.ConnectTimeout)
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            api.exists(Tenant(name="down", **{}))
+        call = spans()["GET /tenants/{tenant}"]
+        assert call["status"]["status_code"] == "ERROR"
+        assert call["events"][0]["name"] == "exception"
@@ -0,0 +1,117 @@
+import select
+import ssl
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+# How long to wait for the session tickets after a TLS 1.3 handshake
+DEFAULT_TICKET_TIMEOUT = 0.1
+
+
+# ResumingSSLContext resumes TLS sessions: every new connection to a host
+# offers the session (or session ticket) of the previous connection to
+# that host, which turns a reconnect into an abbreviated handshake.
+#
+# With TLS 1.3 the session ticket only arrives after the handshake, so
+# instead of saving the session right away the last connection made to
+# each host is remembered and its session is picked up when the next
+# connection is made, provided the ticket arrived by then. This works
+# the same for sockets (requests, httpx) and the memory BIOs asyncio
+# uses (aiohttp).
+class ResumingSSLContext(ssl.SSLContext):
+    def __init__(self, *args, **kwargs):
+        self.__lock__ = threading.Lock()
+        self.__sessions__: Dict[Optional[str], ssl.SSLSession] = {}
+        self.__last__: Dict[Optional[str], Any] = {}
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None:
+            session = self._session(server_hostname)
+
+        wrapped = super().wrap_socket(
+            sock, *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        self._remember(server_hostname, wrapped)
+        return wrapped
+
+    def wrap_bio(self, *args, server_hostname=None, session=None, **kwargs):
+        if session is None:
+            session = self._session(server_hostname)
+
+        wrapped = super().wrap_bio(
+            *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        self._remember(server_hostname, wrapped)
+        return wrapped
+
+    def _session(self, host: Optional[str]) -> Optional[ssl.SSLSession]:
+        with self.__lock__:
+            ref = self.__last__.get(host)
+            last = ref() if ref is not None else None
+            if last is not None:
+                self._harvest(host, last)
+
+            return self.__sessions__.get(host)
+
+    def _remember(self, host: Optional[str], wrapped: Any) -> None:
+        with self.__lock__:
+            self.__last__[host] = weakref.ref(wrapped)
+
+    def _harvest(self, host: Optional[str], last: Any) -> None:
+        try:
+            session = last.session
+            # A TLS 1.3 session can only be resumed once its ticket has
+            # been received, until then keep the previous one.
+            if session is not None and (
+                session.has_ticket or last.version() != "TLSv1.3"
+            ):
+                self.__sessions__[host] = session
+        except (ValueError, AttributeError, OSError):
+            # The connection never completed its handshake
+            pass
+
+
+# Returns a client context with session resumption enabled. Hostname
+# checking is left to urllib3 (`check_hostname=False`) when used by
+# requests since HostnameCheckAdapter verifies the certificate against
+# the SNI override itself. aiohttp and httpx rely on the context for it.
+def create_ssl_context(
+    check_hostname: bool, cafile: Optional[str] = None
+) -> ResumingSSLContext:
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = check_hostname
+    context.verify_mode = ssl.CERT_REQUIRED
+    context.options |= ssl.OP_NO_COMPRESSION
+    # Session tickets are what makes resumption work with TLS 1.3. The
+    # flag is looked up since not every OpenSSL build (nor pylint) has it.
+    context.options &= ~getattr(ssl, "OP_NO_TICKET", 0)
+
+    if cafile:
+        context.load_verify_locations(cafile=cafile)
+    else:
+        context.load_default_certs()
+
+    return context
+
+
+# Reads the session tickets a TLS 1.3 server sends after the handshake
+# of a connection that is not used right away. Until they're read the
+# socket looks readable, which urllib3 takes for a connection closed by
+# the server, and the session can't be resumed. Servers often send more
+# than one ticket so this keeps reading until none arrived for a while.
+def read_session_tickets(sock: Any, timeout: float = DEFAULT_TICKET_TIMEOUT) -> None:
+    if not isinstance(sock, ssl.SSLSocket) or sock.version() != "TLSv1.3":
+        return
+
+    previous = sock.gettimeout()
+    try:
+        sock.setblocking(False)
+        while select.select([sock], [], [], timeout)[0]:
+            try:
+                # Processes the tickets, there's no application data
+                if not sock.recv(1):
+                    return
+            except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+                pass
+    finally:
+        sock.settimeout(previous)
@@ -0,0 +1,122 @@
+import base64
+import json
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+# How often the token file is checked for changes (in seconds)
+DEFAULT_CHECK_INTERVAL = 10.0
+# How long before the JWT `exp` claim the token is considered expiring
+# and is re-read from disk regardless of the check interval.
+DEFAULT_REFRESH_MARGIN = 60.0
+# How often an expiring token is re-read until a fresh one shows up
+DEFAULT_EXPIRING_CHECK_INTERVAL = 1.0
+
+
+# Returns the `exp` claim (epoch seconds) of a JWT or None if the token
+# isn't a JWT or doesn't expire.
+def jwt_expiry(token: str) -> Optional[float]:
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)) and not isinstance(exp, bool):
+            return float(exp)
+    except Exception:
+        pass
+
+    return None
+
+
+# TokenCache keeps the bearer token in memory and only goes back to the
+# file system every `check_interval` seconds. Even then the file is only
+# re-read when it changed on disk (inode, mtime or size) which also
+# catches the `..data` symlink swap kubernetes does for projected
+# secrets, or when the token is about to expire.
+class TokenCache:
+    __path__: str
+    __token__: Optional[str] = None
+    __stat__: Optional[Tuple[int, int, int]] = None
+    __expires_at__: Optional[float] = None
+    __next_check__: float = 0.0
+
+    check_interval: float
+    refresh_margin: float
+    expiring_check_interval: float
+
+    def __init__(
+        self,
+        path: str,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        expiring_check_interval: float = DEFAULT_EXPIRING_CHECK_INTERVAL,
+    ):
+        self.__path__ = path
+        self.__lock__ = threading.Lock()
+        self.check_interval = check_interval
+        self.refresh_margin = refresh_margin
+        self.expiring_check_interval = expiring_check_interval
+
+    @property
+    def path(self) -> str:
+        return self.__path__
+
+    def expiring(self) -> bool:
+        return (
+            self.__expires_at__ is not None
+            and time.time() >= self.__expires_at__ - self.refresh_margin
+        )
+
+    def get(self) -> Optional[str]:
+        if time.monotonic() < self.__next_check__:
+            return self.__token__
+
+        with self.__lock__:
+            # Another thread might have refreshed the token while we
+            # were waiting for the lock.
+            if time.monotonic() >= self.__next_check__:
+                self._refresh()
+
+            return self.__token__
+
+    # Forces the token to be checked on next `get`, e.g. after the API
+    # responded with 401 Unauthorized.
+    def invalidate(self) -> None:
+        with self.__lock__:
+            self.__stat__ = None
+            self.__next_check__ = 0.0
+
+    def _refresh(self) -> None:
+        try:
+            st = os.stat(self.__path__)
+        except FileNotFoundError:
+            self.__token__ = None
+            self.__stat__ = None
+            self.__expires_at__ = None
+            self._schedule()
+            return
+
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat != self.__stat__ or self.expiring():
+            with open(self.__path__, "r") as token_data:
+                self.__token__ = token_data.read().strip()
+            self.__stat__ = stat
+            self.__expires_at__ = jwt_expiry(self.__token__)
+
+        self._schedule()
+
+    def _schedule(self) -> None:
+        interval = self.check_interval
+        if self.expiring():
+            interval = min(interval, self.expiring_check_interval)
+        elif self.__expires_at__ is not None:
+            # Wake up in time to refresh the token before it expires
+            until_refresh = self.__expires_at__ - self.refresh_margin - time.time()
+            interval = min(interval, until_refresh)
+
+        self.__next_check__ = time.monotonic() + interval
@@ -1,8 +1,13 @@
+import requests
 from .api import BaseAPI, APIRequestType
+from .streaming import json_array_contains
+from .lookup import BrokerRouter, NOT_OWNER_STATUS_CODES, redirected
+from .inventory import Inventory
+from .runtime_config import RuntimeConfigCache
+from .cache import TTLCache
 from models import TopicSpec, PulsarTopicPolicies, RolePermissionEnum
 from pydantic import Field
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 
 
 class TopicNotFoundException(Exception):
@@ -13,6 +18,12 @@ class ParsingException(Exception):
     pass
 
 
+# Statuses of a broker that couldn't look a single topic up (an older
+# broker or a name it won't look up), in which case the topic is looked
+# for in the topic list of its namespace
+LIST_FALLBACK_STATUS_CODES = frozenset([400, 405, 412, 501])
+
+
 class Topic(PulsarTopicPolicies):
     name: str = Field(exclude=True)
     tenant: str = Field(exclude=True)
@@ -61,162 +72,112 @@ class Topic(PulsarTopicPolicies):
 class TopicAPI(BaseAPI):
     __base_url__: str
 
-    __config__: Dict[str, Any] = {}
-    __config_fetched__: datetime = datetime.min
+    # Sends topic calls straight to the broker owning the topic if set
+    router: Optional[BrokerRouter] = None
+    # Topics known to exist, shared by the API classes of the facade
+    inventory: Optional[Inventory] = None
+    # Runtime configuration of the brokers, created on first use unless
+    # shared by the facade
+    config_cache: Optional[RuntimeConfigCache] = None
+    # Namespace permissions ("tenant/namespace" -> role -> actions) the
+    # topic permissions are diffed against, shared with the NamespaceAPI
+    # which drops them when it changes them
+    permission_cache: Optional[TTLCache[str, Dict[str, List[str]]]] = None
+
+    # Requests for a given `topic` are routed to the broker owning it when
+    # direct routing is enabled. The proxy is used instead if the owner
+    # can't be looked up or reached, and the owner is looked up again if
+    # the broker turns out not to own the topic anymore.
+    def _request(  # type: ignore
+        self, method: APIRequestType, url: str, topic: Optional[Topic] = None, **kwargs
+    ) -> requests.Response:
+        if topic is None or self.router is None:
+            return super()._request(method, url, **kwargs)
+
+        try:
+            owner = self.router.resolve(topic)
+        except self.router.errors:
+            return super()._request(method, url, **kwargs)
+
+        try:
+            r = super()._request(method, self.router.rewrite(url, owner), **kwargs)
+        except self.transport.connection_errors:
+            self.router.invalidate(topic)
+            # The request might have gone through already
+            if not self.transport.retry_policy.retryable(
+                method.value, kwargs.get("idempotent")
+            ):
+                raise
+            return super()._request(method, url, **kwargs)
+
+        if redirected(r) or r.status_code in NOT_OWNER_STATUS_CODES:
+            self.router.invalidate(topic)
+
+        return r
 
     def exists(self, topic: Topic) -> bool:
-        url = "{base_url}/{persistence}/{tenant}/{namespace}".format(
-            base_url=self.__base_url__,
-            persistence="persistent" if topic.persistent else "non-persistent",
-            tenant=topic.tenant,
-            namespace=topic.namespace,
-        )
-
-        if topic.partitions > 0:
-            url = f"{url}/partitioned"
-
-        r = self._get(url)
-
-        if r.status_code == 200:
-            try:
-                topics = r.json()
-                assert isinstance(topics, list)
-                return topic.full_name in topics
-            except Exception as e:
-                raise ParsingException(f"Unable to parse response: {e}")
-        else:
-            self._handle_error(r)
+        known = self._known(topic)
+        if known is not None:
+            return known
+
+        url, kwargs = self._existence_request(topic)
+        found = self._found(topic, self._get(url, **kwargs))
+        if found is not None:
+            return found
+
+        # The broker couldn't look the topic up, look for it in the topic
+        # list of its namespace instead
+        r = self._get(self._topic_list_url(topic))
+        return self._listed(topic, r)
+
+    # Returns the number of partitions of a topic, 0 if it isn't
+    # partitioned or doesn't exist
+    def partitions(self, topic: Topic) -> int:
+        r = self._get(f"{self._topic_url(topic)}/partitions")
+        return self._partitions(r)
 
     def create(self, topic: Topic) -> None:
-        url = "{base_url}/{persistence}/{tenant}/{namespace}/{topic}".format(
-            base_url=self.__base_url__,
-            persistence="persistent" if topic.persistent else "non-persistent",
-            tenant=topic.tenant,
-            namespace=topic.namespace,
-            topic=topic.name,
-        )
-        body: Optional[int] = None
-
-        if topic.partitions > 0:
-            url = f"{url}/partitions"
-            body = topic.partitions
-
-        r = self._put(url, json=body)
-
-        if not (200 <= r.status_code <= 204):
-            self._handle_error(r)
+        url, body = self._create_request(topic)
+        r = self._put(url, json=body, topic=topic)
+        self._created(topic, r)
 
     def update(self, topic: Topic) -> None:
-        base_url = "{base_url}/{persistence}/{tenant}/{namespace}/{topic}".format(
-            base_url=self.__base_url__,
-            persistence="persistent" if topic.persistent else "non-persistent",
-            tenant=topic.tenant,
-            namespace=topic.namespace,
-            topic=topic.name,
-        )
-
-        for _, uri in topic.api_uris().items():
-            method, url = uri.endpoint(base_url)
-
-            r = self._request(APIRequestType(method), url, json=uri.value)
-
-            if 200 <= r.status_code <= 204:
-                continue
-            else:
-                self._handle_error(r)
+        for method, url, value in self._policy_requests(topic):
+            # Policy setters can safely be repeated
+            r = self._request(method, url, json=value, idempotent=True, topic=topic)
+            self._ensure_success(r)
 
     def delete(self, topic: Topic) -> None:
-        url = "{base_url}/{persistence}/{tenant}/{namespace}/{topic}".format(
-            base_url=self.__base_url__,
-            persistence="persistent" if topic.persistent else "non-persistent",
-            tenant=topic.tenant,
-            namespace=topic.namespace,
-            topic=topic.name,
-        )
-
-        if topic.partitions > 0:
-            url = f"{url}/partitions"
+        r = self._delete(self._delete_url(topic), topic=topic)
+        self._deleted(topic, r)
 
-        r = self._delete(url)
-
-        if r.status_code != 204:
-            self._handle_error(r)
-
-    # runtime_config is a property that fetches the runtime_config
-    # from Pulsar API and caches it for 1 minute.
+    # runtime_config is a property returning the runtime_config of the
+    # brokers from a cache that's refreshed in the background.
     @property
     def runtime_config(self) -> Dict[str, Any]:
-        if (
-            self.__config__ is None
-            or datetime.now() > self.__config_fetched__ + timedelta(minutes=1)
-        ):
-            self.__config__ = self.get_runtime_config()
-            self.__config_fetched__ = datetime.now()
+        if self.config_cache is None:
+            self.config_cache = RuntimeConfigCache(self.get_runtime_config)
 
-        return self.__config__
+        return self.config_cache.get()
 
     def topic_level_policies_enabled(self) -> bool:
-        return (
-            "topicLevelPoliciesEnabled" in self.runtime_config
-            and self.runtime_config["topicLevelPoliciesEnabled"] == "true"
-        )
+        return self.runtime_config.get("topicLevelPoliciesEnabled") == "true"
 
+    # Pulsar topic permissions API retrieves the effective permissions for
+    # a topic. These permissions are defined by the permissions set at the
+    # namespace level combined (union) with any eventual specific
+    # permission set on the topic. To get only permissions set on topic
+    # level we subtract the namespace permissions from the topic ones.
     def permissions(self, topic: Topic) -> Dict[str, List[str]]:
-        # Pulsar topic permissions API retrieves the effective permissions for a topic. These permissions are defined by the permissions set at then namespace level combined (union) with any eventual specific permission set on the topic.
-        # To get only permissions set on topic level we subtract the namespace permissions from the topic ones.
-
         # namespace permissions
-        url = "{base_url}/namespaces/{tenant}/{namespace}/permissions".format(
-            base_url=self.__base_url__,
-            tenant=topic.tenant,
-            namespace=topic.namespace,
-        )
-
-
-        r = self._get(url)
-        if r.status_code == 200:
-            try:
-                namespacePermissions=r.json()
-            except Exception as e:
-                raise ParsingException(f"Unable to parse response: {e}")            
-        else:
-          self._handle_error(r)
+        namespacePermissions = self._cached_namespace_permissions(topic)
+        if namespacePermissions is None:
+            r = self._get(self._namespace_permissions_url(topic))
+            namespacePermissions = self._parse_namespace_permissions(topic, r)
 
         # topic permissions
-        url = (
-            "{base_url}/{persistence}/{tenant}/{namespace}/{topic}/permissions".format(
-                base_url=self.__base_url__,
-                persistence="persistent" if topic.persistent else "non-persistent",
-                tenant=topic.tenant,
-                namespace=topic.namespace,
-                topic=topic.name,
-            )
-        )
-
-        r = self._get(url)
-        if r.status_code == 200:
-            try:
-                topicPermissions=r.json()
-            except Exception as e:
-                raise ParsingException(f"Unable to parse response: {e}")            
-
-            # calculate delta
-            permissions={}
-            for key, value in topicPermissions.items():
-                if namespacePermissions.get(key) == None:
-                    permissions[key]=value
-                else: # permission exists in namespacePermissions
-                    action=list(set(value) - set(namespacePermissions.get(key)))
-                    if action != []:
-                        permissions[key]=action
-            try:
-                assert isinstance(permissions, dict)
-                return permissions
-            except Exception as e:
-                raise ParsingException(f"Unable to parse response: {e}")
-        else:
-            self._handle_error(r)
-
+        r = self._get(self._permissions_url(topic), topic=topic)
+        return self._parse_permissions(r, namespacePermissions)
 
     def sync_permissions(self, topic: Topic) -> None:
         current_permissions = self.permissions(topic)
@@ -224,39 +185,221 @@ class TopicAPI(BaseAPI):
         for role, perms in topic.permissions.items():
             self._set_role_permissions(topic, role, perms)
 
-        for role in current_permissions.keys():
-            if role not in topic.permissions:
-                self._del_role_permissions(topic, role)
+        for role in self._removed_roles(topic, current_permissions):
+            self._del_role_permissions(topic, role)
 
     def _set_role_permissions(
         self, topic: Topic, role: str, permissions: List[str]
     ) -> None:
-        url = "{base_url}/{persistence}/{tenant}/{namespace}/{topic}/permissions/{role}".format(
+        url = self._role_url(topic, role)
+        r = self._post(url, json=permissions, idempotent=True, topic=topic)
+        self._ensure_success(r)
+
+    def _del_role_permissions(self, topic: Topic, role: str) -> None:
+        r = self._delete(self._role_url(topic, role), topic=topic)
+        self._role_deleted(r)
+
+    def _known(self, topic: Topic) -> Optional[bool]:
+        if self.inventory is None:
+            return None
+        return self.inventory.has_topic(topic)
+
+    # Records what a call told about the existence of the topic
+    def _seen(self, topic: Topic, exists: bool) -> None:
+        if self.inventory is None:
+            return
+        if exists:
+            self.inventory.add_topic(topic)
+        else:
+            self.inventory.remove_topic(topic)
+
+    def _cached_namespace_permissions(
+        self, topic: Topic
+    ) -> Optional[Dict[str, List[str]]]:
+        if self.permission_cache is None:
+            return None
+        return self.permission_cache.get(f"{topic.tenant}/{topic.namespace}")
+
+    def _cache_namespace_permissions(
+        self, topic: Topic, permissions: Dict[str, List[str]]
+    ) -> None:
+        if self.permission_cache is not None:
+            self.permission_cache.set(f"{topic.tenant}/{topic.namespace}", permissions)
+
+    # The helpers below build the requests and handle the responses of
+    # both TopicAPI and AsyncTopicAPI, which only differ in the I/O.
+    def _topic_url(self, topic: Topic) -> str:
+        return "{base_url}/{persistence}/{tenant}/{namespace}/{topic}".format(
             base_url=self.__base_url__,
             persistence="persistent" if topic.persistent else "non-persistent",
             tenant=topic.tenant,
             namespace=topic.namespace,
             topic=topic.name,
-            role=role,
         )
 
-        r = self._post(url, json=permissions)
+    def _topic_list_url(self, topic: Topic) -> str:
+        url = "{base_url}/{persistence}/{tenant}/{namespace}".format(
+            base_url=self.__base_url__,
+            persistence="persistent" if topic.persistent else "non-persistent",
+            tenant=topic.tenant,
+            namespace=topic.namespace,
+        )
+        if topic.partitions > 0:
+            url = f"{url}/partitioned"
+        return url
+
+    def _partitions(self, r: Any) -> int:
+        if r.status_code != 200:
+            self._handle_error(r)
 
-        if not (200 <= r.status_code <= 204):
+        try:
+            return int(self._json(r)["partitions"])
+        except Exception as e:
+            raise ParsingException(f"Unable to parse response: {e}")
+
+    # Tells from the answer to a single topic lookup (the metadata of the
+    # topic or its partitioned metadata) whether it exists, or None if
+    # the broker couldn't tell. A partitioned topic that exists has more
+    # than 0 partitions, otherwise it's either missing or not partitioned.
+    def _found(self, topic: Topic, r: Any) -> Optional[bool]:
+        if r.status_code == 404:
+            self._seen(topic, False)
+            return False
+        if r.status_code in LIST_FALLBACK_STATUS_CODES:
+            return None
+        if r.status_code != 200:
             self._handle_error(r)
 
-    def _del_role_permissions(self, topic: Topic, role: str) -> None:
-        url = "{base_url}/{persistence}/{tenant}/{namespace}/{topic}/permissions/{role}".format(
+        partitions = self._partitions(r) if topic.partitions > 0 else 0
+        if topic.partitions > 0 and partitions == 0:
+            self._seen(topic, False)
+            return False
+
+        if self.inventory is not None:
+            self.inventory.add_topic(topic, partitions)
+        return True
+
+    # Looks for the topic in the topic list of its namespace. With an
+    # inventory the list is kept for the other topics of the namespace,
+    # otherwise (busy namespaces have tens of thousands of topics) the
+    # topic is looked for without building the whole list.
+    def _listed(self, topic: Topic, r: Any) -> bool:
+        if r.status_code != 200:
+            self._handle_error(r)
+
+        try:
+            if self.inventory is None:
+                return json_array_contains(r.content, topic.full_name)
+            names = frozenset(self._json(r))
+        except Exception as e:
+            raise ParsingException(f"Unable to parse response: {e}")
+
+        self.inventory.add_topic_list(topic, names)
+        return topic.full_name in names
+
+    # Returns the URL and the request options of the single topic lookup
+    # telling whether the topic exists. Only the metadata of the topic is
+    # read: asking for its stats would make the owning broker load it.
+    def _existence_request(self, topic: Topic) -> Tuple[str, Dict[str, Any]]:
+        if topic.partitions > 0:
+            # Partitioned topic metadata is kept by any broker
+            return f"{self._topic_url(topic)}/partitions", {}
+        if topic.persistent:
+            # The owning broker reads the managed ledger info from the
+            # metadata store without loading the topic
+            return f"{self._topic_url(topic)}/internal-info", {"topic": topic}
+        # Non-persistent topics only exist while their owner has them
+        # loaded, their stats don't load anything
+        return f"{self._topic_url(topic)}/stats", {"topic": topic}
+
+    # Returns the URL and the body of the request creating the topic
+    def _create_request(self, topic: Topic) -> Tuple[str, Optional[int]]:
+        if topic.partitions > 0:
+            return f"{self._topic_url(topic)}/partitions", topic.partitions
+        return self._topic_url(topic), None
+
+    def _created(self, topic: Topic, r: Any) -> None:
+        if 200 <= r.status_code <= 204 or r.status_code == 409:
+            self._seen(topic, True)
+        self._ensure_success(r)
+
+    # Returns the (method, url, body) of the requests setting the policies
+    # of the topic
+    def _policy_requests(self, topic: Topic) -> List[Tuple[APIRequestType, str, Any]]:
+        base_url = self._topic_url(topic)
+        requests = []
+        for _, uri in topic.api_uris().items():
+            method, url = uri.endpoint(base_url)
+            requests.append((APIRequestType(method), url, uri.value))
+        return requests
+
+    def _delete_url(self, topic: Topic) -> str:
+        if topic.partitions > 0:
+            return f"{self._topic_url(topic)}/partitions"
+        return self._topic_url(topic)
+
+    def _deleted(self, topic: Topic, r: Any) -> None:
+        if r.status_code in (204, 404):
+            self._seen(topic, False)
+        if r.status_code != 204:
+            self._handle_error(r)
+
+    def _namespace_permissions_url(self, topic: Topic) -> str:
+        return "{base_url}/namespaces/{tenant}/{namespace}/permissions".format(
             base_url=self.__base_url__,
-            persistence="persistent" if topic.persistent else "non-persistent",
             tenant=topic.tenant,
             namespace=topic.namespace,
-            topic=topic.name,
-            role=role,
         )
 
-        r = self._delete(url)
+    def _permissions_url(self, topic: Topic) -> str:
+        return f"{self._topic_url(topic)}/permissions"
+
+    def _role_url(self, topic: Topic, role: str) -> str:
+        return f"{self._topic_url(topic)}/permissions/{role}"
+
+    def _parse_namespace_permissions(
+        self, topic: Topic, r: Any
+    ) -> Dict[str, List[str]]:
+        if r.status_code != 200:
+            self._handle_error(r)
+
+        try:
+            permissions = self._json(r)
+        except Exception as e:
+            raise ParsingException(f"Unable to parse response: {e}")
+        self._cache_namespace_permissions(topic, permissions)
+        return permissions
+
+    # Subtracts the namespace permissions from the topic permissions
+    def _parse_permissions(
+        self, r: Any, namespacePermissions: Dict[str, List[str]]
+    ) -> Dict[str, List[str]]:
+        if r.status_code != 200:
+            self._handle_error(r)
 
+        try:
+            topicPermissions = self._json(r)
+        except Exception as e:
+            raise ParsingException(f"Unable to parse response: {e}")
+
+        # calculate delta
+        permissions = {}
+        for key, value in topicPermissions.items():
+            if namespacePermissions.get(key) == None:
+                permissions[key] = value
+            else:  # permission exists in namespacePermissions
+                action = list(set(value) - set(namespacePermissions.get(key)))
+                if action != []:
+                    permissions[key] = action
+        return permissions
+
+    # Roles that have permissions on the topic but not in the spec
+    def _removed_roles(
+        self, topic: Topic, current_permissions: Dict[str, List[str]]
+    ) -> List[str]:
+        return [role for role in current_permissions if role not in topic.permissions]
+
+    def _role_deleted(self, r: Any) -> None:
         if not (200 <= r.status_code <= 204):
             # 412 is returned if we're trying to delete a role permission set
             # on namespace level exclusively.
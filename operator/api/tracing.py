@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional, Any, Dict, Iterator
+
+# opentelemetry-api (and opentelemetry-sdk to export the spans) are
+# optional dependencies only needed for tracing. Without them spans are
+# simply not recorded.
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None  # type: ignore
+
+TRACER_NAME = "neuron"
+DEFAULT_SERVICE_NAME = "neuron-operator"
+
+# Lowest status code marking an API call span as failed. A 404 is how a
+# lot of the checks learn that something doesn't exist so 4xx are fine.
+ERROR_STATUS_CODE = 500
+
+_provider_lock = threading.Lock()
+_provider: Optional[Any] = None
+
+
+# span opens a span that is the child of the current one, e.g. an API
+# call made by a handler. It yields None when tracing is unavailable.
+# Exceptions are recorded on the span and mark it as failed.
+@contextmanager
+def span(
+    name: str, attributes: Optional[Dict[str, Any]] = None, client: bool = False
+) -> Iterator[Optional[Any]]:
+    if trace is None:
+        yield None
+        return
+
+    kind = trace.SpanKind.CLIENT if client else trace.SpanKind.INTERNAL
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(
+        name, kind=kind, attributes=attributes
+    ) as current:
+        yield current
+
+
+# Opens the span of a single Pulsar admin API call
+@contextmanager
+def request_span(api: str, method: str, endpoint: str) -> Iterator[Optional[Any]]:
+    with span(
+        f"{method} {endpoint}",
+        {
+            "http.request.method": method,
+            "url.template": endpoint,
+            "neuron.api": api,
+        },
+        client=True,
+    ) as current:
+        yield current
+
+
+def set_response(current: Optional[Any], status_code: int) -> None:
+    if current is None or not current.is_recording():
+        return
+
+    current.set_attribute("http.response.status_code", status_code)
+    if status_code >= ERROR_STATUS_CODE:
+        current.set_status(trace.Status(trace.StatusCode.ERROR))
+
+
+# configure_tracing exports the spans of this process as JSON lines to
+# `path`, which works without a collector. Requires opentelemetry-sdk.
+def configure_tracing(path: str, service_name: str = DEFAULT_SERVICE_NAME) -> None:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+    )
+
+    global _provider
+    with _provider_lock:
+        if _provider is not None:
+            return
+
+        out = open(path, "a", buffering=1)
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name})
+        )
+        provider.add_span_processor(
+            BatchSpanProcessor(
+                ConsoleSpanExporter(
+                    out=out,
+                    formatter=lambda s: s.to_json(indent=None) + "\n",
+                )
+            )
+        )
+        trace.set_tracer_provider(provider)
+        _provider = provider
+
+
+# Flushes the spans not exported yet, e.g. when the operator stops
+def shutdown_tracing() -> None:
+    global _provider
+    with _provider_lock:
+        if _provider is not None:
+            _provider.shutdown()
+            _provider = None
@@ -0,0 +1,537 @@
+import requests
+import threading
+import time
+from .token import TokenCache
+from .retry import RetryPolicy
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenException,
+    FAILURE_STATUS_CODES,
+)
+from .endpoints import Endpoint, EndpointPool
+from .codec import json_dumps, JSON_CONTENT_TYPE
+from .metrics import APIMetrics
+from .slowlog import SlowCallLog
+from .ledger import record_retry
+from .tls import ResumingSSLContext, create_ssl_context, read_session_tickets
+from .rate_limit import RateLimiter
+from .singleflight import Group
+from .deadline import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    current_deadline,
+    request_timeouts,
+)
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from dataclasses import dataclass, field
+from typing import (
+    Optional,
+    Any,
+    Union,
+    Dict,
+    Tuple,
+    Sequence,
+    Callable,
+    Generator,
+)
+
+# Connection pool defaults used when nothing else is configured.
+# `pool_maxsize` is the number of keep-alive connections kept open
+# to the Pulsar API and `pool_block` makes callers wait for a free
+# connection instead of opening throwaway connections when all of
+# them are in use.
+DEFAULT_POOL_CONNECTIONS = 1
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_BLOCK = False
+
+# Number of connections opened to each endpoint by `warm_up`
+DEFAULT_WARMUP_CONNECTIONS = 4
+
+DEFAULT_TOKEN_PATH = "/var/run/secrets/pulsar/TOKEN"
+
+
+# This is needed to support HTTPS connections where the hostname
+# in the certificate is different from the hostname used to initiate
+# the connection. i.e. in-cluster we use service hostname but the
+# pulsar broker has a certificate for external DNS.
+#
+# requests doesn't have any way of simply specifying the SNI to use
+# for verification so we need to create an HTTPAdapter that will
+# be used to verify all connections made to certain connection prefixes.
+class HostnameCheckAdapter(requests.sessions.HTTPAdapter):
+    __sni_hostname__: Optional[str] = None
+    __ssl_context__: Optional[ResumingSSLContext] = None
+
+    def __init__(
+        self,
+        sni: Optional[str] = None,
+        ssl_context: Optional[ResumingSSLContext] = None,
+        **kwargs,
+    ):
+        self.__sni_hostname__ = sni
+        self.__ssl_context__ = ssl_context
+        super().__init__(**kwargs)
+
+    # Connections share an SSL context that resumes TLS sessions
+    def init_poolmanager(self, *args, **kwargs):
+        if self.__ssl_context__ is not None:
+            kwargs["ssl_context"] = self.__ssl_context__
+        return super().init_poolmanager(*args, **kwargs)
+
+    def cert_verify(
+        self,
+        conn: Union[HTTPConnectionPool, HTTPSConnectionPool],
+        url: str,
+        verify: Union[None, str, bool],
+        cert,
+    ) -> bool:
+        # Check that the conn is actually a HTTPSConnectionPool and
+        # we have an SNI to verify against.
+        if conn.scheme == "https" and self.__sni_hostname__:
+            # Setting the `assert_hostname` instructs urllib3 that it
+            # should check for that domain in the certification step.
+            setattr(conn, "assert_hostname", self.__sni_hostname__)
+
+        # Handover to HTTPAdapter's `cert_verify` method
+        return super(HostnameCheckAdapter, self).cert_verify(conn, url, verify, cert)
+
+
+# Counters for all requests going through a transport.
+@dataclass
+class TransportMetrics:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    # Requests delayed by the rate limiter and the total time they waited
+    throttled: int = 0
+    throttle_wait: float = 0.0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record(self, status_code: Optional[int], size: int = 0) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += size
+            if status_code is None or status_code >= 400:
+                self.errors += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_throttle(self, wait: float) -> None:
+        with self._lock:
+            self.throttled += 1
+            self.throttle_wait += wait
+
+
+# Steps of a request yielded by `TransportBase._attempts`: send an attempt
+# to `url` with the (connect, read) `timeout`...
+@dataclass
+class Send:
+    url: str
+    timeout: Tuple[float, float]
+
+
+# ...or wait before the next one
+@dataclass
+class Sleep:
+    seconds: float
+
+
+# TransportBase holds what's common to the sync and async transports: the
+# API location, the token, request metrics and the attempts of a request.
+class TransportBase:
+    __base_url__: str
+    __token_path__: str = DEFAULT_TOKEN_PATH
+    __sni__: Optional[str] = None
+    __token_cache__: TokenCache
+
+    metrics: TransportMetrics
+    retry_policy: RetryPolicy
+    breaker: CircuitBreaker
+    rate_limiter: RateLimiter
+    connect_timeout: float
+    read_timeout: float
+    endpoints: EndpointPool
+    ssl_context: Optional[ResumingSSLContext]
+    # Errors of a single attempt that are worth retrying, set by the
+    # transports for their HTTP client
+    connection_errors: Tuple[type, ...]
+    # Prometheus metrics of the API calls, disabled unless given
+    api_metrics: Optional[APIMetrics]
+    # Log of the slow calls and large responses, disabled unless given
+    slow_call_log: Optional[SlowCallLog]
+
+    def __init__(
+        self,
+        base_url: str,
+        token_path: Optional[str] = None,
+        sni: Optional[str] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = DEFAULT_POOL_BLOCK,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        endpoints: Optional[Sequence[str]] = None,
+        tls_session_resumption: bool = True,
+        api_metrics: Optional[APIMetrics] = None,
+        slow_call_log: Optional[SlowCallLog] = None,
+    ):
+        self.__base_url__ = base_url
+        self.__sni__ = sni
+        if token_path:
+            self.__token_path__ = token_path
+
+        self.__pool_connections__ = pool_connections
+        self.__pool_maxsize__ = pool_maxsize
+        self.__pool_block__ = pool_block
+        self.__token_cache__ = TokenCache(self.__token_path__)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Additional admin endpoints the requests are spread over
+        self.endpoints = EndpointPool([base_url, *(endpoints or [])])
+        self.ssl_context = (
+            self._create_ssl_context() if tls_session_resumption else None
+        )
+
+        self.metrics = TransportMetrics()
+        self.api_metrics = api_metrics
+        self.slow_call_log = slow_call_log
+
+    @property
+    def base_url(self) -> str:
+        return self.__base_url__
+
+    def _create_ssl_context(self) -> ResumingSSLContext:
+        return create_ssl_context(check_hostname=True)
+
+    # token returns the bearer token from an in-memory cache that only
+    # re-reads the token file when it has changed or is about to expire.
+    def token(self) -> Optional[str]:
+        return self.__token_cache__.get()
+
+    def _headers(self) -> Dict[str, str]:
+        token = self.token()
+        if token is not None:
+            return {"Authorization": f"Bearer {token}"}
+        return {}
+
+    # Encodes a JSON body with the fastest available codec. Returns the
+    # body to send and the headers that go with it.
+    def _body(
+        self, data: Optional[Any], json: Optional[Any]
+    ) -> Tuple[Optional[Any], Dict[str, str]]:
+        if json is None:
+            return data, {}
+        return json_dumps(json), {"Content-Type": JSON_CONTENT_TYPE}
+
+    # Takes a token from the rate limiter and returns how long to wait
+    # before sending the request.
+    def _throttle(self, method: str) -> float:
+        wait = self.rate_limiter.reserve(method)
+        if wait > 0:
+            self.metrics.record_throttle(wait)
+        return wait
+
+    # add_route registers another base URL requests are sent to besides
+    # the endpoints, e.g. a broker topic calls are routed to directly.
+    def add_route(self, url: str) -> None:
+        pass
+
+    # Returns the (connect, read) timeouts of the next attempt, shortened
+    # to the time left until the deadline of the running handler. Raises
+    # DeadlineExceeded once there's no time left.
+    def _timeouts(self) -> Tuple[float, float]:
+        return request_timeouts(self.connect_timeout, self.read_timeout)
+
+    # Caps a delay (backoff or rate limiting) to the time left until the
+    # deadline so the next attempt fails right away instead of sleeping
+    # past it.
+    def _delay(self, delay: float) -> float:
+        deadline = current_deadline()
+        if deadline is not None:
+            return min(delay, deadline.remaining())
+        return delay
+
+    # Picks the endpoint for the next attempt, avoiding the ones that
+    # already failed, and returns it with the URL rewritten to it.
+    def _acquire(self, url: str, failed: Sequence[Endpoint]) -> Tuple[Endpoint, str]:
+        endpoint = self.endpoints.acquire(exclude=failed)
+        return endpoint, self.endpoints.rewrite(url, endpoint)
+
+    # Feeds the outcome of an attempt to the endpoint pool and returns
+    # whether the endpoint failed. There's no endpoint for requests sent
+    # to other hosts.
+    def _release(
+        self, endpoint: Optional[Endpoint], started: float, status_code: Optional[int]
+    ) -> bool:
+        ok = status_code is not None and status_code not in FAILURE_STATUS_CODES
+        if endpoint is not None:
+            self.endpoints.release(endpoint, time.monotonic() - started, ok)
+        return not ok
+
+    # Raises CircuitOpenException instead of letting a request through
+    # while the Pulsar API is known to be down.
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenException(self.breaker.retry_after())
+
+    # _record is called after every attempt with the response status code
+    # or None if the API couldn't be reached at all. Only the attempts
+    # sent to the endpoints (`pooled`) count for the circuit breaker.
+    def _record(
+        self, status_code: Optional[int], size: int = 0, pooled: bool = True
+    ) -> None:
+        # The token might have been rotated since we last looked at it
+        if status_code == 401:
+            self.__token_cache__.invalidate()
+
+        if pooled:
+            self.breaker.record(status_code)
+        self.metrics.record(status_code, size)
+
+    # _attempts runs the attempts of a request: it waits for the rate
+    # limiter, checks the circuit breaker, picks an endpoint and retries
+    # transient failures according to the retry policy. It's shared by the
+    # sync and async transports which do the I/O it asks for: it yields
+    # Send to send an attempt, getting the response back (or the error of
+    # the attempt thrown in), and Sleep to wait. It returns the response
+    # of the last attempt.
+    #
+    # Requests to other hosts than the endpoints (a broker a topic call is
+    # routed to) bypass the endpoint pool and the circuit breaker, which
+    # keep track of the endpoints only. They aren't retried on connection
+    # errors either: the caller falls back to the endpoints instead.
+    def _attempts(
+        self, method: str, url: str, idempotent: Optional[bool] = None
+    ) -> Generator[Union[Send, Sleep], Any, Any]:
+        policy = self.retry_policy
+        retryable = policy.retryable(method, idempotent)
+        pooled = self.endpoints.owns(url)
+        attempt = 0
+        delay = policy.base_delay
+        failed = []
+
+        while True:
+            attempt += 1
+            # Fail fast while the circuit is open instead of taking a rate
+            # limiter token and waiting for it first. The half-open probe
+            # is only claimed by _check_breaker, right before sending.
+            if pooled and not self.breaker.available:
+                raise CircuitOpenException(self.breaker.retry_after())
+
+            wait = self._throttle(method)
+            if wait > 0:
+                yield Sleep(self._delay(wait))
+
+            timeout = self._timeouts()
+            if pooled:
+                self._check_breaker()
+                # Failed attempts are retried on another endpoint
+                endpoint, endpoint_url = self._acquire(url, failed)
+            else:
+                endpoint, endpoint_url = None, url
+            started = time.monotonic()
+
+            try:
+                r = yield Send(endpoint_url, timeout)
+            except self.connection_errors:
+                self._release(endpoint, started, None)
+                failed.append(endpoint)
+                self._record(None, pooled=pooled)
+                if not pooled or not retryable or attempt >= policy.max_attempts:
+                    raise
+                delay = policy.delay(delay) or 0.0
+            except BaseException:
+                # Includes cancellation of a handler awaiting the request
+                if pooled:
+                    self.endpoints.release(endpoint, None, True)
+                    self.breaker.release()
+                raise
+            else:
+                if self._release(endpoint, started, r.status_code):
+                    failed.append(endpoint)
+                self._record(r.status_code, len(r.content), pooled)
+                if attempt >= policy.max_attempts or not policy.retry_status(
+                    method, r.status_code, idempotent
+                ):
+                    return r
+
+                retry_delay = policy.delay(delay, r.headers)
+                if retry_delay is None:
+                    return r
+                delay = retry_delay
+
+            self.metrics.record_retry()
+            record_retry()
+            yield Sleep(self._delay(delay))
+
+
+# Transport owns everything needed to talk to the Pulsar API: the pooled
+# session with its HostnameCheckAdapter, the token and request metrics.
+# A single transport is shared by all the API classes in the `API` facade
+# so that calls to tenant, namespace, topic and schema endpoints reuse
+# the same warm connections.
+class Transport(TransportBase):
+    __session__: Optional[requests.Session] = None
+    __session_lock__: threading.Lock
+
+    # Errors of a single attempt that are worth retrying
+    connection_errors: Tuple[type, ...] = (requests.ConnectionError, requests.Timeout)
+
+    # Coalesces identical GET requests made at the same time
+    singleflight: Group
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.__session_lock__ = threading.Lock()
+        self.__routes__ = set()
+        self.singleflight = Group()
+
+    # session returns the long-lived session shared by all requests made
+    # through this transport. The session keeps its connections alive in
+    # a urllib3 pool so TCP and TLS handshakes are only paid once per
+    # connection instead of once per request.
+    @property
+    def session(self) -> requests.Session:
+        if self.__session__ is None:
+            with self.__session_lock__:
+                if self.__session__ is None:
+                    session = requests.Session()
+                    self.mount(session)
+                    self.__session__ = session
+
+        return self.__session__
+
+    def mount(self, session: requests.Session) -> None:
+        adapter = self.create_adapter()
+        for url in [*self.endpoints.urls, *self.__routes__]:
+            session.mount(url, adapter)
+
+    # Routes get the HostnameCheckAdapter like the endpoints
+    def add_route(self, url: str) -> None:
+        with self.__session_lock__:
+            if url in self.__routes__:
+                return
+            self.__routes__.add(url)
+            if self.__session__ is not None:
+                self.__session__.mount(url, self.create_adapter())
+
+    # urllib3 checks the hostname itself so it can check it against the
+    # SNI override. Trust the same CAs requests does.
+    def _create_ssl_context(self) -> ResumingSSLContext:
+        return create_ssl_context(check_hostname=False, cafile=requests.certs.where())
+
+    def create_adapter(self) -> HostnameCheckAdapter:
+        return HostnameCheckAdapter(
+            sni=self.__sni__,
+            ssl_context=self.ssl_context,
+            pool_connections=self.__pool_connections__,
+            pool_maxsize=self.__pool_maxsize__,
+            pool_block=self.__pool_block__,
+        )
+
+    # warm_up opens up to `connections` connections to each endpoint and
+    # puts them in the pool so the first requests don't all pay for a
+    # TCP and TLS handshake at once. Returns the number of connections
+    # opened.
+    def warm_up(self, connections: int = DEFAULT_WARMUP_CONNECTIONS) -> int:
+        opened = 0
+        for url in self.endpoints.urls:
+            adapter = self.session.get_adapter(url)
+            pool = adapter.get_connection(url)
+            # Set up certificate verification like sending a request does
+            adapter.cert_verify(pool, url, True, None)
+
+            conns = []
+            try:
+                for _ in range(min(connections, self.__pool_maxsize__)):
+                    conn = pool._get_conn()
+                    conns.append(conn)
+                    if conn.sock is None:
+                        conn.timeout = self.connect_timeout
+                        conn.connect()
+                        read_session_tickets(conn.sock)
+                        opened += 1
+            finally:
+                for conn in conns:
+                    pool._put_conn(conn)
+
+        return opened
+
+    def close(self) -> None:
+        with self.__session_lock__:
+            if self.__session__ is not None:
+                self.__session__.close()
+                self.__session__ = None
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Any] = None,
+        json: Optional[Any] = None,
+        session: Optional[requests.Session] = None,
+        idempotent: Optional[bool] = None,
+    ) -> requests.Response:
+        if not session:
+            # Reuse the pooled session
+            session = self.session
+        elif not isinstance(session.get_adapter(url), HostnameCheckAdapter):
+            # Mount the HostnameCheckAdapter for all endpoints
+            self.mount(session)
+
+        # Create the request. Sending a prepared request skips the default
+        # headers of the session so compression is asked for here, topic
+        # lists of big namespaces compress really well.
+        data, headers = self._body(data, json)
+        req = requests.Request(
+            method,
+            url,
+            data=data,
+            headers={"Accept-Encoding": "gzip, deflate", **headers},
+        )
+        prepped = req.prepare()
+
+        def send(url: str, timeout: Tuple[float, float]) -> requests.Response:
+            prepped.url = url
+            prepped.headers.update(self._headers())
+            return session.send(prepped, timeout=timeout)  # type: ignore
+
+        return self._send_with_retries(method, prepped.url, send, idempotent)
+
+    # _send_with_retries runs the attempts of a request (see `_attempts`)
+    # with `send` doing the actual I/O of one attempt given the endpoint
+    # URL and the timeouts to use.
+    def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        send: Callable[[str, Tuple[float, float]], Any],
+        idempotent: Optional[bool] = None,
+    ) -> Any:
+        attempts = self._attempts(method, url, idempotent)
+        try:
+            step = next(attempts)
+            while True:
+                try:
+                    if isinstance(step, Sleep):
+                        time.sleep(step.seconds)
+                        result = None
+                    else:
+                        result = send(step.url, step.timeout)
+                except BaseException as e:
+                    step = attempts.throw(e)
+                else:
+                    step = attempts.send(result)
+        except StopIteration as stop:
+            return stop.value
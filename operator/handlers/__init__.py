@@ -3,3 +3,4 @@ from .tenant import *
 from .namespace import *
 from .topic import *
 from .schema import *
+from . import aio
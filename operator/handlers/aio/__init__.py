@@ -0,0 +1,3 @@
+# Async flavour of the handlers, registered with kopf instead of the sync
+# ones when NEURON_ASYNC_HANDLERS is enabled (see `handlers.common`).
+from . import tenant, namespace, topic, schema
@@ -0,0 +1,46 @@
+import kopf
+from models import NeuronStatus, status_handler
+from api.aio import AsyncAPI
+from ..common import (
+    CLUSTER_ANNOTATION,
+    ASYNC_REGISTRY,
+    connection_handler,
+    run_steps_async,
+)
+from ..namespace import (
+    NamespaceConditionType,
+    DEADLINE,
+    cluster_check,
+    reconcile_namespace,
+    delete_namespace,
+)
+
+
+############################
+## Main Namespace Handler ##
+############################
+@kopf.on.update("neuron.isf", "neuronnamespaces", registry=ASYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neuronnamespaces", registry=ASYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neuronnamespaces", registry=ASYNC_REGISTRY, retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(NamespaceConditionType.ConnectionOK, deadline=DEADLINE)
+async def namespace_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    meta: dict,
+    spec: dict,
+    **_,
+):
+    await run_steps_async(reconcile_namespace(status, memo, AsyncAPI, meta, spec))
+
+
+####################
+## Delete Handler ##
+####################
+@kopf.on.delete("neuron.isf", "neuronnamespaces", registry=ASYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(NamespaceConditionType.ConnectionOK, deadline=DEADLINE)
+async def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    await run_steps_async(delete_namespace(status, memo, AsyncAPI, body, logger))
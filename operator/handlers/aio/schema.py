@@ -0,0 +1,46 @@
+import kopf
+from models import NeuronStatus, status_handler
+from api.aio import AsyncAPI
+from ..common import (
+    CLUSTER_ANNOTATION,
+    ASYNC_REGISTRY,
+    connection_handler,
+    run_steps_async,
+)
+from ..schema import (
+    SchemaConditionType,
+    DEADLINE,
+    cluster_check,
+    reconcile_schema,
+    delete_schema,
+)
+
+
+#########################
+## Main Schema Handler ##
+#########################
+@kopf.on.update("neuron.isf", "neuronschemas", registry=ASYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neuronschemas", registry=ASYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neuronschemas", registry=ASYNC_REGISTRY, retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(SchemaConditionType.ConnectionOK, deadline=DEADLINE)
+async def schema_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    body: kopf.Body,
+    topic_idx: kopf.Index,
+    **_,
+):
+    await run_steps_async(reconcile_schema(status, memo, AsyncAPI, body, topic_idx))
+
+
+####################
+## Delete Handler ##
+####################
+@kopf.on.delete("neuron.isf", "neuronschemas", registry=ASYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(SchemaConditionType.ConnectionOK, deadline=DEADLINE)
+async def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    await run_steps_async(delete_schema(status, memo, AsyncAPI, body, logger))
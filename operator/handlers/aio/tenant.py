@@ -0,0 +1,46 @@
+import kopf
+from models import NeuronStatus, status_handler
+from api.aio import AsyncAPI
+from ..common import (
+    CLUSTER_ANNOTATION,
+    ASYNC_REGISTRY,
+    connection_handler,
+    run_steps_async,
+)
+from ..tenant import (
+    TenantConditionType,
+    DEADLINE,
+    cluster_check,
+    reconcile_tenant,
+    delete_tenant,
+)
+
+
+#########################
+## Main Tenant Handler ##
+#########################
+@kopf.on.update("neuron.isf", "neurontenants", registry=ASYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neurontenants", registry=ASYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neurontenants", registry=ASYNC_REGISTRY, interval=600, initial_delay=60, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TenantConditionType.ConnectionOK, deadline=DEADLINE)
+async def tenant_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    meta: dict,
+    spec: dict,
+    **_,
+):
+    await run_steps_async(reconcile_tenant(status, memo, AsyncAPI, meta, spec))
+
+
+####################
+## Delete Handler ##
+####################
+@kopf.on.delete("neuron.isf", "neurontenants", registry=ASYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TenantConditionType.ConnectionOK, deadline=DEADLINE)
+async def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    await run_steps_async(delete_tenant(status, memo, AsyncAPI, body, logger))
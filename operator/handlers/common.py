@@ -1,10 +1,35 @@
 import kopf
+import os
+import inspect
 from models import NeuronStatus, status_handler
+from .profiler import profile_scope
+from api import CircuitOpenException, DeadlineExceeded, deadline_scope, tracing
 from enum import Enum
+from functools import wraps
+from typing import Any, Generator, Optional, Tuple, Type, TypeVar
 
 
+T = TypeVar("T")
+
 CLUSTER_ANNOTATION = "neuron.rbi.tech/cluster"
 
+CONFIG_ASYNC_HANDLERS = "NEURON_ASYNC_HANDLERS"
+CONFIG_HANDLER_DEADLINE = "NEURON_HANDLER_DEADLINE"
+
+# The tenant, namespace, topic and schema handlers come in a sync flavour
+# (run by kopf in its thread pool, using `api.API`) and an async flavour
+# (run on the event loop, using `api.AsyncAPI`). Only the flavour selected
+# with NEURON_ASYNC_HANDLERS is registered with kopf's default registry,
+# the other one is registered to a registry that's never run.
+ASYNC_HANDLERS = os.environ.get(CONFIG_ASYNC_HANDLERS, "false").lower() == "true"
+
+SYNC_REGISTRY = (
+    kopf.OperatorRegistry() if ASYNC_HANDLERS else kopf.get_default_registry()
+)
+ASYNC_REGISTRY = (
+    kopf.get_default_registry() if ASYNC_HANDLERS else kopf.OperatorRegistry()
+)
+
 
 class CommonConditionType(str, Enum):
     ClusterTargetOK = "ClusterTargetOK"
@@ -20,6 +45,197 @@ class CommonReason(str, Enum):
     NoClusterTarget = (
         f"Neither spec.neuronClusterName nor {CLUSTER_ANNOTATION} annotation specified"
     )
+    PulsarUnavailable = "Pulsar API unavailable"
+    DeadlineExceeded = "Pulsar API too slow, handler deadline exceeded"
+
+
+# Delay before retrying a handler that couldn't reach the Pulsar API
+CONNECTION_ERROR_DELAY = 5
+
+
+# Returns the transport of the Pulsar client in memo, if any
+def client_transport(kwargs: dict) -> Any:
+    return getattr(kwargs["memo"].get("pulsar_client"), "transport", None)
+
+
+# Returns the errors meaning the handler couldn't get an answer from
+# Pulsar in time. The connection errors depend on the HTTP client of the
+# configured transport (requests, aiohttp or httpx).
+def unavailable_errors(kwargs: dict) -> Tuple[type, ...]:
+    connection_errors = getattr(client_transport(kwargs), "connection_errors", ())
+    return (CircuitOpenException, DeadlineExceeded, *connection_errors)
+
+
+# Time budget (in seconds) of a single handler run, i.e. of all the
+# Pulsar API calls it makes
+DEFAULT_HANDLER_DEADLINE = 120
+
+
+# Returns the handler deadline of a kind (e.g. "topic"), configured with
+# NEURON_TOPIC_HANDLER_DEADLINE or NEURON_HANDLER_DEADLINE for all kinds.
+def handler_deadline(kind: str) -> float:
+    default = os.environ.get(CONFIG_HANDLER_DEADLINE, DEFAULT_HANDLER_DEADLINE)
+    return float(os.environ.get(f"NEURON_{kind.upper()}_HANDLER_DEADLINE", default))
+
+
+# Returns the name handler runs are traced and profiled as, e.g.
+# "topic.delete"
+def handler_name(handler) -> str:
+    kind = handler.__module__.rsplit(".", 1)[-1]
+    return f"{kind}.{handler.__name__}"
+
+
+# Opens the trace span of a handler run with the identity of the
+# resource it handles.
+def handler_span(name: str, kwargs: dict):
+    body = kwargs.get("body") or {}
+    attributes = {
+        "neuron.resource.kind": body.get("kind"),
+        "neuron.resource.namespace": kwargs.get("namespace"),
+        "neuron.resource.name": kwargs.get("name"),
+        "neuron.resource.uid": kwargs.get("uid"),
+        "neuron.resource.generation": body.get("metadata", {}).get("generation"),
+        "kopf.reason": kwargs.get("reason"),
+        "kopf.retry": kwargs.get("retry"),
+    }
+    return tracing.span(
+        name,
+        {
+            key: value if isinstance(value, int) else str(value)
+            for key, value in attributes.items()
+            if value is not None
+        },
+    )
+
+
+# Automatic ConnectionOK condition handling
+# This decorator has to be placed below `status_handler`. It sets the
+# given ConnectionOK condition on the status and turns connection errors
+# into temporary errors. While the circuit breaker of the Pulsar client
+# is open the handler isn't called at all and kopf retries it once the
+# breaker lets a probe request through again.
+#
+# The handler runs with the given deadline: every Pulsar API call uses
+# what's left of it as its timeouts and once it's used up the remaining
+# calls fail and the handler is retried later. Each run is traced in a
+# span the Pulsar API calls are children of, and sampled by the profiler
+# when NEURON_PROFILE_DIR is set.
+#
+# Usage:
+#   @kopf.on.update('neuron.isf', 'neurontopics')
+#   @status_handler(NeuronStatus)
+#   @connection_handler(TopicConditionType.ConnectionOK, deadline=60)
+#   def my_handler(status: NeuronStatus, memo: kopf.Memo, **_):
+#     ...
+def connection_handler(condition: Enum, deadline: Optional[float] = None):
+    def unavailable(
+        status: NeuronStatus,
+        message: str,
+        delay: float,
+        reason: CommonReason = CommonReason.PulsarUnavailable,
+    ):
+        status.set_condition(
+            condition,
+            False,
+            reason=reason.name,
+            message=message,
+        )
+        status.set_phase(CommonPhase.Pending)
+        raise kopf.TemporaryError(message, delay=max(delay, 1))
+
+    def check(kwargs: dict):
+        status = kwargs["status"]
+        breaker = getattr(client_transport(kwargs), "breaker", None)
+
+        if breaker is not None and not breaker.available:
+            unavailable(
+                status, CommonReason.PulsarUnavailable.value, breaker.retry_after()
+            )
+
+        status.set_condition(condition, True)
+
+    def failed(kwargs: dict, e: Exception):
+        if isinstance(e, CircuitOpenException):
+            unavailable(kwargs["status"], str(e), e.retry_after)
+        if isinstance(e, DeadlineExceeded):
+            unavailable(
+                kwargs["status"],
+                str(e),
+                CONNECTION_ERROR_DELAY,
+                reason=CommonReason.DeadlineExceeded,
+            )
+        unavailable(kwargs["status"], str(e), CONNECTION_ERROR_DELAY)
+
+    def wrap_handler(handler):
+        name = handler_name(handler)
+
+        if inspect.iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def async_wrapper(**kwargs):
+                with handler_span(name, kwargs), profile_scope(name):
+                    check(kwargs)
+                    try:
+                        with deadline_scope(deadline):
+                            return await handler(**kwargs)
+                    except unavailable_errors(kwargs) as e:
+                        failed(kwargs, e)
+
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(**kwargs):
+            with handler_span(name, kwargs), profile_scope(name):
+                check(kwargs)
+                try:
+                    with deadline_scope(deadline):
+                        return handler(**kwargs)
+                except unavailable_errors(kwargs) as e:
+                    failed(kwargs, e)
+
+        return wrapper
+
+    return wrap_handler
+
+
+# Returns the Pulsar client of the given flavour (`api.API` or
+# `api.aio.AsyncAPI`) from memo
+def pulsar_client(memo: kopf.Memo, client_type: Type[T]) -> T:
+    client = memo.get("pulsar_client")
+    if client and type(client) == client_type:
+        return client
+    raise kopf.PermanentError("No pulsar client available")
+
+
+# The handlers are written once for both flavours as generators yielding
+# their Pulsar API calls, e.g. `exists = yield api.topic.exists(topic)`.
+# With `api.API` the call has already returned and its result is sent
+# back as is, with `api.AsyncAPI` it returned a coroutine that's awaited
+# first. Either way the errors of the call are raised where it's yielded.
+Steps = Generator[Any, Any, T]
+
+
+def run_steps(steps: Steps[T]) -> T:
+    try:
+        result = next(steps)
+        while True:
+            result = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_steps_async(steps: Steps[T]) -> T:
+    try:
+        call = next(steps)
+        while True:
+            try:
+                result = await call
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
 
 
 def orphan_check(meta: kopf.Meta, spec: kopf.Spec, memo: kopf.Memo, **_):
@@ -2,14 +2,25 @@ import kopf
 import models
 from models import NeuronStatus, status_handler
 from api import API, Tenant, Namespace, APIException
-from .common import CLUSTER_ANNOTATION, CommonConditionType
+from .common import (
+    CLUSTER_ANNOTATION,
+    SYNC_REGISTRY,
+    CommonConditionType,
+    connection_handler,
+    handler_deadline,
+    pulsar_client,
+    run_steps,
+    Steps,
+)
 from enum import Enum
 
 
 ERROR_DELAY = 5
+DEADLINE = handler_deadline("namespace")
 
 
 class NamespaceConditionType(str, Enum):
+    ConnectionOK = "ConnectionOK"
     TenantReady = "TenantReady"
     NamespaceInSync = "NamespaceInSync"
 
@@ -32,17 +43,15 @@ def cluster_check(value: str, memo: kopf.Memo, **_):
     return value == memo.get("cluster_name")
 
 
-@kopf.on.update("neuron.isf", "neuronnamespaces", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.resume("neuron.isf", "neuronnamespaces", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.timer("neuron.isf", "neuronnamespaces", retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def namespace_handler(
+# Reconciles a namespace, shared by the sync and async handlers (see
+# `common.run_steps`)
+def reconcile_namespace(
     status: NeuronStatus,
     memo: kopf.Memo,
+    client_type: type,
     meta: dict,
     spec: dict,
-    **_,
-):
+) -> Steps[None]:
     # At this point we can fix ClusterTargetOK condition
     status.set_condition(CommonConditionType.ClusterTargetOK, True)
 
@@ -50,18 +59,13 @@ def namespace_handler(
     model = models.NamespaceSpec(**spec)
 
     # Get Pulsar client from memo
-    pulsar_client = memo.get("pulsar_client")
-    api: API
-    if pulsar_client and type(pulsar_client) == API:
-        api = pulsar_client
-    else:
-        raise kopf.PermanentError("No pulsar client available")
+    api: API = pulsar_client(memo, client_type)
 
     ############################
     ## Check Tenant in Pulsar ##
     ############################
     tenant = Tenant(name=model.tenant, **{})
-    if not api.tenant.exists(tenant):
+    if not (yield api.tenant.exists(tenant)):
         status.set_condition(
             NamespaceConditionType.TenantReady,
             False,
@@ -79,9 +83,9 @@ def namespace_handler(
     ns = Namespace.from_spec(model)
 
     # Namespace doesn't already exist
-    if not api.namespace.exists(ns):
+    if not (yield api.namespace.exists(ns)):
         try:
-            api.namespace.create(ns)
+            yield api.namespace.create(ns)
         except APIException as e:
             status.set_condition(
                 NamespaceConditionType.NamespaceInSync, False, message=str(e)
@@ -92,8 +96,8 @@ def namespace_handler(
             )
 
     try:
-        api.namespace.update(ns)
-        api.namespace.sync_permissions(ns)
+        yield api.namespace.update(ns)
+        yield api.namespace.sync_permissions(ns)
     except APIException as e:
         status.set_condition(
             NamespaceConditionType.NamespaceInSync, False, message=str(e)
@@ -112,30 +116,43 @@ def namespace_handler(
         status.observedGeneration = meta.get("generation")
 
 
+@kopf.on.update("neuron.isf", "neuronnamespaces", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neuronnamespaces", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neuronnamespaces", registry=SYNC_REGISTRY, retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(NamespaceConditionType.ConnectionOK, deadline=DEADLINE)
+def namespace_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    meta: dict,
+    spec: dict,
+    **_,
+):
+    run_steps(reconcile_namespace(status, memo, API, meta, spec))
+
+
 ####################
 ## Delete Handler ##
 ####################
-@kopf.on.delete("neuron.isf", "neuronnamespaces", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def delete(
-    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
-):
+# Deletes a namespace, shared by the sync and async handlers
+def delete_namespace(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    client_type: type,
+    body: kopf.Body,
+    logger: kopf.Logger,
+) -> Steps[None]:
     model = models.NamespaceSpec(**body.spec)
     if model.lifecyclePolicy == models.LifecyclePolicy.CleanUpAfterDeletion:
         # Get Pulsar client from memo
-        pulsar_client = memo.get("pulsar_client")
-        api: API
-        if pulsar_client and type(pulsar_client) == API:
-            api = pulsar_client
-        else:
-            raise kopf.PermanentError("No pulsar client available")
+        api: API = pulsar_client(memo, client_type)
 
         namespace = Namespace.from_spec(model)
 
         try:
-            if api.namespace.exists(namespace):
+            if (yield api.namespace.exists(namespace)):
                 try:
-                    api.namespace.delete(namespace)
+                    yield api.namespace.delete(namespace)
                 except Exception as e:
                     status.set_condition(
                         NamespaceConditionType.NamespaceInSync,
@@ -150,3 +167,12 @@ def delete(
         except APIException as e:
             logger.warn(f"Unable to check namespace existence: {e.message}")
             logger.warn("Releasing resource anyway.")
+
+
+@kopf.on.delete("neuron.isf", "neuronnamespaces", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(NamespaceConditionType.ConnectionOK, deadline=DEADLINE)
+def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    run_steps(delete_namespace(status, memo, API, body, logger))
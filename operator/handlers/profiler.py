@@ -0,0 +1,223 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Iterator, ContextManager
+
+CONFIG_PROFILE_DIR = "NEURON_PROFILE_DIR"
+CONFIG_PROFILE_INTERVAL = "NEURON_PROFILE_INTERVAL"
+CONFIG_PROFILE_FLUSH_INTERVAL = "NEURON_PROFILE_FLUSH_INTERVAL"
+
+LOGGER_NAME = "neuron.profiler"
+
+# Seconds between two samples, i.e. 100 samples per second. The sampler
+# only looks at the threads running a handler so its overhead is bounded
+# by this rate regardless of the number of handlers.
+DEFAULT_INTERVAL = 0.01
+# Seconds between two profiles written to the profile directory
+DEFAULT_FLUSH_INTERVAL = 60.0
+# Frames deeper than this are cut off
+DEFAULT_MAX_DEPTH = 128
+
+# Root frame of samples taken while several async handlers shared the
+# event loop thread
+ASYNCIO_ROOT = "asyncio"
+
+
+# Returns the stack of `frame` from the outermost call as flamegraph
+# frames, e.g. "topic_handler (topic.py)". Deep stacks keep their
+# innermost `max_depth` frames, the outermost ones (thread bootstrap,
+# kopf, asyncio) are the same for every sample anyway.
+def collapse(frame, max_depth: int = DEFAULT_MAX_DEPTH) -> List[str]:
+    stack = []
+    while frame is not None and len(stack) < max_depth:
+        code = frame.f_code
+        name = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+        stack.append(name.replace(";", ":"))
+        frame = frame.f_back
+
+    stack.reverse()
+    return stack
+
+
+# SamplingProfiler is a statistical profiler for the kopf handlers. A
+# background thread samples the stacks of the threads running a handler
+# (entered with `scope`) every `interval` seconds and every
+# `flush_interval` seconds writes the aggregated samples to `directory`
+# in the collapsed stack format read by flamegraph.pl, speedscope and
+# friends: one "root;frame;...;leaf count" line per distinct stack.
+#
+# Samples are taken from threads, not from tasks. Sync handlers each run
+# in a thread of kopf's pool so their samples are their own. Async
+# handlers all run on the event loop thread: a handler waiting for a
+# Pulsar API call is still credited with whatever the thread does in the
+# meantime, i.e. the loop waiting for I/O and the frames of the other
+# tasks. Their profiles tell where the event loop spends its time while
+# handlers are running rather than what each handler costs.
+#
+# Profiling must never fail a handler: if the profile directory can't be
+# written to, the profiler logs a warning and disables itself.
+class SamplingProfiler:
+    directory: str
+    interval: float
+    flush_interval: float
+    max_depth: int
+    samples: int
+    disabled: bool
+
+    def __init__(
+        self,
+        directory: str,
+        interval: float = DEFAULT_INTERVAL,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ):
+        self.directory = directory
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.disabled = False
+        self.__lock__ = threading.Lock()
+        self.__active__: Dict[int, List[str]] = {}
+        self.__stacks__: Counter = Counter()
+        self.__thread__: Optional[threading.Thread] = None
+        self.__stopped__ = threading.Event()
+
+    # Samples the current thread while the block runs. Async handlers all
+    # run on the event loop thread, samples taken while several of them
+    # are running are put under a common "asyncio" root.
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        if not self.start():
+            yield
+            return
+
+        ident = threading.get_ident()
+        with self.__lock__:
+            self.__active__.setdefault(ident, []).append(name)
+
+        try:
+            yield
+        finally:
+            with self.__lock__:
+                names = self.__active__[ident]
+                names.remove(name)
+                if not names:
+                    del self.__active__[ident]
+
+    # Starts the sampling thread unless it's running already. Returns
+    # whether the profiler is running.
+    def start(self) -> bool:
+        if self.__thread__ is not None or self.disabled:
+            return not self.disabled
+
+        with self.__lock__:
+            if self.__thread__ is None and not self.disabled:
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                except OSError as e:
+                    self._disable(e)
+                else:
+                    self.__stopped__.clear()
+                    self.__thread__ = threading.Thread(
+                        target=self._run, name="neuron-profiler", daemon=True
+                    )
+                    self.__thread__.start()
+
+        return not self.disabled
+
+    # Stops sampling and writes what hasn't been written yet
+    def stop(self) -> None:
+        with self.__lock__:
+            thread, self.__thread__ = self.__thread__, None
+
+        if thread is not None:
+            self.__stopped__.set()
+            thread.join()
+
+    def sample(self) -> None:
+        with self.__lock__:
+            active = {
+                ident: names[0] if len(set(names)) == 1 else ASYNCIO_ROOT
+                for ident, names in self.__active__.items()
+            }
+
+        if not active:
+            return
+
+        frames = sys._current_frames()
+        stacks = []
+        for ident, root in active.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                stacks.append(";".join([root, *collapse(frame, self.max_depth)]))
+
+        with self.__lock__:
+            self.__stacks__.update(stacks)
+            self.samples += len(stacks)
+
+    # Writes the samples taken since the last flush to a new profile and
+    # returns its path, or None if there was nothing to write.
+    def flush(self) -> Optional[str]:
+        with self.__lock__:
+            stacks, self.__stacks__ = self.__stacks__, Counter()
+
+        if not stacks or self.disabled:
+            return None
+
+        timestamp = time.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.directory, f"profile-{timestamp}-{os.getpid()}.folded")
+        try:
+            with open(path, "a") as profile:
+                for stack, count in stacks.most_common():
+                    profile.write(f"{stack} {count}\n")
+        except OSError as e:
+            self._disable(e)
+            return None
+
+        return path
+
+    # Stops taking samples for good. The sampling thread is only told to
+    # stop since it may be the caller.
+    def _disable(self, error: OSError) -> None:
+        logging.getLogger(LOGGER_NAME).warning(
+            "Unable to write profiles to %s, profiling disabled: %s",
+            self.directory,
+            error,
+        )
+        self.disabled = True
+        self.__stopped__.set()
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while not self.__stopped__.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+        self.flush()
+
+
+# The profiler is only enabled when a profile directory is configured
+PROFILER: Optional[SamplingProfiler] = None
+if os.environ.get(CONFIG_PROFILE_DIR):
+    PROFILER = SamplingProfiler(
+        os.environ[CONFIG_PROFILE_DIR],
+        interval=float(os.environ.get(CONFIG_PROFILE_INTERVAL, DEFAULT_INTERVAL)),
+        flush_interval=float(
+            os.environ.get(CONFIG_PROFILE_FLUSH_INTERVAL, DEFAULT_FLUSH_INTERVAL)
+        ),
+    )
+
+
+# Returns the profiling scope of a handler run, which does nothing unless
+# profiling is enabled.
+def profile_scope(name: str) -> ContextManager:
+    if PROFILER is None:
+        return nullcontext()
+    return PROFILER.scope(name)
@@ -3,11 +3,21 @@ import models
 from models import NeuronStatus, status_handler
 from api import API, Tenant, Namespace, Topic, Schema, APIException
 from api.schema_api import IncompatibleSchemaException, ParsingException
-from .common import CLUSTER_ANNOTATION, CommonConditionType
+from .common import (
+    CLUSTER_ANNOTATION,
+    SYNC_REGISTRY,
+    CommonConditionType,
+    connection_handler,
+    handler_deadline,
+    pulsar_client,
+    run_steps,
+    Steps,
+)
 from enum import Enum
 
 
 ERROR_DELAY = 5
+DEADLINE = handler_deadline("schema")
 
 
 # Available condition types for NeuronSchema
@@ -44,17 +54,15 @@ def cluster_check(value: str, memo: kopf.Memo, **_):
     return value == memo.get("cluster_name")
 
 
-@kopf.on.update("neuron.isf", "neuronschemas", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.resume("neuron.isf", "neuronschemas", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.timer("neuron.isf", "neuronschemas", retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def schema_handler(
+# Reconciles a schema, shared by the sync and async handlers (see
+# `common.run_steps`)
+def reconcile_schema(
     status: NeuronStatus,
     memo: kopf.Memo,
+    client_type: type,
     body: kopf.Body,
     topic_idx: kopf.Index,
-    **_,
-):
+) -> Steps[None]:
     # At this point we can fix ClusterTargetOK condition
     status.set_condition(CommonConditionType.ClusterTargetOK, True)
 
@@ -62,18 +70,13 @@ def schema_handler(
     model = models.SchemaSpec(**body.spec)
 
     # Get Pulsar client from memo
-    pulsar_client = memo.get("pulsar_client")
-    api: API
-    if pulsar_client and type(pulsar_client) == API:
-        api = pulsar_client
-    else:
-        raise kopf.PermanentError("No pulsar client available")
+    api: API = pulsar_client(memo, client_type)
 
     ############################
     ## Check Tenant in Pulsar ##
     ############################
     tenant = Tenant(name=model.tenant, **{})
-    if not api.tenant.exists(tenant):
+    if not (yield api.tenant.exists(tenant)):
         status.set_condition(
             SchemaConditionType.TenantReady,
             False,
@@ -91,7 +94,7 @@ def schema_handler(
     ## Check Namespace in Pulsar ##
     ###############################
     ns = Namespace(name=model.namespace, tenant=model.tenant, **{})
-    if not api.namespace.exists(ns):
+    if not (yield api.namespace.exists(ns)):
         status.set_condition(
             SchemaConditionType.NamespaceReady,
             False,
@@ -126,7 +129,7 @@ def schema_handler(
             delay=ERROR_DELAY,
         )
 
-    if not api.topic.exists(topic):
+    if not (yield api.topic.exists(topic)):
         status.set_condition(
             SchemaConditionType.TopicReady,
             False,
@@ -149,7 +152,7 @@ def schema_handler(
 
     # Attempt to update
     try:
-        api.schema.update(schema)
+        yield api.schema.update(schema)
         status.set_condition(SchemaConditionType.SchemaInSync, True)
     except IncompatibleSchemaException:
         status.set_condition(
@@ -187,29 +190,42 @@ def schema_handler(
         status.observedGeneration = body.meta.get("generation")
 
 
+@kopf.on.update("neuron.isf", "neuronschemas", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neuronschemas", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neuronschemas", registry=SYNC_REGISTRY, retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(SchemaConditionType.ConnectionOK, deadline=DEADLINE)
+def schema_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    body: kopf.Body,
+    topic_idx: kopf.Index,
+    **_,
+):
+    run_steps(reconcile_schema(status, memo, API, body, topic_idx))
+
+
 ####################
 ## Delete Handler ##
 ####################
-@kopf.on.delete("neuron.isf", "neuronschemas", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def delete(
-    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
-):
+# Deletes a schema, shared by the sync and async handlers
+def delete_schema(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    client_type: type,
+    body: kopf.Body,
+    logger: kopf.Logger,
+) -> Steps[None]:
     model = models.SchemaSpec(**body.spec)
     if model.lifecyclePolicy == models.LifecyclePolicy.CleanUpAfterDeletion:
         # Get Pulsar client from memo
-        pulsar_client = memo.get("pulsar_client")
-        api: API
-        if pulsar_client and type(pulsar_client) == API:
-            api = pulsar_client
-        else:
-            raise kopf.PermanentError("No pulsar client available")
+        api: API = pulsar_client(memo, client_type)
         schema = Schema.from_spec(model)
 
         try:
-            if api.schema.exists(schema):
+            if (yield api.schema.exists(schema)):
                 try:
-                    api.schema.delete(schema)
+                    yield api.schema.delete(schema)
                 except Exception as e:
                     status.set_condition(
                         SchemaConditionType.SchemaInSync,
@@ -222,3 +238,12 @@ def delete(
         except APIException as e:
             logger.warn(f"Unable to check schema existence: {e.message}")
             logger.warn("Releasing resource anyway.")
+
+
+@kopf.on.delete("neuron.isf", "neuronschemas", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(SchemaConditionType.ConnectionOK, deadline=DEADLINE)
+def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    run_steps(delete_schema(status, memo, API, body, logger))
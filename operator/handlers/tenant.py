@@ -2,9 +2,20 @@ import kopf
 import models
 from models import NeuronStatus, status_handler
 from api import API, Tenant, APIException
-from .common import CLUSTER_ANNOTATION, CommonConditionType
+from .common import (
+    CLUSTER_ANNOTATION,
+    SYNC_REGISTRY,
+    CommonConditionType,
+    connection_handler,
+    handler_deadline,
+    pulsar_client,
+    run_steps,
+    Steps,
+)
 from enum import Enum
 
+DEADLINE = handler_deadline("tenant")
+
 
 class TenantConditionType(str, Enum):
     ConnectionOK = "ConnectionOK"
@@ -24,17 +35,11 @@ def cluster_check(value: str, memo: kopf.Memo, **_):
     return value == memo.get("cluster_name")
 
 
-@kopf.on.update("neuron.isf", "neurontenants", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.resume("neuron.isf", "neurontenants", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.timer("neuron.isf", "neurontenants", interval=600, initial_delay=60, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def tenant_handler(
-    status: NeuronStatus,
-    memo: kopf.Memo,
-    meta: dict,
-    spec: dict,
-    **_,
-):
+# Reconciles a tenant, shared by the sync and async handlers (see
+# `common.run_steps`)
+def reconcile_tenant(
+    status: NeuronStatus, memo: kopf.Memo, client_type: type, meta: dict, spec: dict
+) -> Steps[None]:
     # Create a backoff if retries are more than 10
     delay = 5
 
@@ -45,19 +50,14 @@ def tenant_handler(
     model = models.TenantSpec(**spec)
 
     # Get Pulsar client from memo
-    pulsar_client = memo.get("pulsar_client")
-    api: API
-    if pulsar_client and type(pulsar_client) == API:
-        api = pulsar_client
-    else:
-        raise kopf.PermanentError("No pulsar client available")
+    api: API = pulsar_client(memo, client_type)
 
     tenant = Tenant.from_spec(model)
 
     # Tenant doesn't already exist
-    if not api.tenant.exists(tenant):
+    if not (yield api.tenant.exists(tenant)):
         try:
-            api.tenant.create(tenant)
+            yield api.tenant.create(tenant)
         except APIException as e:
             status.set_condition(
                 TenantConditionType.TenantInSync, False, message=str(e)
@@ -66,7 +66,7 @@ def tenant_handler(
             raise kopf.TemporaryError(f"Unable to create tenant: {e}", delay=delay)
 
     try:
-        api.tenant.update(tenant)
+        yield api.tenant.update(tenant)
     except APIException as e:
         status.set_condition(TenantConditionType.TenantInSync, False, message=str(e))
         status.set_phase(TenantPhase.Pending)
@@ -83,29 +83,42 @@ def tenant_handler(
         status.observedGeneration = meta.get("generation")
 
 
+@kopf.on.update("neuron.isf", "neurontenants", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neurontenants", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neurontenants", registry=SYNC_REGISTRY, interval=600, initial_delay=60, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TenantConditionType.ConnectionOK, deadline=DEADLINE)
+def tenant_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    meta: dict,
+    spec: dict,
+    **_,
+):
+    run_steps(reconcile_tenant(status, memo, API, meta, spec))
+
+
 ####################
 ## Delete Handler ##
 ####################
-@kopf.on.delete("neuron.isf", "neurontenants", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def delete(
-    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
-):
+# Deletes a tenant, shared by the sync and async handlers
+def delete_tenant(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    client_type: type,
+    body: kopf.Body,
+    logger: kopf.Logger,
+) -> Steps[None]:
     model = models.TenantSpec(**body.spec)
     if model.lifecyclePolicy == models.LifecyclePolicy.CleanUpAfterDeletion:
         # Get Pulsar client from memo
-        pulsar_client = memo.get("pulsar_client")
-        api: API
-        if pulsar_client and type(pulsar_client) == API:
-            api = pulsar_client
-        else:
-            raise kopf.PermanentError("No pulsar client available")
+        api: API = pulsar_client(memo, client_type)
         tenant = Tenant.from_spec(model)
 
         try:
-            if api.tenant.exists(tenant):
+            if (yield api.tenant.exists(tenant)):
                 try:
-                    api.tenant.delete(tenant)
+                    yield api.tenant.delete(tenant)
                 except Exception as e:
                     status.set_condition(
                         TenantConditionType.TenantInSync,
@@ -118,3 +131,12 @@ def delete(
         except APIException as e:
             logger.warn(f"Unable to check tenant existence: {e.message}")
             logger.warn("Releasing resource anyway.")
+
+
+@kopf.on.delete("neuron.isf", "neurontenants", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TenantConditionType.ConnectionOK, deadline=DEADLINE)
+def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    run_steps(delete_tenant(status, memo, API, body, logger))
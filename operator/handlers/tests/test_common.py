@@ -0,0 +1,27 @@
+from ..common import connection_handler
+from api import API
+from models import NeuronStatus
+from enum import Enum
+import httpx
+import kopf
+import pytest
+
+
+class ConditionType(str, Enum):
+    ConnectionOK = "ConnectionOK"
+
+
+def test_http2_connection_error_is_temporary():
+    client = API("http://localhost:8080/admin/v2", http2=True)
+
+    @connection_handler(ConditionType.ConnectionOK)
+    def handler(**_):
+        raise httpx.ConnectError("Connection refused")
+
+    status = NeuronStatus()
+    with pytest.raises(kopf.TemporaryError):
+        handler(status=status, memo=kopf.Memo(pulsar_client=client))
+
+    [condition] = status.conditions
+    assert condition.type == ConditionType.ConnectionOK.value
+    assert condition.status == "False"
@@ -0,0 +1,126 @@
+from ..profiler import SamplingProfiler, collapse
+import sys
+import threading
+import pytest
+
+
+def recurse(depth: int):
+    if depth == 0:
+        return collapse(sys._getframe())
+    return recurse(depth - 1)
+
+
+def test_collapse():
+    stack = recurse(2)
+    # Outermost call first
+    assert stack[-4:] == [
+        "test_collapse (test_profiler.py)",
+        "recurse (test_profiler.py)",
+        "recurse (test_profiler.py)",
+        "recurse (test_profiler.py)",
+    ]
+
+
+def test_collapse_keeps_innermost_frames():
+    stack = collapse(sys._getframe(), max_depth=2)
+    assert stack[-1] == "test_collapse_keeps_innermost_frames (test_profiler.py)"
+    assert len(stack) == 2
+
+    assert collapse(sys._getframe(), max_depth=1) == [
+        "test_collapse_keeps_innermost_frames (test_profiler.py)"
+    ]
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    # Only sample when told to
+    profiler = SamplingProfiler(str(tmp_path / "profiles"), interval=3600)
+    yield profiler
+    profiler.stop()
+
+
+def test_scope(profiler):
+    ident = threading.get_ident()
+
+    with profiler.scope("topic.create"):
+        with profiler.scope("topic.update"):
+            assert profiler.__active__ == {ident: ["topic.create", "topic.update"]}
+        assert profiler.__active__ == {ident: ["topic.create"]}
+
+    assert profiler.__active__ == {}
+
+    with pytest.raises(ValueError):
+        with profiler.scope("topic.create"):
+            raise ValueError()
+    assert profiler.__active__ == {}
+
+
+def test_scope_with_unwritable_directory(tmp_path):
+    (tmp_path / "file").write_text("")
+    profiler = SamplingProfiler(str(tmp_path / "file" / "profiles"))
+
+    # The handler runs anyway
+    with profiler.scope("topic.create"):
+        assert profiler.__active__ == {}
+
+    assert profiler.disabled == True
+    assert profiler.start() == False
+
+
+def test_sample_active_threads(profiler):
+    idle = threading.Event()
+    thread = threading.Thread(target=idle.wait)
+    thread.start()
+
+    try:
+        with profiler.scope("topic.create"):
+            profiler.sample()
+            profiler.sample()
+    finally:
+        idle.set()
+        thread.join()
+
+    # The idle thread isn't sampled
+    assert profiler.samples == 2
+    [stack] = profiler.__stacks__
+    assert stack.startswith("topic.create;")
+    # Sampled from the handler thread itself
+    assert stack.endswith(
+        ";test_sample_active_threads (test_profiler.py);sample (profiler.py)"
+    )
+
+    # Samples taken outside of a scope are dropped
+    profiler.sample()
+    assert profiler.samples == 2
+
+
+def test_sample_shared_thread(profiler):
+    with profiler.scope("topic.create"), profiler.scope("namespace.create"):
+        profiler.sample()
+
+    [stack] = profiler.__stacks__
+    assert stack.startswith("asyncio;")
+
+
+def test_flush(profiler):
+    assert profiler.flush() == None
+
+    with profiler.scope("topic.create"):
+        profiler.sample()
+        profiler.sample()
+
+    path = profiler.flush()
+    with open(path) as profile:
+        lines = profile.read().splitlines()
+
+    assert len(lines) == 1
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.split(";")[0] == "topic.create"
+    assert stack.split(";")[-2:] == [
+        "test_flush (test_profiler.py)",
+        "sample (profiler.py)",
+    ]
+    assert count == "2"
+
+    # Samples are only written once
+    assert profiler.flush() == None
@@ -0,0 +1,107 @@
+from ..common import CLUSTER_ANNOTATION
+from ..topic import (
+    TOPIC_LEVEL_POLICIES_ANNOTATION,
+    requeue_topics_with_policies,
+    topic_level_policies_listener,
+)
+from api import RuntimeConfigCache
+from unittest import mock
+import kopf
+import logging
+import threading
+
+
+def neuron_topic(name: str, cluster: str, policies: dict = None) -> dict:
+    return {
+        "metadata": {
+            "name": name,
+            "namespace": "sample",
+            "annotations": {CLUSTER_ANNOTATION: cluster},
+        },
+        "spec": {"topic": name, "policies": policies},
+    }
+
+
+def test_requeue_topics_with_policies():
+    api_instance = mock.Mock()
+    api_instance.list_cluster_custom_object.side_effect = [
+        {
+            "items": [
+                neuron_topic("a", "cluster-1", {"maxProducers": 1}),
+                # Handled by another operator
+                neuron_topic("b", "cluster-2", {"maxProducers": 1}),
+            ],
+            "metadata": {"continue": "next-page"},
+        },
+        {
+            "items": [
+                # Not affected by topic level policies
+                neuron_topic("c", "cluster-1"),
+                neuron_topic("d", "cluster-1", {}),
+                {"metadata": {"name": "e", "namespace": "sample"}, "spec": {}},
+                neuron_topic("f", "cluster-1", {"maxConsumers": 1}),
+            ],
+            "metadata": {},
+        },
+    ]
+
+    assert requeue_topics_with_policies(api_instance, "cluster-1", "enabled") == 2
+
+    # The topics are listed a page at a time
+    [first, second] = api_instance.list_cluster_custom_object.call_args_list
+    assert "_continue" not in first.kwargs
+    assert second.kwargs["_continue"] == "next-page"
+    assert second.kwargs["limit"] == first.kwargs["limit"]
+
+    assert [
+        c.args for c in api_instance.patch_namespaced_custom_object.call_args_list
+    ] == [
+        (
+            "neuron.isf",
+            "v1alpha1",
+            "sample",
+            "neurontopics",
+            name,
+            {"metadata": {"annotations": {TOPIC_LEVEL_POLICIES_ANNOTATION: "enabled"}}},
+        )
+        for name in ["a", "f"]
+    ]
+
+
+def test_topic_level_policies_listener(monkeypatch):
+    monkeypatch.setattr("kubernetes.config.load_config", mock.Mock())
+    monkeypatch.setattr("kubernetes.client.ApiClient", mock.MagicMock())
+    api_instance = mock.Mock()
+    api_instance.list_cluster_custom_object.return_value = {
+        "items": [neuron_topic("a", "cluster-1", {"maxProducers": 1})],
+    }
+    patched = threading.Semaphore(0)
+    api_instance.patch_namespaced_custom_object.side_effect = (
+        lambda *args: patched.release()
+    )
+    monkeypatch.setattr(
+        "kubernetes.client.CustomObjectsApi", lambda api_client: api_instance
+    )
+
+    cache = RuntimeConfigCache(lambda: {})
+    cache.add_listener(
+        "topicLevelPoliciesEnabled",
+        topic_level_policies_listener(
+            kopf.Memo(cluster_name="cluster-1"), logging.getLogger(__name__)
+        ),
+    )
+
+    # Neither the first configuration nor an unchanged one re-queue topics
+    cache.store({"topicLevelPoliciesEnabled": "false"})
+    cache.store({"topicLevelPoliciesEnabled": "false"})
+
+    for state, value in [("enabled", "true"), ("disabled", "false")]:
+        cache.store({"topicLevelPoliciesEnabled": value})
+        assert patched.acquire(timeout=5)
+        body = api_instance.patch_namespaced_custom_object.call_args.args[-1]
+        assert body["metadata"]["annotations"] == {
+            TOPIC_LEVEL_POLICIES_ANNOTATION: state
+        }
+
+    assert api_instance.list_cluster_custom_object.call_count == 2
+    assert api_instance.patch_namespaced_custom_object.call_count == 2
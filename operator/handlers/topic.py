@@ -1,11 +1,32 @@
 import kopf
+import kubernetes.client
+import kubernetes.config
 import models
+import threading
 from models import NeuronStatus, status_handler
 from api import API, Tenant, Namespace, Topic, APIException
-from .common import CLUSTER_ANNOTATION, CommonConditionType
+from .common import (
+    CLUSTER_ANNOTATION,
+    SYNC_REGISTRY,
+    CommonConditionType,
+    connection_handler,
+    handler_deadline,
+    pulsar_client,
+    run_steps,
+    Steps,
+)
 from enum import Enum
+from typing import Any, Callable, Optional
 
 ERROR_DELAY = 5
+DEADLINE = handler_deadline("topic")
+
+# Annotation set on the topics with policies when topic level policies
+# get enabled or disabled on the brokers, which makes kopf handle them
+# again right away instead of on their next timer run
+TOPIC_LEVEL_POLICIES_ANNOTATION = "config.neuron.rbi.tech/topic-level-policies"
+# Number of topics listed at once when re-queueing them
+REQUEUE_PAGE_SIZE = 500
 
 
 # Available condition types for NeuronTopic
@@ -40,17 +61,15 @@ def cluster_check(value: str, memo: kopf.Memo, **_):
     return value == memo.get("cluster_name")
 
 
-@kopf.on.update("neuron.isf", "neurontopics", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.resume("neuron.isf", "neurontopics", retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@kopf.on.timer("neuron.isf", "neurontopics", retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def topic_handler(
+# Reconciles a topic, shared by the sync and async handlers (see
+# `common.run_steps`)
+def reconcile_topic(
     status: NeuronStatus,
     memo: kopf.Memo,
+    client_type: type,
     meta: dict,
     spec: dict,
-    **_,
-):
+) -> Steps[None]:
     # At this point we can fix ClusterTargetOK condition
     status.set_condition(CommonConditionType.ClusterTargetOK, True)
 
@@ -58,18 +77,13 @@ def topic_handler(
     model = models.TopicSpec(**spec)
 
     # Get Pulsar client from memo
-    pulsar_client = memo.get("pulsar_client")
-    api: API
-    if pulsar_client and type(pulsar_client) == API:
-        api = pulsar_client
-    else:
-        raise kopf.PermanentError("No pulsar client available")
+    api: API = pulsar_client(memo, client_type)
 
     ############################
     ## Check Tenant in Pulsar ##
     ############################
     tenant = Tenant(name=model.tenant, **{})
-    if not api.tenant.exists(tenant):
+    if not (yield api.tenant.exists(tenant)):
         status.set_condition(
             TopicConditionType.TenantReady,
             False,
@@ -87,7 +101,7 @@ def topic_handler(
     ## Check Namespace in Pulsar ##
     ###############################
     ns = Namespace(name=model.namespace, tenant=model.tenant, **{})
-    if not api.namespace.exists(ns):
+    if not (yield api.namespace.exists(ns)):
         status.set_condition(
             TopicConditionType.NamespaceReady,
             False,
@@ -109,7 +123,7 @@ def topic_handler(
 
     # If topic level policies are not enabled but policies are
     # specified, we should fail.
-    if not api.topic.topic_level_policies_enabled() and model.policies != None:
+    if not (yield api.topic.topic_level_policies_enabled()) and model.policies != None:
         status.set_condition(
             TopicConditionType.TopicInSync,
             False,
@@ -120,9 +134,9 @@ def topic_handler(
         raise kopf.PermanentError(TopicReason.TopicLevelPoliciesDisabled)
 
     # Topic doesn't already exist
-    if not api.topic.exists(topic):
+    if not (yield api.topic.exists(topic)):
         try:
-            api.topic.create(topic)
+            yield api.topic.create(topic)
         except APIException as e:
             status.set_condition(TopicConditionType.TopicInSync, False, message=str(e))
             status.set_phase(TopicPhase.Pending)
@@ -130,7 +144,7 @@ def topic_handler(
 
     # Sync permissions
     try:
-        api.topic.sync_permissions(topic)
+        yield api.topic.sync_permissions(topic)
     except APIException as e:
         status.set_condition(TopicConditionType.TopicInSync, False, message=str(e))
         status.set_phase(TopicPhase.Pending)
@@ -139,9 +153,9 @@ def topic_handler(
         )
 
     # Check if topic level policies are enabled and update if so
-    if api.topic.topic_level_policies_enabled():
+    if (yield api.topic.topic_level_policies_enabled()):
         try:
-            api.topic.update(topic)
+            yield api.topic.update(topic)
         except APIException as e:
             status.set_condition(TopicConditionType.TopicInSync, False, message=str(e))
             status.set_phase(TopicPhase.Pending)
@@ -160,29 +174,42 @@ def topic_handler(
         status.observedGeneration = meta.get("generation")
 
 
+@kopf.on.update("neuron.isf", "neurontopics", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.resume("neuron.isf", "neurontopics", registry=SYNC_REGISTRY, retries=3, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@kopf.on.timer("neuron.isf", "neurontopics", registry=SYNC_REGISTRY, retries=3, initial_delay=60, interval=600, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TopicConditionType.ConnectionOK, deadline=DEADLINE)
+def topic_handler(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    meta: dict,
+    spec: dict,
+    **_,
+):
+    run_steps(reconcile_topic(status, memo, API, meta, spec))
+
+
 ####################
 ## Delete Handler ##
 ####################
-@kopf.on.delete("neuron.isf", "neurontopics", annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
-@status_handler(NeuronStatus)
-def delete(
-    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
-):
+# Deletes a topic, shared by the sync and async handlers
+def delete_topic(
+    status: NeuronStatus,
+    memo: kopf.Memo,
+    client_type: type,
+    body: kopf.Body,
+    logger: kopf.Logger,
+) -> Steps[None]:
     model = models.TopicSpec(**body.spec)
     if model.lifecyclePolicy == models.LifecyclePolicy.CleanUpAfterDeletion:
         # Get Pulsar client from memo
-        pulsar_client = memo.get("pulsar_client")
-        api: API
-        if pulsar_client and type(pulsar_client) == API:
-            api = pulsar_client
-        else:
-            raise kopf.PermanentError("No pulsar client available")
+        api: API = pulsar_client(memo, client_type)
         topic = Topic.from_spec(model)
 
         try:
-            if api.topic.exists(topic):
+            if (yield api.topic.exists(topic)):
                 try:
-                    api.topic.delete(topic)
+                    yield api.topic.delete(topic)
                 except Exception as e:
                     status.set_condition(
                         TopicConditionType.TopicInSync,
@@ -197,6 +224,15 @@ def delete(
             logger.warn("Releasing resource anyway.")
 
 
+@kopf.on.delete("neuron.isf", "neurontopics", registry=SYNC_REGISTRY, annotations={CLUSTER_ANNOTATION: cluster_check})  # type: ignore
+@status_handler(NeuronStatus)
+@connection_handler(TopicConditionType.ConnectionOK, deadline=DEADLINE)
+def delete(
+    status: NeuronStatus, memo: kopf.Memo, body: kopf.Body, logger: kopf.Logger, **_
+):
+    run_steps(delete_topic(status, memo, API, body, logger))
+
+
 ###########
 ## Index ##
 ###########
@@ -208,3 +244,78 @@ def topic_idx(spec: dict, **_):
     model = models.TopicSpec(**spec)
     selector = (model.tenant, model.namespace, model.topic)
     return {selector: model}
+
+
+#############
+## Requeue ##
+#############
+# Annotates the topics of the cluster that have policies with the state
+# of topic level policies ("enabled" or "disabled") so their update
+# handlers run again. The topics are listed a page at a time since the
+# cluster holds the topics of every Pulsar cluster. Returns the number
+# of topics annotated.
+def requeue_topics_with_policies(
+    api_instance: kubernetes.client.CustomObjectsApi,
+    cluster_name: Optional[str],
+    state: str,
+) -> int:
+    requeued = 0
+    options = {"limit": REQUEUE_PAGE_SIZE}
+    while True:
+        topics = api_instance.list_cluster_custom_object(
+            "neuron.isf", "v1alpha1", "neurontopics", **options
+        )
+        for topic in topics.get("items", []):
+            meta = topic["metadata"]
+            annotations = meta.get("annotations") or {}
+            if annotations.get(CLUSTER_ANNOTATION) != cluster_name:
+                continue
+            if not (topic.get("spec") or {}).get("policies"):
+                continue
+
+            api_instance.patch_namespaced_custom_object(
+                "neuron.isf",
+                "v1alpha1",
+                meta["namespace"],
+                "neurontopics",
+                meta["name"],
+                {"metadata": {"annotations": {TOPIC_LEVEL_POLICIES_ANNOTATION: state}}},
+            )
+            requeued += 1
+
+        token = (topics.get("metadata") or {}).get("continue")
+        if not token:
+            return requeued
+        options["_continue"] = token
+
+
+# Returns the listener of topicLevelPoliciesEnabled in the runtime
+# configuration of the brokers. Topics with policies fail while topic
+# level policies are disabled and have them synced otherwise, so they're
+# re-queued as soon as the brokers enable or disable them. The listener
+# is called from the refresh of the configuration, which may run on the
+# event loop, so the topics are re-queued in a thread.
+def topic_level_policies_listener(
+    memo: kopf.Memo, logger: Any
+) -> Callable[[Optional[str], Optional[str]], None]:
+    def requeue(state: str):
+        try:
+            kubernetes.config.load_config()
+            with kubernetes.client.ApiClient() as api_client:
+                requeued = requeue_topics_with_policies(
+                    kubernetes.client.CustomObjectsApi(api_client),
+                    memo.get("cluster_name"),
+                    state,
+                )
+            logger.info(f"Re-queued {requeued} topics with policies")
+        except Exception as e:
+            logger.warning(f"Unable to re-queue the topics with policies: {e}")
+
+    def changed(old: Optional[str], new: Optional[str]):
+        state = "enabled" if new == "true" else "disabled"
+        logger.warning(f"Topic level policies have been {state} on the brokers")
+        threading.Thread(
+            target=requeue, args=(state,), name="neuron-requeue-topics", daemon=True
+        ).start()
+
+    return changed
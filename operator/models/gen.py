@@ -89,6 +89,10 @@ class Status(BaseModel):
     connectionURL: Optional[str] = Field(
         None, description="URL from the NeuronConnection referenced by ConnectionRef"
     )
+    apiCalls: Optional[str] = Field(
+        None,
+        description="Pulsar API calls made by the last reconcile (calls, time, retries)",
+    )
     phase: str = Field(..., alias="phase", description="The phase of the resource")
 
 
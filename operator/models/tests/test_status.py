@@ -1,5 +1,9 @@
 from ..kube import *
+from api.ledger import current_ledger
 from enum import Enum
+import asyncio
+import inspect
+import pytest
 
 
 class ConditionType(str, Enum):
@@ -87,3 +91,51 @@ def test_neuron_status_to_dict():
     status.set_condition(ConditionType.Condition2, True)
     status.set_condition(ConditionType.Condition3, False, reason="fail")
     assert status.dict() == expected
+
+
+####################
+## status_handler ##
+####################
+def test_status_handler():
+    @status_handler(NeuronStatus)
+    def handler(status: NeuronStatus, **_):
+        status.set_phase(Phase.Ready)
+        return "done"
+
+    patch = {}
+    assert handler(status={}, patch=patch) == "done"
+    assert patch["status"]["phase"] == "Ready"
+
+
+def test_status_handler_async():
+    @status_handler(NeuronStatus)
+    async def handler(status: NeuronStatus, **_):
+        status.set_phase(Phase.Ready)
+        raise ValueError("failed")
+
+    patch = {}
+    assert inspect.iscoroutinefunction(handler)
+    with pytest.raises(ValueError):
+        asyncio.run(handler(status={}, patch=patch))
+    assert patch["status"]["phase"] == "Ready"
+
+
+def test_status_handler_api_calls():
+    @status_handler(NeuronStatus, api_calls=True)
+    def handler(status: NeuronStatus, **_):
+        ledger = current_ledger()
+        ledger.record(200, size=100, duration=0.25)
+        ledger.record(404, duration=0.05)
+        ledger.record_retry()
+
+    patch = {}
+    handler(status={}, patch=patch)
+    assert patch["status"]["apiCalls"] == "calls=2 ms=300 retries=1 bytes=100"
+
+    @status_handler(NeuronStatus)
+    def untracked(status: NeuronStatus, **_):
+        assert current_ledger() is None
+
+    patch = {}
+    untracked(status={}, patch=patch)
+    assert "apiCalls" not in patch["status"]
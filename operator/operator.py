@@ -1,17 +1,50 @@
+import asyncio
 import kopf
 import os
 import sys
+from typing import Optional
 import api
+import api.aio
 import kubernetes.client
 import kubernetes.config
 from kubernetes.client.rest import ApiException
 from handlers import *
+from handlers.profiler import PROFILER
 
 CONFIG_CLUSTER_NAME = "CLUSTER_NAME"
 CONFIG_PULSAR_SERVICE_NAME = "PULSAR_SERVICE_NAME"
 CONFIG_NAMESPACE = "PULSAR_NAMESPACE"
 CONFIG_PULSAR_API_URL = "PULSAR_API_URL"
+CONFIG_PULSAR_API_URLS = "PULSAR_API_URLS"
 CONFIG_PULSAR_API_SSL_SNI = "PULSAR_API_SSL_SNI"
+CONFIG_PULSAR_API_HTTP2 = "PULSAR_API_HTTP2"
+CONFIG_PULSAR_API_DIRECT_ROUTING = "PULSAR_API_DIRECT_ROUTING"
+CONFIG_PULSAR_API_POOL_MAXSIZE = "PULSAR_API_POOL_MAXSIZE"
+CONFIG_PULSAR_API_POOL_BLOCK = "PULSAR_API_POOL_BLOCK"
+CONFIG_PULSAR_API_WARMUP_CONNECTIONS = "PULSAR_API_WARMUP_CONNECTIONS"
+CONFIG_PULSAR_API_TLS_SESSION_RESUMPTION = "PULSAR_API_TLS_SESSION_RESUMPTION"
+CONFIG_PULSAR_API_MAX_ATTEMPTS = "PULSAR_API_MAX_ATTEMPTS"
+CONFIG_PULSAR_API_BREAKER_THRESHOLD = "PULSAR_API_BREAKER_THRESHOLD"
+CONFIG_PULSAR_API_BREAKER_RESET_TIMEOUT = "PULSAR_API_BREAKER_RESET_TIMEOUT"
+CONFIG_PULSAR_API_CONNECT_TIMEOUT = "PULSAR_API_CONNECT_TIMEOUT"
+CONFIG_PULSAR_API_READ_TIMEOUT = "PULSAR_API_READ_TIMEOUT"
+CONFIG_PULSAR_API_RATE_LIMIT = "PULSAR_API_RATE_LIMIT"
+CONFIG_PULSAR_API_RATE_BURST = "PULSAR_API_RATE_BURST"
+CONFIG_PULSAR_API_READ_RATE_LIMIT = "PULSAR_API_READ_RATE_LIMIT"
+CONFIG_PULSAR_API_READ_RATE_BURST = "PULSAR_API_READ_RATE_BURST"
+CONFIG_PULSAR_API_WRITE_RATE_LIMIT = "PULSAR_API_WRITE_RATE_LIMIT"
+CONFIG_PULSAR_API_WRITE_RATE_BURST = "PULSAR_API_WRITE_RATE_BURST"
+CONFIG_METRICS_PORT = "METRICS_PORT"
+CONFIG_TRACING_FILE = "TRACING_FILE"
+CONFIG_PULSAR_API_SLOW_CALL_LOG = "PULSAR_API_SLOW_CALL_LOG"
+CONFIG_PULSAR_API_SLOW_CALL_THRESHOLD = "PULSAR_API_SLOW_CALL_THRESHOLD"
+CONFIG_PULSAR_API_LARGE_RESPONSE_SIZE = "PULSAR_API_LARGE_RESPONSE_SIZE"
+CONFIG_PULSAR_API_SLOW_CALL_SUMMARY_INTERVAL = "PULSAR_API_SLOW_CALL_SUMMARY_INTERVAL"
+CONFIG_PULSAR_API_INVENTORY_TTL = "PULSAR_API_INVENTORY_TTL"
+CONFIG_PULSAR_API_MISSING_TTL = "PULSAR_API_MISSING_TTL"
+CONFIG_PULSAR_API_PERMISSION_TTL = "PULSAR_API_PERMISSION_TTL"
+
+DEFAULT_METRICS_PORT = 9090
 
 
 class ServiceSpecNotFoundException(Exception):
@@ -22,6 +55,12 @@ class ServicePortNotFoundException(Exception):
     pass
 
 
+# Returns the float value of an environment variable or None if not set
+def env_float(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
 def generate_url(svc: str, namespace: str):
     # Initially we need to load kubernetes config
     kubernetes.config.load_config()
@@ -74,7 +113,15 @@ def configure(
     memo["pulsar_service_name"] = service_name
     memo["pulsar_namespace"] = service_namespace
 
-    api_url = os.environ.get(CONFIG_PULSAR_API_URL)
+    # Additional admin endpoints (proxies or brokers) requests are spread
+    # over, comma separated
+    api_urls = [
+        url.strip()
+        for url in os.environ.get(CONFIG_PULSAR_API_URLS, "").split(",")
+        if url.strip()
+    ]
+
+    api_url = os.environ.get(CONFIG_PULSAR_API_URL) or next(iter(api_urls), None)
     if not api_url:
         # Construct an API URL from proxy service and create a Pulsar client
         try:
@@ -86,11 +133,157 @@ def configure(
             else:
                 raise e
 
+    # Async handlers need the asyncio flavour of the Pulsar client
+    client_cls = api.aio.AsyncAPI if ASYNC_HANDLERS else api.API
+
+    client_options = {}
+    # Size the connection pool after the number of sync handlers kopf can
+    # run at once (kopf falls back to the default asyncio executor size)
+    # so that every worker thread can hold a warm connection. Async
+    # handlers aren't bound by the thread pool, the async client has its
+    # own larger default.
+    pool_maxsize = os.environ.get(CONFIG_PULSAR_API_POOL_MAXSIZE)
+    if pool_maxsize:
+        client_options["pool_maxsize"] = int(pool_maxsize)
+    elif not ASYNC_HANDLERS:
+        client_options["pool_maxsize"] = settings.execution.max_workers or min(
+            32, (os.cpu_count() or 1) + 4
+        )
+    # Send topic calls straight to the broker owning the topic
+    if os.environ.get(CONFIG_PULSAR_API_DIRECT_ROUTING, "false").lower() == "true":
+        client_options["direct_routing"] = True
+    if os.environ.get(CONFIG_PULSAR_API_HTTP2, "false").lower() == "true":
+        if ASYNC_HANDLERS:
+            logger.warning("HTTP/2 isn't supported with async handlers, ignoring")
+        else:
+            client_options["http2"] = True
+    # Seconds the tenants, namespaces and topics seen in Pulsar are
+    # assumed to still exist, 0 disables the inventory
+    inventory_ttl = env_float(CONFIG_PULSAR_API_INVENTORY_TTL)
+    if inventory_ttl is not None:
+        client_options["inventory_ttl"] = inventory_ttl
+    # Seconds missing tenants and namespaces are assumed to still be
+    # missing, 0 asks Pulsar every time
+    missing_ttl = env_float(CONFIG_PULSAR_API_MISSING_TTL)
+    if missing_ttl is not None:
+        client_options["missing_ttl"] = missing_ttl
+    # Seconds the permissions of a namespace are reused for its topics, 0
+    # fetches them for every topic
+    permission_ttl = env_float(CONFIG_PULSAR_API_PERMISSION_TTL)
+    if permission_ttl is not None:
+        client_options["permission_ttl"] = permission_ttl
+
+    # Serve Prometheus metrics of the Pulsar API calls on /metrics, set
+    # the port to 0 to disable
+    metrics_port = int(os.environ.get(CONFIG_METRICS_PORT, DEFAULT_METRICS_PORT))
+    if metrics_port > 0:
+        try:
+            api_metrics = api.default_metrics()
+            api.start_metrics_server(metrics_port)
+        except ImportError:
+            logger.warning("Metrics are disabled, prometheus_client isn't installed")
+        except OSError as e:
+            logger.warning(f"Unable to serve metrics on port {metrics_port}: {e}")
+        else:
+            client_options["api_metrics"] = api_metrics
+            logger.info(f"Serving metrics on port {metrics_port}")
+
+    # Trace handler runs and Pulsar API calls, the spans are written as
+    # JSON lines to the given file
+    tracing_file = os.environ.get(CONFIG_TRACING_FILE)
+    if tracing_file:
+        try:
+            api.tracing.configure_tracing(tracing_file)
+            logger.info(f"Writing traces to {tracing_file}")
+        except ImportError:
+            logger.warning("Tracing is disabled, opentelemetry-sdk isn't installed")
+
+    # Log the calls slower than the threshold (in seconds) or returning
+    # more than the given number of bytes, with a periodic summary of the
+    # slowest endpoints
+    if os.environ.get(CONFIG_PULSAR_API_SLOW_CALL_LOG, "true").lower() == "true":
+        client_options["slow_call_log"] = api.SlowCallLog(
+            threshold=float(
+                os.environ.get(
+                    CONFIG_PULSAR_API_SLOW_CALL_THRESHOLD,
+                    api.DEFAULT_SLOW_CALL_THRESHOLD,
+                )
+            ),
+            size_threshold=int(
+                os.environ.get(
+                    CONFIG_PULSAR_API_LARGE_RESPONSE_SIZE,
+                    api.DEFAULT_LARGE_RESPONSE_SIZE,
+                )
+            ),
+            summary_interval=float(
+                os.environ.get(
+                    CONFIG_PULSAR_API_SLOW_CALL_SUMMARY_INTERVAL,
+                    api.DEFAULT_SUMMARY_INTERVAL,
+                )
+            ),
+        )
+
+    if PROFILER is not None:
+        logger.info(f"Writing handler profiles to {PROFILER.directory}")
+
     logger.info(f"Using Pulsar API URL {api_url}")
-    memo["pulsar_client"] = api.API(
-        api_url, sni=os.environ.get(CONFIG_PULSAR_API_SSL_SNI)
+    memo["pulsar_client"] = client_cls(
+        api_url,
+        endpoints=api_urls,
+        sni=os.environ.get(CONFIG_PULSAR_API_SSL_SNI),
+        pool_block=os.environ.get(CONFIG_PULSAR_API_POOL_BLOCK, "false").lower()
+        == "true",
+        tls_session_resumption=os.environ.get(
+            CONFIG_PULSAR_API_TLS_SESSION_RESUMPTION, "true"
+        ).lower()
+        == "true",
+        retry_policy=api.RetryPolicy(
+            max_attempts=int(
+                os.environ.get(CONFIG_PULSAR_API_MAX_ATTEMPTS, api.DEFAULT_MAX_ATTEMPTS)
+            )
+        ),
+        breaker=api.CircuitBreaker(
+            failure_threshold=int(
+                os.environ.get(
+                    CONFIG_PULSAR_API_BREAKER_THRESHOLD, api.DEFAULT_FAILURE_THRESHOLD
+                )
+            ),
+            reset_timeout=float(
+                os.environ.get(
+                    CONFIG_PULSAR_API_BREAKER_RESET_TIMEOUT, api.DEFAULT_RESET_TIMEOUT
+                )
+            ),
+        ),
+        connect_timeout=float(
+            os.environ.get(
+                CONFIG_PULSAR_API_CONNECT_TIMEOUT, api.DEFAULT_CONNECT_TIMEOUT
+            )
+        ),
+        read_timeout=float(
+            os.environ.get(CONFIG_PULSAR_API_READ_TIMEOUT, api.DEFAULT_READ_TIMEOUT)
+        ),
+        # Requests per second, unlimited unless configured
+        rate_limiter=api.RateLimiter(
+            rate=env_float(CONFIG_PULSAR_API_RATE_LIMIT),
+            burst=env_float(CONFIG_PULSAR_API_RATE_BURST),
+            read_rate=env_float(CONFIG_PULSAR_API_READ_RATE_LIMIT),
+            read_burst=env_float(CONFIG_PULSAR_API_READ_RATE_BURST),
+            write_rate=env_float(CONFIG_PULSAR_API_WRITE_RATE_LIMIT),
+            write_burst=env_float(CONFIG_PULSAR_API_WRITE_RATE_BURST),
+        ),
+        **client_options,
     )
 
+    # Re-queue the topics with policies when the brokers enable or disable
+    # topic level policies
+    memo["pulsar_client"].config_cache.add_listener(
+        "topicLevelPoliciesEnabled", topic_level_policies_listener(memo, logger)
+    )
+
+    endpoints = memo["pulsar_client"].transport.endpoints.urls
+    if len(endpoints) > 1:
+        logger.info(f"Spreading Pulsar API requests over {', '.join(endpoints)}")
+
     # Setup Neuron "branding" to finalizers and various internal annotations
     settings.persistence.finalizer = f"{cluster_name}.neuron.rbi.tech/finalizer"
     settings.persistence.diffbase_storage = kopf.AnnotationsDiffBaseStorage(
@@ -103,3 +296,50 @@ def configure(
 
     # Disable event posting
     settings.posting.enabled = False
+
+
+@kopf.on.startup()  # type: ignore
+async def warm_up(memo: kopf.Memo, logger: kopf.Logger, **_):
+    # Open connections to the Pulsar API before the first burst of
+    # handlers so they don't all pay for a TCP and TLS handshake at once.
+    # Set to 0 to disable.
+    connections = int(
+        os.environ.get(
+            CONFIG_PULSAR_API_WARMUP_CONNECTIONS, api.DEFAULT_WARMUP_CONNECTIONS
+        )
+    )
+    pulsar_client = memo.get("pulsar_client")
+    if connections <= 0 or pulsar_client is None:
+        return
+
+    try:
+        if isinstance(pulsar_client, api.aio.AsyncAPI):
+            opened = await pulsar_client.warm_up(connections)
+        else:
+            loop = asyncio.get_running_loop()
+            opened = await loop.run_in_executor(
+                None, pulsar_client.warm_up, connections
+            )
+    except Exception as e:
+        # Handlers will connect on demand
+        logger.warning(f"Unable to warm up Pulsar API connections: {e}")
+        return
+
+    logger.info(f"Opened {opened} connections to the Pulsar API")
+
+
+@kopf.on.cleanup()  # type: ignore
+async def cleanup(memo: kopf.Memo, **_):
+    # Close pooled connections to the Pulsar API
+    pulsar_client = memo.get("pulsar_client")
+    if isinstance(pulsar_client, api.aio.AsyncAPI):
+        await pulsar_client.close()
+    elif isinstance(pulsar_client, api.API):
+        pulsar_client.close()
+
+    # Write the spans that weren't exported yet
+    api.tracing.shutdown_tracing()
+
+    # Write the samples that weren't written yet
+    if PROFILER is not None:
+        PROFILER.stop()